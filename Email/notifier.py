@@ -6,6 +6,7 @@ from email.mime.image import MIMEImage
 from dotenv import load_dotenv
 
 from Email.template_generator import Email_template
+from src.image_derivatives import get_derivative_generator
 from datetime import datetime
 
 
@@ -50,8 +51,10 @@ class Email_notifier():
         #     msg.attach(img)
 
         max_images = 5
+        derivatives = get_derivative_generator()
         for i, image_path in enumerate(image_paths[:min(len(image_paths), max_images)]):
-            with open(image_path, "rb") as img_file:
+            # Email-sized JPEG instead of the camera original (keeps the message under SMTP limits)
+            with open(derivatives.path_for(image_path, "email"), "rb") as img_file:
                 img = MIMEImage(img_file.read())
                 img.add_header("Content-ID", f"<issue_photo_{i}>")
                 img.add_header("Content-Disposition", "inline", filename=f"evidence_{i + 1}.jpg")
@@ -0,0 +1,162 @@
+# Social_platforms/tweet_batch.py
+"""
+Tweets for many issues from one Gemini request.
+
+The instructions are sent once per batch and the issues go in as a compact JSON list, so
+clearing a backlog of authority_review approvals costs a few requests instead of one each.
+Every returned tweet is checked locally (right issue_id, non-empty, within 280 by Twitter's
+counting); only the ones that fail are sent again, with the reason attached.
+"""
+import json
+import os
+import re
+
+from Social_platforms.tweet_length import MAX_TWEET_LENGTH, weighted_length
+
+BATCH_INSTRUCTIONS = """
+You are writing tweets that report civic issues to city municipalities, one tweet per issue.
+Full details (image, coordinates, description) have already been emailed to the right civic authority.
+
+For every issue in the JSON list below write a professional, citizen-friendly tweet that:
+1. Brings the issue to the municipality's attention and says full details were shared via email.
+2. Refers to the municipal body generally ("city authorities", "local officials"), never with @ handles or email addresses.
+3. Includes relevant hashtags like #CivicIssue, #UrbanIndia, #SmartCity and a few catchy emojis.
+4. Adds a light, respectful touch of humor to encourage faster resolution.
+5. Stays under {limit} characters (emojis count as 2, links as 23).
+
+Return only a JSON array with one object per issue, in any order:
+[{{"issue_id": "<issue_id from the input>", "tweet": "<tweet text>"}}]
+"""
+
+# Rough output size of one {"issue_id", "tweet"} object, in tokens
+TOKENS_PER_TWEET = 120
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token), good enough to size batches."""
+    return len(text) // 4 + 1
+
+
+def issue_summary(state):
+    """The fields the tweet needs, without the bulk of the issue state."""
+    address = (state.get("metadata") or {}).get("Address") or {}
+    return {
+        "issue_id": state.get("issue_id", "unknown_id"),
+        "issue_type": state.get("issue_type", "Unknown_issue"),
+        "date": (state.get("metadata") or {}).get("datetime", "Unknown date").split(" ")[0],
+        "location": {k: address[k] for k in ("road", "neighbourhood", "suburb", "ward", "city", "state")
+                     if address.get(k)},
+        "similar_reports_nearby": state.get("similar_count", 0),
+    }
+
+
+def build_prompt(summaries, limit=MAX_TWEET_LENGTH):
+    return BATCH_INSTRUCTIONS.format(limit=limit) + "\nIssues:\n" + json.dumps(summaries, ensure_ascii=False)
+
+
+def plan_batches(summaries, token_budget, max_items):
+    """Split summaries into batches whose prompt + expected output stay within token_budget."""
+    base = estimate_tokens(BATCH_INSTRUCTIONS)
+    batches, current, used = [], [], base
+    for summary in summaries:
+        cost = estimate_tokens(json.dumps(summary, ensure_ascii=False)) + TOKENS_PER_TWEET
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], base
+        current.append(summary)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch(text):
+    """{issue_id: tweet} from the model's JSON answer; tolerates ```json fences and stray prose."""
+    text = (text or "").strip()
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    tweets = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("issue_id") is not None and isinstance(item.get("tweet"), str):
+            tweets[str(item["issue_id"])] = item["tweet"].strip()
+    return tweets
+
+
+def check_tweet(tweet, limit=MAX_TWEET_LENGTH):
+    """None if the tweet can be posted, else the reason it can't."""
+    if not tweet:
+        return "missing from the answer"
+    length = weighted_length(tweet)
+    if length > limit:
+        return f"was {length} characters, must be under {limit}"
+    return None
+
+
+class TweetBatcher:
+    def __init__(self, gateway, llm_cache, token_budget=6000, max_items=15, max_rounds=3):
+        self.gateway = gateway
+        self.llm_cache = llm_cache
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.max_rounds = max_rounds
+        self.last_report = None
+
+    def _request(self, summaries, force_refresh):
+        prompt = build_prompt(summaries)
+        call = lambda p: self.gateway.generate(p, site="tweet_batch",
+                                               generation_config={"response_mime_type": "application/json"})
+        return parse_batch(self.llm_cache.generate(self.gateway, prompt, site="tweet_batch",
+                                                   force_refresh=force_refresh, call=call))
+
+    def generate(self, states, force_refresh=False):
+        """
+        Returns (tweets, failures): {issue_id: tweet} for every issue that got a valid tweet,
+        and {issue_id: reason} for the ones that still failed after max_rounds.
+        """
+        pending = {str(s["issue_id"]): issue_summary(s) for s in states}
+        tweets, failures = {}, {}
+        report = {"issues": len(pending), "requests": 0, "retried": 0, "failed": 0}
+        for round_number in range(self.max_rounds):
+            if not pending:
+                break
+            if round_number:
+                report["retried"] += len(pending)
+            for batch in plan_batches(list(pending.values()), self.token_budget, self.max_items):
+                report["requests"] += 1
+                try:
+                    # Retries are new requests: never answer them from the cache
+                    answer = self._request(batch, force_refresh or round_number > 0)
+                except Exception as e:
+                    print(f"Tweet batch of {len(batch)} failed: {e}")
+                    answer = {}
+                for summary in batch:
+                    issue_id = str(summary["issue_id"])
+                    tweet = answer.get(issue_id)
+                    problem = check_tweet(tweet)
+                    if problem is None:
+                        tweets[issue_id] = tweet
+                        failures.pop(issue_id, None)
+                        del pending[issue_id]
+                    else:
+                        failures[issue_id] = problem
+                        # The next round tells the model what was wrong with this one
+                        summary["previous_attempt_problem"] = f"your last tweet {problem}"
+        report["failed"] = len(failures)
+        self.last_report = report
+        print(f"Tweet batch: {report['issues']} issues, {report['requests']} requests, "
+              f"{report['retried']} retried, {report['failed']} failed")
+        return tweets, failures
+
+
+def batcher_from_env(gateway, llm_cache):
+    return TweetBatcher(
+        gateway,
+        llm_cache,
+        token_budget=int(os.getenv("TWEET_BATCH_TOKEN_BUDGET", "6000")),
+        max_items=int(os.getenv("TWEET_BATCH_MAX_ITEMS", "15")),
+    )
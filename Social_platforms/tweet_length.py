@@ -0,0 +1,59 @@
+# Social_platforms/tweet_length.py
+"""
+Tweet length the way Twitter counts it (twitter-text v3 weighting).
+
+- text is NFC-normalized first
+- Latin, common punctuation and general-punctuation code points weigh 1, everything else
+  (CJK, Devanagari, most symbols) weighs 2
+- an emoji counts 2 no matter how many code points it is built from (ZWJ sequences,
+  skin tones, flags, keycaps)
+- every URL counts 23, whatever its real length
+"""
+import re
+import unicodedata
+
+MAX_TWEET_LENGTH = 280
+URL_LENGTH = 23
+
+# Code point ranges with weight 1, from twitter-text's v3 config
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s<>\"]+"
+    r"|\b[a-z0-9][a-z0-9-]*(?:\.[a-z0-9-]+)*\.(?:com|org|net|in|gov|io|co|info|edu)\b(?:/[^\s<>\"]*)?",
+    re.IGNORECASE,
+)
+
+EMOJI_BASE = ("\U0001F000-\U0001FAFF\u2600-\u27BF\u2300-\u23FF\u2B00-\u2BFF"
+              "\u00A9\u00AE\u203C\u2049\u2122\u2139\u3030\u303D")
+EMOJI_MODIFIERS = "\uFE0E\uFE0F\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F"
+# One emoji however many code points: flags, keycaps, and a base with modifiers / ZWJ-joined parts
+EMOJI_RE = re.compile(
+    "[\U0001F1E6-\U0001F1FF]{1,2}"
+    "|[0-9#*]\uFE0F?\u20E3"
+    f"|[{EMOJI_BASE}](?:[{EMOJI_MODIFIERS}]|\u200D\\S)*"
+)
+# Code points outside the weight-1 ranges
+HEAVY_RE = re.compile("[^" + "".join(f"\\u{low:04x}-\\u{high:04x}" for low, high in LIGHT_RANGES) + "]")
+
+
+def _text_length(text):
+    rest, emojis = EMOJI_RE.subn("", text)
+    return len(rest) + len(HEAVY_RE.findall(rest)) + 2 * emojis
+
+
+def weighted_length(text):
+    """Length of `text` as counted against Twitter's 280 limit."""
+    text = text or ""
+    if text.isascii() and "." not in text and "://" not in text:
+        return len(text)  # plain ASCII without links: every character weighs 1
+    text = unicodedata.normalize("NFC", text)
+    total, pos = 0, 0
+    for match in URL_RE.finditer(text):
+        total += _text_length(text[pos:match.start()]) + URL_LENGTH
+        pos = match.end()
+    return total + _text_length(text[pos:])
+
+
+def fits(text, limit=MAX_TWEET_LENGTH):
+    return 0 < weighted_length(text) <= limit
@@ -0,0 +1,269 @@
+# Social_platforms/tweet_templates.py
+"""
+Deterministic tweets from per-type templates, no LLM call needed.
+
+Templates are parsed once per (locale, issue type) when the engine is built; rendering is
+string joins plus Twitter's weighted length check, so a tweet is ready in microseconds and
+the authority_review -> tweet_review step never waits on Gemini. When a tweet is too long,
+optional parts are dropped (extra hashtags, similar-count line, road name) before the
+headline is shortened.
+
+An LLM rewrite is opt-in (TWEET_LLM_POLISH): TweetPolisher runs it in the background and
+stores the result as tweet["polished"] for the admin to pick in tweet_review.
+"""
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from string import Formatter
+
+from Social_platforms.tweet_length import MAX_TWEET_LENGTH, weighted_length
+
+HEADLINES = {
+    "en": {
+        "pothole": [
+            "🕳️ BREAKING: The pothole on {place} has achieved crater status! 🌙 NASA is reportedly interested for Mars training 🚀",
+            "🚨 POTHOLE ALERT: {place} crater now accepting applications for permanent residents! 🏠 Free suspension massage included 💆",
+            "🕳️ {place} pothole update: deep enough to hide a small car 🚗 Residents are betting on when it reaches Earth's core 🌍",
+        ],
+        "garbage": [
+            "🗑️ BREAKING: The garbage dump on {place} has achieved landmark status! 📍 GPS now lists it as a point of interest 🎯",
+            "🚨 GARBAGE ALERT: Waste on {place} has evolved into a modern art installation 🎨 Museum curators are interested 🖼️",
+            "🗑️ {place} garbage update: we've officially created our own ecosystem 🌱 Scientists are studying the new species 🔬",
+        ],
+        "water_leakage": [
+            "💧 BREAKING: {place} now has its own private waterfall! 🌊 Tourists welcome, water bills not so much 💸",
+            "🚨 LEAK ALERT: Precious water on {place} is taking an unscheduled trip down the drain 🚰 Let's plug it before monsoon jealousy sets in ☔",
+            "💧 {place} leak update: the puddle is now big enough for a paper boat regatta ⛵",
+        ],
+        "streetlight": [
+            "💡 BREAKING: The streetlight on {place} has been playing hide-and-seek for weeks 🙈 Score: Darkness 1, Citizens 0 🌙",
+            "🚨 LIGHT ALERT: {place} streetlight is on permanent vacation 🏖️ Residents now navigate by phone flashlight 📱",
+            "💡 {place} streetlight update: it has become a professional mime, completely silent and invisible 🎭",
+        ],
+        "road_damage": [
+            "🚧 BREAKING: {place} has achieved off-road status while still being a road! 🏞️ Adventure sports fans are thrilled 🚵",
+            "🚨 ROAD ALERT: {place} now offers free massage therapy for car suspensions 💆 Chiropractors hate this one trick 😂",
+            "🚧 {place} update: it's now officially a 4D driving experience 🎢 Theme park designers are taking notes 📝",
+        ],
+        "other": [
+            "📢 A {issue_type} issue on {place} needs some civic love ❤️ Let's get it fixed before it becomes a local legend 🏆",
+            "🚨 CIVIC ALERT: {place} has a {issue_type} problem that's overstaying its welcome ⏳",
+        ],
+    },
+    "hi": {
+        "pothole": [
+            "🕳️ ब्रेकिंग: {place} का गड्ढा अब क्रेटर बन चुका है! 🌙 चलिए इसे पर्यटन स्थल बनने से पहले भर दें 🚀",
+        ],
+        "garbage": [
+            "🗑️ ब्रेकिंग: {place} का कूड़े का ढेर अब लैंडमार्क बन गया है! 📍 सफ़ाई का इंतज़ार है 🧹",
+        ],
+        "streetlight": [
+            "💡 {place} की स्ट्रीटलाइट हफ़्तों से लुका-छिपी खेल रही है 🙈 अंधेरा 1, नागरिक 0 🌙",
+        ],
+        "other": [
+            "📢 {place} पर {issue_type} की समस्या है, कृपया जल्द ध्यान दें 🙏",
+        ],
+    },
+}
+
+# Issues only carry the authority's email addresses, not a name to show
+DETAILS = {
+    "en": "🆔 {issue_id} · 📅 {date}\n📧 Emailed to the authorities",
+    "hi": "🆔 {issue_id} · 📅 {date}\n📧 पूरी जानकारी नगर निगम को ईमेल की गई",
+}
+SIMILAR = {
+    "en": "👥 {similar} similar reports nearby",
+    "hi": "👥 आसपास {similar} और शिकायतें",
+}
+
+HASHTAGS = {
+    "pothole": ["#CivicIssue", "#PotholeProblems", "#RoadSafety"],
+    "garbage": ["#CivicIssue", "#CleanIndia", "#SwachhBharat"],
+    "water_leakage": ["#CivicIssue", "#SaveWater", "#WaterLeak"],
+    "streetlight": ["#CivicIssue", "#LightUp", "#SafeStreets"],
+    "road_damage": ["#CivicIssue", "#RoadSafety", "#FixOurRoads"],
+    "other": ["#CivicIssue", "#UrbanIndia"],
+}
+COMMON_HASHTAGS = ["#SmartCity", "#UrbanIndia"]
+
+TYPE_ALIASES = {
+    "pothole": "pothole",
+    "garbage": "garbage", "waste": "garbage", "trash": "garbage",
+    "water": "water_leakage", "leak": "water_leakage",
+    "streetlight": "streetlight", "street light": "streetlight", "light": "streetlight",
+    "road": "road_damage",
+}
+
+
+def issue_type_key(issue_type):
+    """Template key for a free-text issue type ("Road Damage", "🕳️ Pothole Report" ...)."""
+    text = (issue_type or "").lower()
+    for alias, key in TYPE_ALIASES.items():
+        if alias in text:
+            return key
+    return "other"
+
+
+class CompiledTemplate:
+    """A format string split into (literal, field) pieces once, rendered with a join."""
+
+    __slots__ = ("pieces",)
+
+    def __init__(self, text):
+        self.pieces = [(literal, field) for literal, field, _, _ in Formatter().parse(text)]
+
+    def render(self, values):
+        return "".join(literal + (values[field] if field else "") for literal, field in self.pieces)
+
+
+def _hashtag(name):
+    tag = re.sub(r"\W", "", (name or "").title(), flags=re.UNICODE)
+    return f"#{tag}" if tag else None
+
+
+def _trim_to(text, budget):
+    """Shorten text with an ellipsis until its weighted length is within budget."""
+    if weighted_length(text) <= budget:
+        return text
+    words = text.split(" ")
+    while len(words) > 1:
+        words.pop()
+        candidate = " ".join(words).rstrip(",.;:!-") + "…"
+        if weighted_length(candidate) <= budget:
+            return candidate
+    return text[:max(0, budget - 1)] + "…"
+
+
+class TweetTemplateEngine:
+    def __init__(self, default_locale="en", limit=MAX_TWEET_LENGTH):
+        self.default_locale = default_locale
+        self.limit = limit
+        # (locale, type) -> compiled headline variants; details/similar compiled per locale
+        self.headlines = {(locale, key): [CompiledTemplate(t) for t in variants]
+                          for locale, types in HEADLINES.items() for key, variants in types.items()}
+        self.details = {locale: CompiledTemplate(t) for locale, t in DETAILS.items()}
+        self.similar = {locale: CompiledTemplate(t) for locale, t in SIMILAR.items()}
+
+    def variants(self, issue_type, locale=None):
+        locale = locale if locale in DETAILS else self.default_locale
+        key = issue_type_key(issue_type)
+        return (self.headlines.get((locale, key)) or self.headlines.get((locale, "other"))
+                or self.headlines[("en", key)])
+
+    def values(self, state, locale):
+        metadata = state.get("metadata") or {}
+        address = metadata.get("Address") or {}
+        city = address.get("city") or address.get("town") or address.get("village") or ""
+        street = address.get("road") or address.get("neighbourhood") or address.get("suburb") or ""
+        return {
+            "issue_id": str(state.get("issue_id", "unknown_id")),
+            "issue_type": (state.get("issue_type") or "civic").lower(),
+            "date": (metadata.get("datetime") or "Unknown date").split(" ")[0],
+            "similar": str(state.get("similar_count") or 0),
+            "street": street,
+            "city": city,
+            "place": ", ".join(part for part in (street, city) if part) or "our street",
+        }
+
+    def render(self, state, locale=None, variant=None):
+        """A tweet for the issue that fits Twitter's limit. The variant is stable per issue_id."""
+        locale = locale or state.get("locale") or self.default_locale
+        locale = locale if locale in DETAILS else self.default_locale
+        values = self.values(state, locale)
+        variants = self.variants(state.get("issue_type"), locale)
+        if variant is None:
+            variant = zlib.crc32(values["issue_id"].encode("utf-8")) % len(variants)
+        key = issue_type_key(state.get("issue_type"))
+        tags = HASHTAGS[key] + [t for t in [_hashtag(values["city"])] + COMMON_HASHTAGS if t]
+        headline = variants[variant]
+        details = self.details[locale].render(values)
+        similar = self.similar[locale].render(values) if values["similar"] != "0" else None
+
+        # Weighted length is additive over parts, so each part is measured once
+        headline_full = headline.render(dict(values, place=values["place"]))
+        lengths = {"headline": weighted_length(headline_full), "details": weighted_length(details),
+                   "similar": weighted_length(similar) + 1 if similar else 0}
+        tag_lengths = [weighted_length(t) for t in tags]
+
+        def size(headline_length, with_similar, n_tags):
+            return (headline_length + 2 + lengths["details"] + (lengths["similar"] if with_similar else 0)
+                    + 2 + sum(tag_lengths[:n_tags]) + n_tags - 1)
+
+        # Cheapest losses first: extra hashtags, the similar-count line, then the street name
+        for with_similar, n_tags in ((True, len(tags)), (True, 4), (True, 3), (False, 3)):
+            if with_similar and not similar:
+                continue
+            if size(lengths["headline"], with_similar, n_tags) <= self.limit:
+                return self._compose(headline_full, details, similar if with_similar else None, tags[:n_tags])
+
+        place = values["city"] or values["place"]
+        headline_text = headline.render(dict(values, place=place))
+        # Still too long (very long names): shorten the headline to whatever space is left
+        budget = self.limit - size(0, False, 2)
+        return self._compose(_trim_to(headline_text, budget), details, None, tags[:2])
+
+    @staticmethod
+    def _compose(headline, details, similar, hashtags):
+        if similar:
+            details += "\n" + similar
+        return headline + "\n\n" + details + "\n\n" + " ".join(hashtags)
+
+
+class TweetPolisher:
+    """
+    Optional LLM rewrite of template tweets, off the request path.
+
+    The polished text is saved as tweet["polished"] only if the issue is still in tweet_review
+    with the same template text, and only if it fits the limit; the admin chooses whether to use it.
+    """
+
+    def __init__(self, issue_handler, social_handler, enabled=False, max_workers=1):
+        self.issue_handler = issue_handler
+        self.social_handler = social_handler
+        self.enabled = enabled
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tweet-polish")
+        self._lock = threading.Lock()
+        self.counters = {"scheduled": 0, "stored": 0, "rejected": 0, "stale": 0, "errors": 0}
+
+    def schedule(self, state):
+        if not self.enabled:
+            return False
+        with self._lock:
+            self.counters["scheduled"] += 1
+        self._pool.submit(self._run, state["issue_id"], state["tweet"]["text"])
+        return True
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _run(self, issue_id, template_text):
+        try:
+            polished = self.social_handler.polish_tweet(template_text)
+            if not polished:
+                self._count("rejected")
+                return
+            state = self.issue_handler.get_data(issue_id)
+            tweet = state.get("tweet") or {}
+            if state.get("admin_stage") != "tweet_review" or tweet.get("text") != template_text:
+                self._count("stale")
+                return
+            tweet["polished"] = polished
+            state["tweet"] = tweet
+            self.issue_handler.update_issue(state)
+            self._count("stored")
+        except Exception as e:
+            self._count("errors")
+            print(f"Tweet polish failed for {issue_id}: {e}")
+
+
+_engine = None
+
+
+def get_tweet_engine():
+    global _engine
+    if _engine is None:
+        _engine = TweetTemplateEngine(default_locale=os.getenv("TWEET_LOCALE", "en"))
+    return _engine
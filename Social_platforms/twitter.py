@@ -1,35 +1,52 @@
 import os
-import tweepy
 from dotenv import load_dotenv
-import google.generativeai as genai
+from src.image_derivatives import get_derivative_generator
+from src.llm_cache import get_llm_cache
+from src.llm_gateway import get_llm_gateway
+from Social_platforms.tweet_batch import batcher_from_env
+from Social_platforms.tweet_length import fits
+from Social_platforms.tweet_templates import get_tweet_engine
 
 load_dotenv()
 
-# Twitter Auth Setup
-client = tweepy.Client(
-    consumer_key=os.getenv("TWITTER_API_KEY"),
-    consumer_secret=os.getenv("TWITTER_API_SECRET"),
-    access_token=os.getenv("TWITTER_ACCESS_TOKEN"),
-    access_token_secret=os.getenv("TWITTER_ACCESS_SECRET"),
-)
-
-# v1.1 Auth (needed for media upload)
-auth = tweepy.OAuth1UserHandler(
-    os.getenv("TWITTER_API_KEY"),
-    os.getenv("TWITTER_API_SECRET"),
-    os.getenv("TWITTER_ACCESS_TOKEN"),
-    os.getenv("TWITTER_ACCESS_SECRET")
-)
-api_v1 = tweepy.API(auth)
+_twitter_clients = None
+
+
+def get_twitter_clients():
+    """(v2 client, v1.1 API) built on first post, so importing this module doesn't load tweepy."""
+    global _twitter_clients
+    if _twitter_clients is None:
+        import tweepy
+
+        # Twitter Auth Setup
+        client = tweepy.Client(
+            consumer_key=os.getenv("TWITTER_API_KEY"),
+            consumer_secret=os.getenv("TWITTER_API_SECRET"),
+            access_token=os.getenv("TWITTER_ACCESS_TOKEN"),
+            access_token_secret=os.getenv("TWITTER_ACCESS_SECRET"),
+        )
+
+        # v1.1 Auth (needed for media upload)
+        auth = tweepy.OAuth1UserHandler(
+            os.getenv("TWITTER_API_KEY"),
+            os.getenv("TWITTER_API_SECRET"),
+            os.getenv("TWITTER_ACCESS_TOKEN"),
+            os.getenv("TWITTER_ACCESS_SECRET")
+        )
+        _twitter_clients = (client, tweepy.API(auth))
+    return _twitter_clients
+
+
 class Social_Handles():
     def __init__(self):
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-04-17')
-    def build_tweet_text(self, state):
+        self.model = get_llm_gateway()
+        self.llm_cache = get_llm_cache()
+        self.tweet_batcher = batcher_from_env(self.model, self.llm_cache)
+        # "template" (default): instant tweets from tweet_templates.py; "llm": Gemini writes them
+        self.tweet_engine = get_tweet_engine()
+        self.use_llm = os.getenv("TWEET_GENERATOR", "template").lower() == "llm"
+    def build_tweet_text(self, state, force_refresh=False, stream=False):
+        # stream=True returns a generator of text chunks instead of the finished tweet
         Metadata=state['metadata']
         address = Metadata['Address']
         # road = address.get("road", "Unknown road")
@@ -67,8 +84,31 @@ class Social_Handles():
                 Return only the tweet text. No explanation or formatting outside the tweet.
                 """
 
-        response = self.model.generate_content(prompt)
-        return response.text
+        if stream:
+            return self.llm_cache.stream(self.model, prompt, site="tweet_text", force_refresh=force_refresh)
+        return self.llm_cache.generate(self.model, prompt, site="tweet_text", force_refresh=force_refresh)
+    def build_tweet_texts(self, states, force_refresh=False):
+        """
+        Tweets for several issues from as few Gemini requests as possible (see tweet_batch.py).
+        Returns (tweets, failures): {issue_id: text} and {issue_id: reason}.
+        """
+        return self.tweet_batcher.generate(states, force_refresh=force_refresh)
+    def polish_tweet(self, text, force_refresh=False):
+        """LLM rewrite of a template tweet keeping its facts; None if the answer doesn't fit in a tweet."""
+        prompt = f"""
+                Rewrite this tweet about a civic issue so it reads more natural and engaging.
+                Keep the issue ID, date, location and hashtags exactly as they are.
+                Keep a light, respectful touch of humor. Do not add @ handles or email addresses.
+                It must stay under 280 characters (emojis count as 2).
+
+                Tweet:
+                {text}
+
+                Return only the rewritten tweet text.
+                """
+        polished = self.llm_cache.generate(self.model, prompt, site="tweet_polish", force_refresh=force_refresh)
+        polished = (polished or "").strip()
+        return polished if fits(polished) else None
     def make_tweet_info(self, state):
         tweet_text = self.build_tweet_text(state)
 
@@ -97,8 +137,11 @@ class Social_Handles():
             max_images = 3
             media_ids = []
 
+            client, api_v1 = get_twitter_clients()
+            derivatives = get_derivative_generator()
             for image_path in image_paths[:min(len(image_paths), max_images)]:
-                media = api_v1.media_upload(image_path)
+                # Twitter-compliant re-encode (size/dimension limits) rather than the raw original
+                media = api_v1.media_upload(derivatives.path_for(image_path, "twitter"))
                 media_ids.append(media.media_id_string)
 
             # Build and post the tweet
@@ -0,0 +1,176 @@
+# authority_finder/directory.py
+import copy
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from filelock import FileLock, Timeout
+
+LEVELS = ("country", "state", "city", "ward", "issue_type")
+WILDCARD = "*"
+EMAIL_KEYS = ("Main", "CC", "Higher Authority")
+
+
+def normalize(value):
+    return " ".join(str(value or "").split()).lower() or WILDCARD
+
+
+def directory_key(address, issue_type):
+    """(country, state, city, ward, issue_type) for an address dict as built by format_address_dict."""
+    address = address or {}
+    return (
+        normalize(address.get("country")),
+        normalize(address.get("state") or address.get("State")),
+        normalize(address.get("city")),
+        normalize(address.get("ward")),
+        normalize(issue_type),
+    )
+
+
+def clean_emails(emails):
+    """Only the Main/CC/Higher Authority fields that hold an address, or None."""
+    if isinstance(emails, str):
+        emails = {"Main": emails}
+    if not isinstance(emails, dict):
+        return None
+    cleaned = {}
+    for key in EMAIL_KEYS:
+        value = str(emails.get(key) or "").strip()
+        if "@" in value:
+            cleaned[key] = value
+    return cleaned if "Main" in cleaned else None
+
+
+class AuthorityDirectory:
+    """
+    Local directory of civic authority contacts, keyed country -> state -> city -> ward -> issue_type.
+
+    The JSON file is nested in that order; "*" at the ward or issue_type level is a
+    city-wide (or any-issue) default. It is flattened into one in-memory dict, so a lookup
+    is at most four dict probes, most specific key first:
+
+        (ward, type) -> (ward, *) -> (*, type) -> (*, *)
+
+    Contacts an admin confirms are written back under a file lock, so the hit rate grows
+    as issues are reviewed. The file is reloaded when another process changed it.
+    """
+
+    def __init__(self, path="authority_finder/data/city_authorities.json", lock_timeout=5):
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self.lock_timeout = lock_timeout
+        self._index = {}
+        self._mtime = None
+        self._guard = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "saved": 0}
+        self._reload()
+
+    def _read_tree(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read authority directory {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _flatten(tree):
+        index = {}
+
+        def walk(node, path):
+            if len(path) == len(LEVELS):
+                if isinstance(node, dict):
+                    index[tuple(path)] = node
+                return
+            for name, child in (node or {}).items():
+                walk(child, path + [normalize(name)])
+
+        walk(tree, [])
+        return index
+
+    def _current_mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _reload(self):
+        with self._guard:
+            self._mtime = self._current_mtime()
+            self._index = self._flatten(self._read_tree())
+
+    def _refresh(self):
+        if self._current_mtime() != self._mtime:
+            self._reload()
+
+    def __len__(self):
+        return len(self._index)
+
+    def lookup(self, address, issue_type):
+        """Email dict ({"Main", "CC", "Higher Authority"}) for the most specific matching entry, or None."""
+        self._refresh()
+        country, state, city, ward, kind = directory_key(address, issue_type)
+        if city == WILDCARD:
+            return None
+        for ward_key, type_key in ((ward, kind), (ward, WILDCARD), (WILDCARD, kind), (WILDCARD, WILDCARD)):
+            entry = self._index.get((country, state, city, ward_key, type_key))
+            if entry is not None:
+                emails = clean_emails(entry)
+                if emails:
+                    self.counters["hits"] += 1
+                    return emails
+        self.counters["misses"] += 1
+        return None
+
+    def save(self, address, issue_type, emails, issue_id=None):
+        """Store confirmed contacts for this address and issue type. Returns False if nothing was saved."""
+        emails = clean_emails(emails)
+        key = directory_key(address, issue_type)
+        if emails is None or key[2] == WILDCARD:
+            return False
+        entry = dict(emails, confirmed_at=datetime.now().isoformat(), issue_id=issue_id)
+        try:
+            with self.lock.acquire(timeout=self.lock_timeout):
+                tree = self._read_tree()
+                node = tree
+                for name in key[:-1]:
+                    node = node.setdefault(name, {})
+                node[key[-1]] = entry
+                folder = os.path.dirname(self.path) or "."
+                os.makedirs(folder, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(tree, f, indent=4)
+                os.replace(tmp_path, self.path)
+        except Timeout:
+            print("Could not acquire lock on authority directory, contact not saved.")
+            return False
+        with self._guard:
+            self._index[key] = copy.deepcopy(entry)
+            self._mtime = self._current_mtime()
+        self.counters["saved"] += 1
+        return True
+
+    def stats(self):
+        stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = len(self._index)
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_authority_directory():
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            _directory = AuthorityDirectory(os.getenv("AUTHORITY_DIRECTORY_PATH",
+                                                      "authority_finder/data/city_authorities.json"))
+        return _directory
@@ -0,0 +1,148 @@
+# authority_finder/email_extractor.py
+import html
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+EMAIL_RE = re.compile(r"\b[a-z0-9][a-z0-9._%+\-]*@[a-z0-9\-]+(?:\.[a-z0-9\-]+)*\.[a-z]{2,}\b", re.IGNORECASE)
+
+# "name [at] mcd (dot) gov (dot) in", "name(at)mcd.nic.in", "name AT mcd DOT gov DOT in".
+# A bare "at" only counts when the domain spells out its dots too: "visit us at mcf.gov.in" is English
+_AT_RE = re.compile(r"\s*(?:[\[\(\{<]\s*(?:at|@)\s*[\]\)\}>]|\bat\b(?=\s*[a-z0-9\-]+\s*(?:[\[\(\{<]\s*dot\s*[\]\)\}>]|\bdot\b)))\s*",
+                    re.IGNORECASE)
+_DOT_RE = re.compile(r"\s*(?:[\[\(\{<]\s*dot\s*[\]\)\}>]|(?<=[a-z0-9])\s+dot\s+(?=[a-z]))\s*", re.IGNORECASE)
+
+GOV_DOMAINS = {".gov.in": 6, ".nic.in": 6, ".gov": 4, ".gov.uk": 4, ".org.in": 1}
+CIVIC_DOMAIN_WORDS = ("mcd", "municipal", "nagar", "nigam", "corporation", "bbmp", "ghmc", "pmc", "bmc",
+                      "pwd", "smartcity", "jalboard", "urban", "mcf", "mcg", "ndmc")
+FREE_MAIL = ("gmail.", "yahoo.", "hotmail.", "outlook.", "rediffmail.", "ymail.")
+JUNK = ("noreply", "no-reply", "donotreply", "webmaster", "example.", "sentry", "wixpress", "domain.com")
+CONTACT_WORDS = ("complaint", "grievance", "helpline", "contact", "email", "e-mail", "nodal", "officer",
+                 "engineer", "department", "redressal", "public health", "sanitation", "division")
+HIGHER_WORDS = ("commissioner", "secretary", "director", "mayor", "chief", "collector", "additional",
+                "superintending", "head of department", "hod")
+ISSUE_WORDS = {
+    "pothole": ("road", "pothole", "pwd", "engineering", "maintenance"),
+    "road": ("road", "pothole", "pwd", "engineering", "maintenance"),
+    "garbage": ("garbage", "waste", "sanitation", "swachh", "solid waste", "health"),
+    "streetlight": ("street light", "streetlight", "electrical", "lighting"),
+    "water": ("water", "jal", "sewer", "drainage", "leak"),
+    "drainage": ("drain", "sewer", "drainage", "storm water"),
+}
+CONTEXT_CHARS = 160
+
+
+def deobfuscate(text: str) -> str:
+    text = html.unescape(text).replace("＠", "@")
+    text = _AT_RE.sub("@", text)
+    return _DOT_RE.sub(".", text)
+
+
+@dataclass
+class Candidate:
+    email: str
+    score: float = 0.0
+    count: int = 0
+    higher: bool = False
+    contexts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ExtractionResult:
+    candidates: List[Candidate]
+    emails: Optional[Dict[str, str]]  # Main / CC / Higher Authority when confident, else None
+    llm_context: str  # short windows around the candidates, for the LLM fallback
+
+    @property
+    def confident(self) -> bool:
+        return self.emails is not None
+
+
+class EmailExtractor:
+    """
+    Finds authority email addresses in crawled page text without an LLM.
+
+    Addresses are pulled out with a regex after undoing common obfuscations, then
+    scored by their domain (.gov.in, .nic.in, civic body names) and by the words around
+    each occurrence (complaint/grievance, the issue type, the city, officer titles).
+    A clear winner is returned as the usual Main / CC / Higher Authority dict; otherwise
+    only the text windows around the candidates are handed to the LLM.
+    """
+
+    def __init__(self, min_score: float = 9.0, min_margin: float = 2.0, context_budget: int = 6000):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.context_budget = context_budget
+
+    def _domain_score(self, email: str, city: str) -> float:
+        local, domain = email.split("@", 1)
+        score = max((s for suffix, s in GOV_DOMAINS.items() if domain.endswith(suffix)), default=0)
+        if any(word in domain for word in CIVIC_DOMAIN_WORDS):
+            score += 3
+        if city and city.replace(" ", "") in domain:
+            score += 2
+        if domain.startswith(FREE_MAIL):
+            score -= 2
+        if any(word in local for word in ("complaint", "grievance", "helpdesk", "helpline", "pgcell")):
+            score += 1
+        return score
+
+    def _context_score(self, context: str, issue_words, city: str):
+        score = 0.0
+        score += min(sum(1 for w in CONTACT_WORDS if w in context), 3)
+        score += 2 * min(sum(1 for w in issue_words if w in context), 2)
+        if city and city in context:
+            score += 1
+        return score
+
+    def candidates(self, text: str, issue_type: str = "", city: str = "") -> List[Candidate]:
+        text = deobfuscate(text)
+        lowered = text.lower()
+        city = (city or "").strip().lower()
+        issue_words = ISSUE_WORDS.get((issue_type or "").strip().lower(), ((issue_type or "").strip().lower(),))
+        found: Dict[str, Candidate] = {}
+        for match in EMAIL_RE.finditer(text):
+            email = match.group(0).lower().rstrip(".")
+            if any(j in email for j in JUNK) or email.endswith((".png", ".jpg", ".gif", ".svg", ".webp")):
+                continue
+            start, end = max(0, match.start() - CONTEXT_CHARS), min(len(text), match.end() + CONTEXT_CHARS)
+            context_score = self._context_score(lowered[start:end], issue_words, city)
+            # Titles right before the address ("Commissioner: ...") mark an escalation contact
+            higher = any(w in lowered[max(0, match.start() - 60):match.start()] for w in HIGHER_WORDS)
+            candidate = found.get(email)
+            if candidate is None:
+                candidate = found[email] = Candidate(email, score=self._domain_score(email, city))
+            candidate.count += 1
+            # Best context counts fully, repeats add a little
+            if candidate.count == 1:
+                candidate.score += context_score
+            else:
+                candidate.score += min(context_score, 1.0)
+            candidate.higher = candidate.higher or higher
+            if len(candidate.contexts) < 2:
+                candidate.contexts.append(" ".join(text[start:end].split()))
+        return sorted(found.values(), key=lambda c: (-c.score, c.email))
+
+    def extract(self, text: str, issue_type: str = "", city: str = "") -> ExtractionResult:
+        ranked = self.candidates(text, issue_type, city)
+        emails = None
+        if ranked and ranked[0].score >= self.min_score and \
+                (len(ranked) == 1 or ranked[0].score - ranked[1].score >= self.min_margin):
+            main = ranked[0]
+            rest = [c for c in ranked[1:] if c.score >= self.min_score / 2]
+            higher = next((c for c in rest if c.higher), None)
+            cc = next((c for c in rest if c is not higher), None)
+            emails = {
+                "Main": main.email,
+                "CC": cc.email if cc else "None",
+                "Higher Authority": higher.email if higher else "None",
+            }
+
+        parts, used = [], 0
+        for candidate in ranked:
+            for context in candidate.contexts:
+                if used + len(context) > self.context_budget:
+                    break
+                parts.append(context)
+                used += len(context)
+        return ExtractionResult(ranked, emails, "\n...\n".join(parts))
@@ -1,25 +1,38 @@
 import os
-import google.generativeai as genai
+from authority_finder.directory import get_authority_directory
+from authority_finder.email_extractor import EmailExtractor
+from authority_finder.tools.search_executor import ConcurrentSearchExecutor
 from authority_finder.tools.tavily_search import TavilySearchTool
+from src.llm_cache import get_llm_cache
+from src.llm_gateway import consume, get_llm_gateway
 from authority_finder.tools.web_crawler import WebCrawler
 from dotenv import load_dotenv
 
 
 class Authority_Finder():
     def __init__(self):
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-04-17')
+        # Shared Gemini client: concurrency cap, quotas, retries and deadlines (src/llm_gateway.py)
+        self.model = get_llm_gateway()
+        # Responses memoized by model + prompt hash (see src/llm_cache.py)
+        self.llm_cache = get_llm_cache()
 
         # Initialize tools
         self.search_tool = TavilySearchTool()
+        # All generated queries are searched in parallel; stop waiting once there is enough text
+        self.search_executor = ConcurrentSearchExecutor(
+            self.search_tool.get_sources,
+            max_workers=int(os.getenv("SEARCH_MAX_WORKERS", "5")),
+            query_timeout=float(os.getenv("SEARCH_QUERY_TIMEOUT", "15")),
+            enough_chars=int(os.getenv("SEARCH_ENOUGH_CHARS", "60000")),
+        )
+        # Confirmed contacts, checked before any Gemini / Tavily call
+        self.directory = get_authority_directory()
+        # Regex + scoring pass over the search results before asking Gemini
+        self.email_extractor = EmailExtractor()
 
 
 
-    def generate_search_queries(self, state, num_queries=5):
+    def generate_search_queries(self, state, num_queries=5, force_refresh=False):
         Metadata = state['metadata']
         address = Metadata['Address']
         neighbourhood=address.get("neighbourhood","Unknown neighbourhood")
@@ -51,11 +64,11 @@ class Authority_Finder():
                 ["road repair complaint contact MCD Delhi", "how to report pothole BBMP Bangalore", ...]
                 """
 
-        response = self.model.generate_content(prompt)
+        response_text = self.llm_cache.generate(self.model, prompt, site="authority_queries",
+                                                force_refresh=force_refresh)
 
         try:
             # Extract the list of queries from the response
-            response_text = response.text
             # Clean up the response to extract just the list
             if "[" in response_text and "]" in response_text:
                 queries_str = response_text[response_text.find("["):response_text.rfind("]") + 1]
@@ -73,15 +86,16 @@ class Authority_Finder():
     def extract_relevant_info(self, queries):
         content_blocks = []
 
-        for query in queries:
-            sources = self.search_tool.get_sources(query)  # <— cleaner than raw .search()
+        # Results come back in query order, so the combined text is the same from run to run
+        for sources in self.search_executor.run(queries or []):
             for src in sources:
                 content_blocks.append(src["content"])
-
+        print(self.search_executor.report())
 
         return content_blocks
 
-    def find_mail(self, content, issue_type):
+    def find_mail(self, content, issue_type, force_refresh=False, stream=False):
+        """Gemini's categorized Main/CC/Higher Authority answer; with stream=True a generator of text chunks."""
 
         prompt = f"""
                 Extract the most likely **official email addresses** from the following text.
@@ -110,8 +124,9 @@ class Authority_Finder():
                 Return the categorized list exactly in the format shown. If none are found, return "None".
                 """
 
-        response = self.model.generate_content(prompt)
-        return response.text
+        if stream:
+            return self.llm_cache.stream(self.model, prompt, site="authority_emails", force_refresh=force_refresh)
+        return self.llm_cache.generate(self.model, prompt, site="authority_emails", force_refresh=force_refresh)
 
     def extract_email_dict(self, text):
         result = {}
@@ -124,9 +139,17 @@ class Authority_Finder():
         return result
 
 
-    def get_email_data(self, state):
+    def get_email_data(self, state, use_directory=True, force_refresh=False, on_chunk=None):
+        # on_chunk(text_so_far) is called while Gemini's answer streams in (dashboard progress)
+        address = (state.get('metadata') or {}).get('Address') or {}
+        if use_directory:
+            known = self.directory.lookup(address, state.get("issue_type"))
+            if known:
+                print("\n📒 Authority found in local directory.")
+                return known
+
         # print("\n🧠 Generating search queries...")
-        queries = self.generate_search_queries(state, num_queries=5)
+        queries = self.generate_search_queries(state, num_queries=5, force_refresh=force_refresh)
         # pprint(queries)
 
         print("\n🔍 Extracting content using Tavily...")
@@ -136,7 +159,18 @@ class Authority_Finder():
         combined_content = "\n\n".join(pages)  # assuming list of strings
         issue_type=state["issue_type"]
         print("\n📬 Finding email from content...")
-        mail_string=self.find_mail(combined_content, issue_type)
+        found = self.email_extractor.extract(combined_content, issue_type, address.get("city", ""))
+        if found.confident:
+            print(f"Emails picked locally from {len(found.candidates)} candidates, no LLM call needed.")
+            return found.emails
+        # Only the text around candidate addresses goes to Gemini, not whole pages. With no candidate
+        # at all the address is in a form the regex missed, so the full content is sent as before
+        content = found.llm_context or combined_content
+        if on_chunk is not None:
+            mail_string = consume(self.find_mail(content, issue_type, force_refresh=force_refresh, stream=True),
+                                  on_chunk)
+        else:
+            mail_string=self.find_mail(content, issue_type, force_refresh=force_refresh)
         return self.extract_email_dict(mail_string)
 
 
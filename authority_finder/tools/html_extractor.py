@@ -0,0 +1,217 @@
+# authority_finder/tools/html_extractor.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# Never visible or pure site chrome. Header/footer are kept on purpose:
+# government portals put their contact emails there.
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "nav", "aside", "button", "select",
+             "option", "canvas", "map", "object"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+FEED_CHUNK = 32 * 1024
+DEFAULT_MAX_CHARS = 10000
+
+
+class _TextCollector:
+    """
+    Parser target shared by the lxml and stdlib backends: keeps the title and the text
+    outside SKIP_TAGS, and reports `done` once max_chars of text has been collected.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.size = 0
+        self.skip_depth = 0
+        self.in_title = False
+        self.title_parts: List[str] = []
+        self.done = False
+
+    def start(self, tag, attrib=None):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "title":
+            self.in_title = True
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "title":
+            self.in_title = False
+
+    def data(self, text):
+        if self.in_title:
+            self.title_parts.append(text)
+            return
+        if self.skip_depth or self.done:
+            return
+        words = text.split()
+        if words:
+            chunk = " ".join(words)
+            self.parts.append(chunk)
+            self.size += len(chunk) + 1
+            if self.size >= self.max_chars:
+                self.done = True
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return self.result()
+
+    def result(self) -> Tuple[str, str]:
+        title = " ".join(" ".join(self.title_parts).split()) or "No title found"
+        return title, " ".join(self.parts)[:self.max_chars]
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector: _TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_TAGS:
+            self.collector.start(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def _feed(feed, html: str, collector: _TextCollector):
+    # Stream the document in chunks and stop parsing once the budget is filled
+    for start in range(0, len(html), FEED_CHUNK):
+        feed(html[start:start + FEED_CHUNK])
+        if collector.done:
+            break
+
+
+def extract_stdlib(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> Tuple[str, str]:
+    collector = _TextCollector(max_chars)
+    parser = _StdlibParser(collector)
+    _feed(parser.feed, html, collector)
+    if not collector.done:
+        parser.close()
+    return collector.result()
+
+
+def extract_lxml(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> Tuple[str, str]:
+    from lxml import etree
+
+    collector = _TextCollector(max_chars)
+    # Target parser: libxml2 calls start/end/data as it tokenizes, no tree is built
+    parser = etree.HTMLParser(target=collector, remove_comments=True, recover=True)
+    _feed(parser.feed, html, collector)
+    if not collector.done:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+    return collector.result()
+
+
+def extract_selectolax(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> Tuple[str, str]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first("title")
+    title = " ".join(title_node.text().split()) if title_node is not None else ""
+    tree.strip_tags(list(SKIP_TAGS))
+    parts, size = [], 0
+    root = tree.body or tree.root
+    if root is not None:
+        # Walk text nodes in document order and stop at the budget instead of building all the text
+        for node in root.traverse(include_text=True):
+            if node.tag != "-text":
+                continue
+            words = node.text_content.split()
+            if words:
+                chunk = " ".join(words)
+                parts.append(chunk)
+                size += len(chunk) + 1
+                if size >= max_chars:
+                    break
+    return title or "No title found", " ".join(parts)[:max_chars]
+
+
+def extract_bs4(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> Tuple[str, str]:
+    """The original WebCrawler.fetch_page path, kept for comparison in the benchmark."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.string if soup.title else "No title found"
+    for script in soup(["script", "style"]):
+        script.extract()
+    content = soup.get_text(separator=' ', strip=True)
+    return title, ' '.join(content.split())[:max_chars]
+
+
+BACKENDS = {
+    "selectolax": extract_selectolax,
+    "lxml": extract_lxml,
+    "stdlib": extract_stdlib,
+    "bs4": extract_bs4,
+}
+
+
+def available_backend(preferred: Optional[str] = None) -> str:
+    """The preferred backend if importable, else the fastest installed one (stdlib always works)."""
+    candidates = [preferred] if preferred else []
+    candidates += ["selectolax", "lxml", "stdlib"]
+    for name in candidates:
+        try:
+            if name == "selectolax":
+                import selectolax.lexbor  # noqa: F401
+            elif name == "lxml":
+                import lxml.etree  # noqa: F401
+            elif name not in BACKENDS:
+                continue
+            return name
+        except ImportError:
+            continue
+    return "stdlib"
+
+
+def html_to_text(html: str, max_chars: int = DEFAULT_MAX_CHARS, backend: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Title and visible text of an HTML document, truncated to max_chars.
+
+    Returns:
+        Tuple of (title, content)
+    """
+    name = available_backend(backend or os.getenv("HTML_EXTRACTOR"))
+    return BACKENDS[name](html, max_chars)
+
+
+class ExtractorPool:
+    """html_to_text on a process pool, so parsing many pages uses every core instead of one."""
+
+    def __init__(self, max_workers: Optional[int] = None, backend: Optional[str] = None,
+                 max_chars: int = DEFAULT_MAX_CHARS):
+        self.backend = available_backend(backend or os.getenv("HTML_EXTRACTOR"))
+        self.max_chars = max_chars
+        self.max_workers = max_workers
+        self._pool = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, html: str):
+        return self.executor.submit(BACKENDS[self.backend], html, self.max_chars)
+
+    def map(self, htmls: List[str]) -> List[Tuple[str, str]]:
+        return list(self.executor.map(BACKENDS[self.backend], htmls, [self.max_chars] * len(htmls),
+                                      chunksize=4))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,113 @@
+# authority_finder/tools/search_cache.py
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from src.sqlite_helper import SQLiteDB
+
+_TOKEN_RE = re.compile(r"[\w@.\-]+")
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace, punctuation and word order: "MCD Delhi pothole" == "pothole  mcd, delhi"."""
+    return " ".join(sorted(set(_TOKEN_RE.findall(query.lower()))))
+
+
+def cache_key(query: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps({"q": normalize_query(query), "p": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Persistent cache of search API responses.
+
+    Bodies are stored zlib-compressed. Entries expire after `ttl_seconds`, and once the
+    stored bodies exceed `max_bytes` the least recently used ones are evicted.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS search_cache (
+        cache_key   TEXT PRIMARY KEY,
+        query       TEXT NOT NULL,
+        body        BLOB NOT NULL,
+        size        INTEGER NOT NULL,
+        created_at  REAL NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access);
+    """
+
+    def __init__(self, db_path: str = "cache/search_cache.db", ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 200 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.counters = {"hits": 0, "misses": 0, "stored_bytes_raw": 0, "stored_bytes_compressed": 0}
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def get(self, query: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = cache_key(query, params)
+        row = self.db.query_one("SELECT body, created_at FROM search_cache WHERE cache_key = ?", (key,))
+        now = time.time()
+        if row is None or now - row["created_at"] > self.ttl_seconds:
+            self._count("misses")
+            return None
+        self.db.execute("UPDATE search_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+        self._count("hits")
+        return json.loads(zlib.decompress(row["body"]))
+
+    def put(self, query: str, params: Dict[str, Any], response: Dict[str, Any]):
+        raw = json.dumps(response).encode("utf-8")
+        body = zlib.compress(raw, 6)
+        now = time.time()
+        self.db.execute(
+            """
+            INSERT OR REPLACE INTO search_cache (cache_key, query, body, size, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (cache_key(query, params), query, body, len(body), now, now),
+        )
+        self._count("stored_bytes_raw", len(raw))
+        self._count("stored_bytes_compressed", len(body))
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % 50 == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until the cache fits in max_bytes."""
+        conn = self.db.connection()
+        with conn:
+            conn.execute("DELETE FROM search_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes
+            freed = 0
+            doomed = []
+            for key, size in conn.execute("SELECT cache_key, size FROM search_cache ORDER BY last_access"):
+                doomed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM search_cache WHERE cache_key = ?", doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+        row = self.db.query_one("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache")
+        stats["entries"], stats["bytes"] = row[0], row[1]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
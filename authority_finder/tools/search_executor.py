@@ -0,0 +1,106 @@
+# authority_finder/tools/search_executor.py
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+
+class ConcurrentSearchExecutor:
+    """
+    Runs several search queries at once on a bounded thread pool.
+
+    - every query gets its own timeout, measured from when the batch started
+    - once the first k queries (in query order) have finished with `enough_chars` of content
+      between them, the rest are abandoned and their results dropped even if they already arrived
+    - results always come back in query order, whatever order they finished in; with the cutoff
+      applied over that order, the same responses give the same text whatever the timing
+    - per-query latency and outcome are kept in `last_stats`
+    """
+
+    def __init__(self, search_fn: Callable[[str], List[Dict[str, str]]], max_workers: int = 5,
+                 query_timeout: float = 15.0, enough_chars: Optional[int] = None):
+        self.search_fn = search_fn
+        self.query_timeout = query_timeout
+        self.enough_chars = enough_chars
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+        self.last_stats: List[Dict] = []
+
+    def _timed_search(self, query: str):
+        start = time.perf_counter()
+        sources = self.search_fn(query)
+        return sources, time.perf_counter() - start
+
+    def run(self, queries: List[str]) -> List[List[Dict[str, str]]]:
+        """
+        Search every query concurrently.
+
+        Returns:
+            One list of sources per query, in the order of `queries`. Queries that
+            failed, timed out or were cancelled give an empty list.
+        """
+        started = time.perf_counter()
+        deadline = started + self.query_timeout
+        futures = {self.pool.submit(self._timed_search, q): i for i, q in enumerate(queries)}
+        results: List[List[Dict[str, str]]] = [[] for _ in queries]
+        stats = [{"query": q, "status": "pending", "latency": None, "sources": 0} for q in queries]
+        cutoff = None
+
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures[future]
+                try:
+                    sources, latency = future.result()
+                except Exception as e:
+                    stats[i].update(status="error", latency=time.perf_counter() - started, error=str(e))
+                    continue
+                results[i] = sources
+                stats[i].update(status="ok", latency=latency, sources=len(sources))
+            cutoff = self._cutoff(results, stats)
+            if cutoff is not None:
+                break
+
+        if cutoff is not None:
+            # Queries after the cutoff are dropped whether or not they already finished
+            for i in range(cutoff + 1, len(queries)):
+                if stats[i]["status"] in ("ok", "error"):
+                    results[i] = []
+                    stats[i].update(status="unused", sources=0)
+
+        for future in pending:
+            i = futures[future]
+            # Not started yet: dropped. Already running: left to finish in the background, result ignored.
+            future.cancel()
+            timed_out = time.perf_counter() >= deadline
+            stats[i].update(status="timeout" if timed_out else "cancelled",
+                            latency=time.perf_counter() - started)
+
+        self.last_stats = stats
+        return results
+
+    def _cutoff(self, results, stats) -> Optional[int]:
+        """Index of the last query needed: the shortest finished prefix with enough_chars of content."""
+        if not self.enough_chars:
+            return None
+        collected = 0
+        for i, s in enumerate(stats):
+            if s["status"] == "pending":
+                return None
+            collected += sum(len(source.get("content") or "") for source in results[i])
+            if collected >= self.enough_chars:
+                return i
+        return None
+
+    def report(self) -> str:
+        """Per-query latency of the last run, slowest first."""
+        lines = []
+        for s in sorted(self.last_stats, key=lambda s: -(s["latency"] or 0)):
+            latency = f"{s['latency']:.2f}s" if s["latency"] is not None else "-"
+            lines.append(f"{latency:>8}  {s['status']:<9} {s['sources']} sources  {s['query']}")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
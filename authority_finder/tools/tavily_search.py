@@ -4,6 +4,8 @@ from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
 from tavily import TavilyClient
 
+from authority_finder.tools.search_cache import SearchCache
+
 load_dotenv()
 
 
@@ -12,7 +14,7 @@ class TavilySearchTool:
     A tool for performing web searches using the Tavily API.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[SearchCache] = None, lean: Optional[bool] = None):
         # Get API key from environment variables
         api_key = os.getenv("TAVILY_API_KEY")
         if not api_key:
@@ -21,7 +23,17 @@ class TavilySearchTool:
         # Initialize the Tavily client
         self.client = TavilyClient(api_key=api_key)
 
-    def search(self, query: str, max_results: int = 5, search_depth: str = "basic") -> Dict[str, Any]:
+        # Responses are cached on disk; similar queries from the same ward share an entry
+        self.cache = cache if cache is not None else SearchCache(
+            db_path=os.getenv("SEARCH_CACHE_PATH", "cache/search_cache.db"),
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_HOURS", "168")) * 3600,
+            max_bytes=int(float(os.getenv("SEARCH_CACHE_MAX_MB", "200")) * 1024 * 1024),
+        )
+        # Lean mode: don't ask for raw page content when callers only use the "content" snippet
+        self.lean = lean if lean is not None else os.getenv("SEARCH_LEAN_MODE", "true").lower() == "true"
+
+    def search(self, query: str, max_results: int = 5, search_depth: str = "basic",
+               include_raw_content: Optional[bool] = None) -> Dict[str, Any]:
         """
         Perform a search using Tavily API.
 
@@ -29,10 +41,18 @@ class TavilySearchTool:
             query: The search query
             max_results: Maximum number of results to return
             search_depth: How deep to search ("basic", "advanced")
+            include_raw_content: Ask for full page text (defaults to off in lean mode)
 
         Returns:
             Dictionary containing search results and related information
         """
+        if include_raw_content is None:
+            include_raw_content = not self.lean
+        params = {"max_results": max_results, "search_depth": search_depth,
+                  "include_raw_content": include_raw_content}
+        cached = self.cache.get(query, params)
+        if cached is not None:
+            return cached
         try:
             # Perform the search using Tavily
             response = self.client.search(
@@ -40,10 +60,11 @@ class TavilySearchTool:
                 search_depth=search_depth,
                 max_results=max_results,
                 include_answer=True,
-                include_raw_content=True,
+                include_raw_content=include_raw_content,
                 include_images=False
             )
-
+            # Errors are returned below and never cached
+            self.cache.put(query, params, response)
             return response
         except Exception as e:
             print(f"Error during Tavily search: {e}")
@@ -65,7 +86,8 @@ class TavilySearchTool:
         Returns:
             List of sources with title, url and content
         """
-        response = self.search(query, max_results)
+        # Only title and content are used here, so raw page content is never needed
+        response = self.search(query, max_results, include_raw_content=False)
 
         sources = []
         if "results" in response:
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark: per-pair SimilarIssueFinder._haversine loop vs the vectorized geo_distance module.
+
+Usage:
+    python -m benchmarks.bench_haversine
+"""
+import time
+
+import numpy as np
+
+from src.manage_issue.Similar_issue_finder import SimilarIssueFinder
+from src.manage_issue.geo_distance import CandidateSet, pairs_within
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def per_pair_loop(haversine, lat, lon, lats, lons, types, issue_type, threshold):
+    best = None
+    for i in range(len(lats)):
+        if types[i] != issue_type:
+            continue
+        dist = haversine(lat, lon, lats[i], lons[i])
+        if dist <= threshold and (best is None or dist < best[1]):
+            best = (i, dist)
+    return best
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rng = np.random.default_rng(42)
+    haversine = SimilarIssueFinder.__new__(SimilarIssueFinder)._haversine
+    lat, lon = 28.6139, 77.2090
+    print(f"{'points':>10} {'loop (s)':>10} {'numpy (s)':>10} {'speedup':>8}")
+    for size in SIZES:
+        lats = lat + rng.uniform(-0.5, 0.5, size)
+        lons = lon + rng.uniform(-0.5, 0.5, size)
+        types = rng.choice(["pothole", "garbage", "streetlight"], size).tolist()
+        ids = [str(i) for i in range(size)]
+
+        lats_list, lons_list = lats.tolist(), lons.tolist()
+        loop_time, loop_best = timed(
+            lambda: per_pair_loop(haversine, lat, lon, lats_list, lons_list, types, "pothole", 2500),
+            repeat=1 if size >= 1_000_000 else 3,
+        )
+        candidates = CandidateSet(ids, lats, lons, types)
+        numpy_time, numpy_best = timed(lambda: candidates.nearest(lat, lon, "pothole", 2500))
+
+        assert loop_best is None or numpy_best[0] == ids[loop_best[0]]
+        print(f"{size:>10} {loop_time:>10.4f} {numpy_time:>10.4f} {loop_time / numpy_time:>7.1f}x")
+
+    # Many-to-many pass used for bulk re-clustering
+    size = 5_000
+    lats = lat + rng.uniform(-0.5, 0.5, size)
+    lons = lon + rng.uniform(-0.5, 0.5, size)
+    batch_time, (i, _, _) = timed(lambda: pairs_within(lats, lons, lats, lons, 250), repeat=1)
+    print(f"many-to-many {size}x{size}: {batch_time:.2f}s, {len(i)} pairs within 250m")
+
+
+if __name__ == "__main__":
+    main()
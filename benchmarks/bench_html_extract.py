@@ -0,0 +1,123 @@
+"""
+Benchmark: HTML-to-text backends of authority_finder/tools/html_extractor.py against the original
+BeautifulSoup(html.parser) + get_text path, on heavy government-portal style pages.
+
+Reports throughput and peak Python heap (tracemalloc; memory held inside lxml/lexbor's C code
+is not traced, so their figures are lower bounds).
+
+Usage:
+    python -m benchmarks.bench_html_extract                  # synthesizes a corpus of 40 portal pages
+    python -m benchmarks.bench_html_extract path/to/saved    # or use your own saved *.html pages
+"""
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from authority_finder.tools.html_extractor import BACKENDS, ExtractorPool, available_backend
+
+PAGES = 40
+MAX_CHARS = 10000
+WORDS = ("municipal corporation ward office complaint road repair sanitation engineer division zone "
+         "department citizen services grievance redressal property tax water supply drainage notice "
+         "tender circular order public works schedule officer contact helpline").split()
+
+
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def portal_page(rng):
+    """A page shaped like a state/municipal portal: huge menus, inline scripts, long tables."""
+    parts = ["<!DOCTYPE html><html><head><title>Municipal Corporation - Contact Directory</title>"]
+    parts.append("<style>" + "".join(f".c{i}{{margin:{i}px;color:#{i:06x}}}" for i in range(800)) + "</style>")
+    parts.append("<script>var config = " + str([rng.random() for _ in range(3000)]) + ";</script></head><body>")
+    parts.append("<header><div class='logo'>Government of State</div><div>Citizen Helpline 1800-000-000</div></header>")
+    parts.append("<nav><ul>" + "".join(
+        f"<li><a href='/m/{i}'>{sentence(rng, 3)}</a><ul>" + "".join(
+            f"<li><a href='/m/{i}/{j}'>{sentence(rng, 2)}</a></li>" for j in range(20)) + "</ul></li>"
+        for i in range(40)) + "</ul></nav>")
+    parts.append("<main><h1>Contact Directory</h1>")
+    for section in range(25):
+        parts.append(f"<h2>Zone {section}</h2><p>{sentence(rng, 40)}</p><table>")
+        for row in range(30):
+            parts.append(f"<tr><td>{sentence(rng, 3)}</td><td>ee{section}{row}[at]mc(dot)gov(dot)in</td>"
+                         f"<td>{rng.randint(1000000, 9999999)}</td></tr>")
+        parts.append("</table><script>track('zone%d')</script>" % section)
+    parts.append("</main><aside>" + "".join(f"<p>{sentence(rng)}</p>" for _ in range(50)) + "</aside>")
+    parts.append("<footer>Commissioner: commissioner[at]mc(dot)gov(dot)in</footer></body></html>")
+    return "".join(parts)
+
+
+def load_corpus(folder):
+    paths = sorted(glob.glob(os.path.join(folder, "*.html")) + glob.glob(os.path.join(folder, "*.htm")))
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def synthesize(folder, count=PAGES):
+    rng = random.Random(7)
+    for i in range(count):
+        with open(os.path.join(folder, f"portal_{i:02d}.html"), "w", encoding="utf-8") as f:
+            f.write(portal_page(rng))
+    return load_corpus(folder)
+
+
+def measure(fn, pages):
+    start = time.perf_counter()
+    for html in pages:
+        fn(html, MAX_CHARS)
+    elapsed = time.perf_counter() - start
+    # Separate pass: tracemalloc slows allocation-heavy parsers down a lot
+    tracemalloc.start()
+    for html in pages[:5]:
+        fn(html, MAX_CHARS)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = load_corpus(sys.argv[1])
+    else:
+        folder = tempfile.mkdtemp()
+        pages = synthesize(folder)
+        print(f"synthesized corpus in {folder}")
+    total_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+    print(f"{len(pages)} pages, {total_mb:.1f} MB of HTML, budget {MAX_CHARS} chars\n")
+
+    # How many contact addresses make it into the budgeted text (menus and scripts crowd them out)
+    print(f"{'backend':>18} {'pages/s':>9} {'MB/s':>8} {'peak heap MB':>13} {'contacts':>10}")
+    baseline = None
+    for name in ("bs4", "stdlib", "lxml", "selectolax"):
+        if name != "bs4" and available_backend(name) != name:
+            print(f"{name:>18} not installed")
+            continue
+        fn = BACKENDS[name]
+        elapsed, peak = measure(fn, pages)
+        baseline = baseline or elapsed
+        contacts = fn(pages[0], MAX_CHARS)[1].count("[at]")
+        print(f"{name:>18} {len(pages) / elapsed:>9.1f} {total_mb / elapsed:>8.1f} {peak / 1e6:>13.1f} "
+              f"{contacts:>10}  ({baseline / elapsed:.1f}x)")
+
+    workers = os.cpu_count() or 1
+    pool = ExtractorPool(max_workers=workers)
+    pool.map(pages[:workers])  # start the workers before timing
+    start = time.perf_counter()
+    pool.map(pages)
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    label = f"{pool.backend} x{workers}"
+    print(f"{label:>18} {len(pages) / elapsed:>9.1f} {total_mb / elapsed:>8.1f} {'-':>13} {'':>10}  "
+          f"({baseline / elapsed:.1f}x, process pool)")
+
+
+if __name__ == "__main__":
+    main()
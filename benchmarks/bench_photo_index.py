@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: Hamming-radius lookups in the multi-index PhotoIndex vs a linear scan,
+at 100k stored perceptual hashes.
+
+Usage:
+    python -m benchmarks.bench_photo_index
+"""
+import os
+import random
+import tempfile
+import time
+
+from src.manage_issue.photo_index import PhotoIndex, hash_to_hex
+
+STORED = 100_000
+QUERIES = 2_000
+RADIUS = 10
+
+
+def near(rng, value, bits):
+    for bit in rng.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def main():
+    rng = random.Random(42)
+    hashes = [rng.getrandbits(64) for _ in range(STORED)]
+    # Half the queries are edited copies of stored photos, half are new photos
+    queries = [near(rng, rng.choice(hashes), rng.randint(0, RADIUS)) for _ in range(QUERIES // 2)]
+    queries += [rng.getrandbits(64) for _ in range(QUERIES // 2)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        index = PhotoIndex(os.path.join(folder, "photo_index.db"), max_distance=RADIUS)
+        start = time.perf_counter()
+        index.rebuild(("active", {"issue_id": f"issue_{i}", "image_paths": [f"{i}.jpg"],
+                                  "image_phashes": [hash_to_hex(value)]})
+                      for i, value in enumerate(hashes))
+        print(f"built index of {index.count()} hashes in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        indexed = [len(index.search(q)) for q in queries]
+        indexed_time = (time.perf_counter() - start) / len(queries)
+
+        sample = queries[:100] + queries[-100:]
+        start = time.perf_counter()
+        scanned = [sum(1 for h in hashes if (h ^ q).bit_count() <= RADIUS) for q in sample]
+        scan_time = (time.perf_counter() - start) / len(sample)
+
+        assert scanned == indexed[:100] + indexed[-100:]
+        print(f"{'method':>12} {'per lookup (ms)':>16}")
+        print(f"{'linear scan':>12} {scan_time * 1000:>16.3f}")
+        print(f"{'multi-index':>12} {indexed_time * 1000:>16.3f}")
+        print(f"speedup {scan_time / indexed_time:.0f}x, {sum(1 for n in indexed if n)} of {len(queries)} queries matched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: cold start and rerun time of each Streamlit page.
+
+Every page runs in a fresh Python process through Streamlit's AppTest harness:
+- cold: the first run, i.e. imports plus building the components the page touches
+- rerun: the same session run again, which is what every widget interaction costs
+Also lists which heavy modules (genai, tweepy, pandas ...) ended up imported.
+
+No network calls are made. Missing credentials are filled with dummy values, since
+clients are only built, never used.
+
+Usage:
+    python -m benchmarks.bench_startup [page ...]
+"""
+import json
+import os
+import subprocess
+import sys
+
+PAGES = ["main.py", "pages/_1_User_Dashboard.py", "pages/_2_Admin_Dashboard.py",
+         "pages/_3_Analytics_Dashboard.py", "pages/_4_Live_Demo.py"]
+# plotly is left out: streamlit itself imports it
+HEAVY = ["google.generativeai", "tweepy", "pandas", "tavily", "aiohttp", "geopy"]
+DUMMY_ENV = {"GOOGLE_API_KEY": "x", "TAVILY_API_KEY": "x", "TWITTER_API_KEY": "x", "TWITTER_API_SECRET": "x",
+             "TWITTER_ACCESS_TOKEN": "x", "TWITTER_ACCESS_SECRET": "x", "EMAIL_PORT": "587"}
+
+RUNNER = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+page, heavy = sys.argv[1], sys.argv[2].split(",")
+at = AppTest.from_file(page, default_timeout=120)
+at.session_state["admin_logged_in"] = True
+start = time.perf_counter()
+at.run()
+cold = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+errors = [str(e.value)[:120] for e in at.exception]
+print(json.dumps({"cold": cold, "rerun": rerun, "errors": errors,
+                  "heavy": [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def measure(page):
+    env = dict(DUMMY_ENV, **os.environ)
+    env["PYTHONPATH"] = os.getcwd() + os.pathsep + env.get("PYTHONPATH", "")
+    out = subprocess.run([sys.executable, "-c", RUNNER, page, ",".join(HEAVY)], capture_output=True,
+                         text=True, env=env)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def main():
+    pages = sys.argv[1:] or PAGES
+    print(f"{'page':>32} {'cold s':>8} {'rerun s':>8}  heavy modules imported")
+    for page in pages:
+        result = measure(page)
+        if "error" in result:
+            print(f"{page:>32}  failed: {result['error']}")
+            continue
+        note = f"  ({len(result['errors'])} page errors)" if result["errors"] else ""
+        print(f"{page:>32} {result['cold']:>8.2f} {result['rerun']:>8.3f}  {', '.join(result['heavy']) or '-'}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Resolve authority contacts once per (location, issue type) group instead of once per issue.
+
+Issues whose metadata_review was approved all need the same Gemini + Tavily lookup when they
+share a city, ward and issue type. The resolver groups them, runs get_email_data for one
+member of each group and copies the result to every member.
+
+Usage (e.g. from cron):
+    python -m coordinator.authority_batch [--dry-run] [--every MINUTES]
+"""
+import argparse
+import time
+from collections import OrderedDict
+
+from authority_finder.directory import directory_key
+from coordinator.prefetch import valid_draft
+
+STAGE = "metadata_review"
+NEXT_STAGE = "authority_review"
+
+
+def group_key(state):
+    """(country, state, city, ward, issue_type), normalized like the authority directory."""
+    address = (state.get("metadata") or {}).get("Address") or {}
+    return directory_key(address, state.get("issue_type"))
+
+
+class AuthorityBatchResolver:
+    def __init__(self, issue_handler, authority_mapper):
+        self.issue_handler = issue_handler
+        self.authority_mapper = authority_mapper
+        self.last_report = None
+
+    def pending(self):
+        """Active issues approved at metadata_review that still have no authority lookup."""
+        return [state for state in self.issue_handler.query_issues("active", admin_stage=STAGE)
+                if state["approvals"].get(STAGE) is True]
+
+    @staticmethod
+    def group(states):
+        groups = OrderedDict()
+        for state in sorted(states, key=lambda s: s["issue_id"]):
+            groups.setdefault(group_key(state), []).append(state)
+        return groups
+
+    def _fresh(self, state, key):
+        """
+        The member as stored now, or None if it has moved on or its address/type was edited.
+        The lookup can take a while; writing back the state loaded before it would undo
+        similar-report merges, admin edits and prefetch drafts saved in the meantime.
+        """
+        folder, current = self.issue_handler.find_issue(state["issue_id"])
+        if folder != "active" or current.get("admin_stage") != STAGE or group_key(current) != key:
+            return None
+        return current
+
+    def _promote(self, members, key, emails):
+        for member in members:
+            state = self._fresh(member, key)
+            if state is None:
+                continue
+            state["Authority_info"]["Email"] = emails
+            state["Authority_draft"] = None
+            state["errors"].pop("authority", None)
+            state["admin_stage"] = NEXT_STAGE
+            self.issue_handler.update_issue(state)
+
+    def _record_error(self, members, key, message):
+        for member in members:
+            state = self._fresh(member, key)
+            if state is not None:
+                state["errors"]["authority"] = message
+                self.issue_handler.update_issue(state)
+
+    def resolve(self, states=None, dry_run=False):
+        """
+        Look up each group once and fan the contacts out to its members.
+        Returns a report dict: issues, groups, lookups, lookups_saved, drafts_used, failed.
+        """
+        states = self.pending() if states is None else states
+        groups = self.group(states)
+        report = {"issues": len(states), "groups": len(groups), "lookups": 0, "lookups_saved": 0,
+                  "drafts_used": 0, "failed": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        for key, members in groups.items():
+            if dry_run:
+                print(f"{'/'.join(key)}: {len(members)} issues -> 1 lookup")
+                report["lookups_saved"] += len(members) - 1
+                continue
+            # A background prefetch (coordinator/prefetch.py) may already have the answer
+            emails = next((draft for draft in map(valid_draft, members) if draft), None)
+            if emails is not None:
+                report["drafts_used"] += 1
+                report["lookups_saved"] += len(members)
+                self._promote(members, key, emails)
+                continue
+            try:
+                emails = self.authority_mapper.get_email_data(members[0])
+            except Exception as e:
+                print(f"Authority lookup failed for {'/'.join(key)}: {e}")
+                report["failed"] += len(members)
+                self._record_error(members, key, f"Authority lookup failed: {e}")
+                continue
+            report["lookups"] += 1
+            report["lookups_saved"] += len(members) - 1
+            self._promote(members, key, emails)
+        report["seconds"] = round(time.perf_counter() - start, 2)
+        self.last_report = report
+        print(f"Authority batch: {report['issues']} issues in {report['groups']} groups, "
+              f"{report['lookups']} lookups, {report['lookups_saved']} saved "
+              f"({report['drafts_used']} prefetched), {report['failed']} failed")
+        return report
+
+
+if __name__ == "__main__":
+    from authority_finder.get_authority import Authority_Finder
+    from src.manage_issue.Issue_manager import IssueState
+
+    parser = argparse.ArgumentParser(description="Batch authority lookup for approved issues")
+    parser.add_argument("--dry-run", action="store_true", help="only show the groups")
+    parser.add_argument("--every", type=float, default=None, help="keep running, once every N minutes")
+    args = parser.parse_args()
+
+    resolver = AuthorityBatchResolver(IssueState(), Authority_Finder())
+    while True:
+        print(resolver.resolve(dry_run=args.dry_run))
+        if not args.every:
+            break
+        time.sleep(args.every * 60)
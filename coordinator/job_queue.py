@@ -0,0 +1,227 @@
+"""
+Persistent queue of admin stage work, backed by SQLite.
+
+The dashboard enqueues a job when a stage is approved and returns immediately; worker
+processes (coordinator/worker.py) claim jobs and run TheBrain.do_stage_work.
+
+- a job is unique per (issue_id, stage): approving twice, or from two sessions, queues it once
+- claiming takes a lease; a job whose worker died is picked up again once the lease expires
+- each service (authority lookup, mail, twitter) has its own limit on jobs running at once
+- a worker can take related queued jobs along with the one it claimed (claim_ids), e.g. metadata
+  reviews for the same location and issue type that share one authority lookup
+- failures are retried with backoff up to max_attempts; a failed job can be re-queued by
+  approving the stage again
+"""
+import os
+import sqlite3
+import time
+
+from src.sqlite_helper import SQLiteDB
+
+# Which external service a stage's work mostly waits on
+STAGE_SERVICES = {
+    "metadata_review": "authority",
+    "authority_review": "mail",
+    "tweet_review": "twitter",
+}
+
+
+def parse_limits(spec):
+    """"authority=2,mail=2" -> {"authority": 2, "mail": 2}."""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class JobQueue:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        issue_id      TEXT NOT NULL,
+        stage         TEXT NOT NULL,
+        service       TEXT NOT NULL,
+        status        TEXT NOT NULL DEFAULT 'queued',
+        attempts      INTEGER NOT NULL DEFAULT 0,
+        max_attempts  INTEGER NOT NULL DEFAULT 3,
+        available_at  REAL NOT NULL,
+        lease_owner   TEXT,
+        lease_expires REAL,
+        error         TEXT,
+        created_at    REAL NOT NULL,
+        updated_at    REAL NOT NULL,
+        UNIQUE(issue_id, stage)
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, service, available_at);
+    """
+
+    def __init__(self, db_path="cache/jobs.db", lease_seconds=300, max_attempts=3, retry_delay=30.0,
+                 limits=None):
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.limits = dict(limits or {})
+
+    def enqueue(self, issue_id, stage, service=None):
+        """
+        Queue the work for (issue_id, stage). A job that is already queued, running or done
+        is left alone; a failed one is queued again with fresh attempts. Returns the job.
+        """
+        now = time.time()
+        self.db.execute(
+            """
+            INSERT INTO jobs (issue_id, stage, service, max_attempts, available_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(issue_id, stage) DO UPDATE SET
+                status = 'queued', attempts = 0, error = NULL, lease_owner = NULL, lease_expires = NULL,
+                available_at = excluded.available_at, updated_at = excluded.updated_at
+            WHERE jobs.status = 'failed'
+            """,
+            (str(issue_id), stage, service or STAGE_SERVICES.get(stage, "default"), self.max_attempts,
+             now, now, now),
+        )
+        return self.get(issue_id, stage)
+
+    def claim(self, worker_id, services=None):
+        """
+        Take the oldest runnable job (optionally only for `services`) and lease it to worker_id.
+        Expired leases count as runnable. Services at their concurrency limit are skipped.
+        Returns the job dict, or None.
+        """
+        conn = self.db.connection()
+        now = time.time()
+        try:
+            # IMMEDIATE: only one claimer at a time, across processes
+            conn.execute("BEGIN IMMEDIATE")
+            running = {row["service"]: row["n"] for row in conn.execute(
+                "SELECT service, COUNT(*) AS n FROM jobs WHERE status = 'running' AND lease_expires > ? "
+                "GROUP BY service", (now,))}
+            full = [s for s, limit in self.limits.items() if running.get(s, 0) >= limit]
+            sql = ("SELECT * FROM jobs WHERE ((status = 'queued' AND available_at <= ?) "
+                   "OR (status = 'running' AND lease_expires <= ?))")
+            params = [now, now]
+            if services:
+                sql += f" AND service IN ({','.join('?' * len(services))})"
+                params += list(services)
+            if full:
+                sql += f" AND service NOT IN ({','.join('?' * len(full))})"
+                params += full
+            row = conn.execute(sql + " ORDER BY available_at, id LIMIT 1", params).fetchone()
+            if row is None:
+                conn.commit()
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                # Its worker died on the last attempt
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, updated_at = ? "
+                             "WHERE id = ?", ("lease expired on the last attempt", now, row["id"]))
+                conn.commit()
+                return self.claim(worker_id, services)
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row["id"]))
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+            return None
+        job = dict(row)
+        job.update(status="running", attempts=row["attempts"] + 1, lease_owner=worker_id)
+        return job
+
+    def runnable(self, stage, limit=50):
+        """Queued jobs of a stage that could be claimed now, oldest first."""
+        return [dict(row) for row in self.db.query(
+            "SELECT * FROM jobs WHERE stage = ? AND status = 'queued' AND available_at <= ? "
+            "ORDER BY available_at, id LIMIT ?", (stage, time.time(), limit))]
+
+    def claim_ids(self, worker_id, job_ids):
+        """
+        Lease the given jobs to worker_id if they are still queued; used to run jobs that share
+        one lookup or request together with a job claimed normally. Returns the claimed jobs.
+        """
+        conn = self.db.connection()
+        now = time.time()
+        claimed = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job_id in job_ids:
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'queued' AND available_at <= ?",
+                    (worker_id, now + self.lease_seconds, now, job_id, now))
+                if cursor.rowcount:
+                    claimed.append(job_id)
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+            return []
+        return [dict(self.db.query_one("SELECT * FROM jobs WHERE id = ?", (job_id,))) for job_id in claimed]
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend the lease of a long job. False if the lease was lost to another worker."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_owner = ? "
+            "AND status = 'running'",
+            (time.time() + self.lease_seconds, time.time(), job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id):
+        self.db.execute(
+            "UPDATE jobs SET status = 'done', error = NULL, lease_owner = NULL, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_owner = ?",
+            (time.time(), job_id, worker_id))
+
+    def fail(self, job_id, worker_id, error, retry=True):
+        """Record a failure; the job is queued again after a backoff while attempts remain."""
+        row = self.db.query_one("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,))
+        now = time.time()
+        if retry and row is not None and row["attempts"] < row["max_attempts"]:
+            delay = self.retry_delay * (2 ** (row["attempts"] - 1))
+            self.db.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "available_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (str(error), now + delay, now, job_id, worker_id))
+        else:
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (str(error), now, job_id, worker_id))
+
+    def get(self, issue_id, stage):
+        row = self.db.query_one("SELECT * FROM jobs WHERE issue_id = ? AND stage = ?", (str(issue_id), stage))
+        return dict(row) if row is not None else None
+
+    def jobs_for(self, issue_id):
+        return [dict(row) for row in self.db.query(
+            "SELECT * FROM jobs WHERE issue_id = ? ORDER BY created_at", (str(issue_id),))]
+
+    def counts(self):
+        """{status: n} over all jobs, plus jobs whose lease has expired under "stale"."""
+        counts = {row["status"]: row["n"] for row in self.db.query(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+        stale = self.db.query_one("SELECT COUNT(*) AS n FROM jobs WHERE status = 'running' AND lease_expires <= ?",
+                                  (time.time(),))
+        counts["stale"] = stale["n"]
+        return counts
+
+    def purge_done(self, older_than_seconds=7 * 24 * 3600):
+        self.db.execute("DELETE FROM jobs WHERE status = 'done' AND updated_at < ?",
+                        (time.time() - older_than_seconds,))
+
+
+_queue = None
+
+
+def get_job_queue():
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(
+            db_path=os.getenv("JOB_QUEUE_PATH", "cache/jobs.db"),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            limits=parse_limits(os.getenv("JOB_SERVICE_LIMITS", "authority=2,mail=2,twitter=1")),
+        )
+    return _queue
@@ -1,59 +1,40 @@
-import json
-import os
-from Admin_task.Admin_task import AdminTasks
-from Email.notifier import Email_notifier
-from Social_platforms.twitter import Social_Handles
-from authority_finder.get_authority import Authority_Finder
-from src.manage_issue.Issue_manager import IssueState
-from src.manage_issue.Similar_issue_finder import SimilarIssueFinder
-from src.photo_extractor import MetadataExtractor
-from src.unique_id import IssueIDGenerator
-from geopy.distance import geodesic
+from src.manage_issue.geo_distance import haversine_one_to_many
+from coordinator.services import FACTORIES, get_service
 
 class TheBrain():
     def __init__(self):
-        self.issue_handler=IssueState()
-        self.meta_extract=MetadataExtractor()
-        self.issue_id=IssueIDGenerator(counter_file="../issue_counter.json")
-        self.authority_mapper=Authority_Finder()
-        self.Admin_work=AdminTasks()
-        self.mailer=Email_notifier()
-        self.similar_issue_finder=SimilarIssueFinder()
-        self.social_handler=Social_Handles()
+        # issue_handler, authority_mapper, social_handler, mailer ... are not built here: each
+        # one is created on first use and shared by the whole process (coordinator/services.py)
         self.next_stage_map = {
             "metadata_review": "authority_review",
             "authority_review": "tweet_review",
             "tweet_review": "complete"}
 
+    def __getattr__(self, name):
+        if name in FACTORIES:
+            return get_service(name)
+        raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+
     def get_issue_lists(self):
-        active_dir = "issues/active"
-        completed_dir = "issues/completed"
         active_list = []
         completed_list = []
 
-        for file in os.listdir(active_dir):
-            if file.endswith(".json"):
-                path = os.path.join(active_dir, file)
-                with open(path, "r") as f:
-                    state = json.load(f)
-                active_list.append({
-                    "id": state.get("issue_id", file.replace(".json", "")),
-                    "type": state.get("issue_type", "Unknown"),
-                })
-
-        for file in os.listdir(completed_dir):
-            if file.endswith(".json"):
-                path = os.path.join(completed_dir, file)
-                with open(path, "r") as f:
-                    state = json.load(f)
-                completed_list.append({
-                    "id": state.get("issue_id", file.replace(".json", "")),
-                    "type": state.get("issue_type", "Unknown"),
-                    "tweet_url": state.get("tweet", {}).get("url", None)
-                })
+        for row in self.issue_handler.get_issue_summaries("active"):
+            active_list.append({
+                "id": row["issue_id"],
+                "type": row["issue_type"] or "Unknown",
+            })
+
+        for row in self.issue_handler.get_issue_summaries("completed"):
+            completed_list.append({
+                "id": row["issue_id"],
+                "type": row["issue_type"] or "Unknown",
+                "tweet_url": row["tweet_url"]
+            })
 
         return active_list, completed_list
 
+    @staticmethod
     def is_similar_location(issue1, issue2, threshold_m=500):
         try:
             lat1 = float(issue1 ["latitude"])
@@ -61,16 +42,26 @@ class TheBrain():
             lat2 = float(issue2 ["latitude"])
             lon2 = float(issue2 ["longitude"])
 
-            distance = geodesic((lat1, lon1), (lat2, lon2)).meters
+            distance = haversine_one_to_many(lat1, lon1, [lat2], [lon2])[0]
             return distance < threshold_m
         except (KeyError, TypeError, ValueError):
             return False
 
     def new_issue(self, image_paths, issue_type, external_metadata):
         new_state = self.issue_handler.from_blank(image_paths)
-        metadata = self.meta_extract.extract_metadata(image_paths[0], external_metadata)
-        new_state['metadata'] = metadata
+        new_state['image_digests'] = [d for d in map(self.image_store.digest_from_path, image_paths) if d]
+        # Thumbnail / email / Twitter variants are rendered in the background from now on
+        self.derivatives.schedule(image_paths)
+
+        # Near-duplicate photo of a known issue: stop before any geocoding or authority work
+        new_state['image_phashes'] = self.similar_issue_finder.hash_images(image_paths)
         new_state['issue_type'] = issue_type
+        found, matched_id, matched_state = self.similar_issue_finder.check_duplicate_photos(new_state, external_metadata)
+        if found:
+            return matched_id, True, matched_state.get('metadata')
+
+        metadata = self.meta_extract.extract_metadata(image_paths, external_metadata)
+        new_state['metadata'] = metadata
 
         # Check for similar issues using SimilarIssueFinder
         print("Checking for similar issues...")
@@ -91,36 +82,78 @@ class TheBrain():
 
         # Save new/merged issue
         self.issue_handler.update_issue(new_state)
+        # Contacts are usually ready by the time an admin approves the metadata
+        self.prefetch.schedule(new_state)
 
         return issue_id, False, metadata
 
     def get_pending_issue(self):
-        issues=os.listdir("issues/active")
-        admin_data=[]
-        for issue in issues:
-            issue_id=issue.split('.')[0]
-            state=self.issue_handler.get_data(issue_id)
-            if state['admin_stage'] !="complete":
-                admin_data.append(issue_id)
-        return admin_data
+        return [state["issue_id"] for state in self.get_pending_states()]
+
+    def get_pending_states(self, admin_stage=None, city=None):
+        # Indexed query instead of loading every active issue
+        return self.issue_handler.query_issues("active", admin_stage=admin_stage, city=city,
+                                               exclude_stage="complete")
 
     def process_pending_approvals(self):
-        issues=self.get_pending_issue()
-        for issue in issues:
-            state = self.issue_handler.get_data(issue)
-            current_stage = state["admin_stage"]
-            if state["approvals"].get(current_stage) is True:
-                self.do_stage_work(issue)
-
-    def do_stage_work(self, issue_id):
+        self.do_stage_work_batch(self.get_pending_states())
+
+    def do_stage_work_batch(self, states):
+        # Stage work for several issues at once (process_pending_approvals, or a job worker that
+        # claimed a group of jobs); unapproved states are skipped
+        approved = [state for state in states if state["approvals"].get(state["admin_stage"]) is True]
+        # Approved metadata reviews are resolved together, grouped by location and issue type
+        metadata = [state for state in approved if state["admin_stage"] == "metadata_review"]
+        if metadata:
+            self.authority_batch.resolve(metadata)
+        approved = [state for state in approved if state["admin_stage"] != "metadata_review"]
+        # A backlog of approved contacts gets its tweets from one batched request instead of one each
+        needs_tweet = [state for state in approved
+                       if state["admin_stage"] == "authority_review" and self.social_handler.use_llm]
+        tweets, mail_failed = {}, set()
+        if len(needs_tweet) > 1:
+            # Mail first, so tweets are only generated for issues whose email went out
+            sent = []
+            for state in needs_tweet:
+                if self._send_mail(state):
+                    sent.append(state)
+                else:
+                    mail_failed.add(state["issue_id"])
+            if len(sent) > 1:
+                # Issues the batch couldn't produce a valid tweet for fall back to their own request below
+                tweets, failures = self.social_handler.build_tweet_texts(sent)
+                for issue_id, reason in failures.items():
+                    print(f"Batched tweet for {issue_id} failed ({reason}), generating it on its own")
+        for state in approved:
+            if state["issue_id"] not in mail_failed:
+                self.do_stage_work(state["issue_id"], tweet_text=tweets.get(str(state["issue_id"])))
+
+    def _send_mail(self, state):
+        # True once the authority email went out; a retry after a later failure doesn't send it again
+        if (state.get("email") or {}).get("status") == "Completed":
+            return True
+        email_status = self.mailer.send_mail(state)
+        if not email_status or email_status.get("status") != "Completed":
+            if email_status:
+                state["email"] = email_status
+            state["errors"]["email"] = "Email sending failed."
+            self.issue_handler.update_issue(state)
+            return False
+        state["email"] = email_status
+        state["errors"].pop("email", None)
+        # Admin approved these contacts and the mail went out: remember them for the next issue here
+        self.authority_mapper.directory.save(state['metadata'].get('Address'), state.get('issue_type'),
+                                             state['Authority_info'].get('Email'), state['issue_id'])
+        self.issue_handler.update_issue(state)
+        return True
+
+    def do_stage_work(self, issue_id, tweet_text=None):
         state = self.issue_handler.get_data(issue_id)
         current_stage = state["admin_stage"]
         if state["approvals"].get(current_stage) is True:
             if current_stage == "metadata_review":
-                Authority_emails=self.authority_mapper.get_email_data(state)
-                state['Authority_info']['Email']=Authority_emails
-                state["admin_stage"]=self.next_stage_map["metadata_review"]
-                self.issue_handler.update_issue(state)
+                # Uses the prefetched draft when there is one; a failed lookup is left in state["errors"]
+                self.authority_batch.resolve([state])
             elif current_stage == "authority_review":
                 # email_status=self.mailer.send_mail(state)
                 # state['email']=email_status
@@ -128,14 +161,16 @@ class TheBrain():
                 # tweet_text=self.social_handler.build_tweet_text(state)
                 # state['tweet']['text']=tweet_text
                 # self.issue_handler.update_issue(state)
-                email_status = self.mailer.send_mail(state)
-                if not email_status:
-                    state["errors"]["email"] = "Email sending failed."
-                    self.issue_handler.update_issue(state)
+                if not self._send_mail(state):
                     return  # Don't proceed if email fails
 
-                state["email"] = email_status
-                tweet_text = self.social_handler.build_tweet_text(state)
+                # tweet_text may already come from do_stage_work_batch
+                from_template = not tweet_text and not self.social_handler.use_llm
+                if from_template:
+                    # Instant and never waits on Gemini; the optional polish runs in the background
+                    tweet_text = self.social_handler.tweet_engine.render(state)
+                elif not tweet_text:
+                    tweet_text = self.social_handler.build_tweet_text(state)
                 if not tweet_text:
                     state["errors"]["tweet_gen"] = "Tweet generation failed."
                     self.issue_handler.update_issue(state)
@@ -144,6 +179,8 @@ class TheBrain():
                 state['tweet'] = {"text": tweet_text}
                 state["admin_stage"] = self.next_stage_map[current_stage]
                 self.issue_handler.update_issue(state)
+                if from_template:
+                    self.tweet_polisher.schedule(state)
 
             elif current_stage == "tweet_review":
                 # tweet_status=self.social_handler.post_issue_to_twitter(state)
@@ -159,12 +196,12 @@ class TheBrain():
                 if tweet_status['status']=="Failed":
                     state["admin_stage"]="tweet_review"
                     state["approvals"]["tweet_review"]=False
+                    # Saved so the Retry Tweet button shows up and the job worker doesn't post again
+                    self.issue_handler.update_issue(state)
                 else:
                     state["admin_stage"] = self.next_stage_map["tweet_review"]
-                    source_path = f"issues/active/{issue_id}.json"
-                    destination_path = f"issues/completed/{issue_id}.json"
-                    # Move the file
-                    os.rename(source_path, destination_path)
+                    # Move to completed together with the posted tweet info
+                    self.issue_handler.move_issue(issue_id, "completed", state)
 
                 # self.issue_handler.update_issue(state)
                 # self.do_stage_work(issue_id)
@@ -0,0 +1,117 @@
+"""
+Speculative authority lookup, started as soon as an issue is stored.
+
+The Gemini + Tavily pipeline runs in the background and its result is kept on the issue as a
+provisional `Authority_draft`, tagged with a hash of the address it was computed for. When
+the admin approves metadata_review the draft is promoted instead of looked up again. Editing
+the address makes the hash stop matching, so the draft is dropped and recomputed.
+
+Off by default (AUTHORITY_PREFETCH=true to enable): every new issue then costs Gemini and
+Tavily calls before an admin has looked at it, including reports that end up rejected.
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def address_hash(state):
+    address = (state.get("metadata") or {}).get("Address") or {}
+    payload = json.dumps({"address": address, "issue_type": (state.get("issue_type") or "").strip().lower()},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def valid_draft(state):
+    """The prefetched contacts if they were computed for the issue's current address, else None."""
+    draft = state.get("Authority_draft")
+    if draft and draft.get("address_hash") == address_hash(state):
+        return draft.get("Email")
+    return None
+
+
+class AuthorityPrefetcher:
+    def __init__(self, issue_handler, authority_mapper, max_workers=2, max_pending=20, enabled=False):
+        self.issue_handler = issue_handler
+        self.authority_mapper = authority_mapper
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="authority-prefetch")
+        self._pending = {}  # issue_id -> address hash being computed
+        self._lock = threading.Lock()
+        self.counters = {"scheduled": 0, "stored": 0, "stale": 0, "dropped": 0, "errors": 0}
+
+    def schedule(self, state):
+        """Start a background lookup unless one is running or a matching draft exists. Returns True if started."""
+        if not self.enabled or state.get("admin_stage") != "metadata_review" or valid_draft(state):
+            return False
+        issue_id = state["issue_id"]
+        digest = address_hash(state)
+        with self._lock:
+            if self._pending.get(issue_id) == digest:
+                return False
+            # A reschedule after an address edit replaces its pending entry, so it never counts against the bound
+            if issue_id not in self._pending and len(self._pending) >= self.max_pending:
+                # Bounded: the lookup will simply happen at approval time
+                self.counters["dropped"] += 1
+                return False
+            self._pending[issue_id] = digest
+            self.counters["scheduled"] += 1
+        self._pool.submit(self._run, issue_id, digest)
+        return True
+
+    @staticmethod
+    def is_stale(state):
+        """True if the issue has a draft that no longer matches its address. Read-only."""
+        return bool(state.get("Authority_draft")) and not valid_draft(state)
+
+    def invalidate(self, state):
+        """Drop a draft that no longer matches the address. Call before saving edited metadata."""
+        if self.is_stale(state):
+            state["Authority_draft"] = None
+            return True
+        return False
+
+    def _run(self, issue_id, digest):
+        try:
+            state = self.issue_handler.get_data(issue_id)
+            if address_hash(state) != digest:
+                self.counters["stale"] += 1
+                return
+            emails = self.authority_mapper.get_email_data(state)
+
+            # Re-read right before writing: the lookup is slow, and the state loaded above may since have
+            # been edited, approved or merged with similar reports. Only Authority_draft is set.
+            folder, state = self.issue_handler.find_issue(issue_id)
+            if folder != "active" or state.get("admin_stage") != "metadata_review" or address_hash(state) != digest:
+                self.counters["stale"] += 1
+                return
+            state["Authority_draft"] = {"Email": emails, "address_hash": digest,
+                                        "created_at": datetime.now().isoformat()}
+            self.issue_handler.update_issue(state)
+            self.counters["stored"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Authority prefetch failed for {issue_id}: {e}")
+        finally:
+            with self._lock:
+                if self._pending.get(issue_id) == digest:
+                    del self._pending[issue_id]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["running"] = len(self._pending)
+        return stats
+
+
+def prefetch_from_env(issue_handler, authority_mapper):
+    return AuthorityPrefetcher(
+        issue_handler,
+        authority_mapper,
+        max_workers=int(os.getenv("AUTHORITY_PREFETCH_WORKERS", "2")),
+        max_pending=int(os.getenv("AUTHORITY_PREFETCH_MAX_PENDING", "20")),
+        enabled=os.getenv("AUTHORITY_PREFETCH", "false").lower() == "true",
+    )
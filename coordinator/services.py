@@ -0,0 +1,158 @@
+"""
+Process-wide service container.
+
+Streamlit re-executes a page on every interaction, and every page used to build a new
+TheBrain() each time: genai + Tavily clients, tweepy clients, the issue ID counter, geocoders.
+Here each component is built on first use only, with its heavy imports inside the factory,
+and then shared by every page, session and rerun in the process.
+
+    from coordinator.services import get_brain, get_service
+    brain = get_brain()                      # cheap: nothing is built yet
+    brain.issue_handler                      # IssueState, built on first access
+    get_service("authority_mapper")          # any component directly
+"""
+import os
+import threading
+import time
+
+_services = {}
+_build_seconds = {}
+_lock = threading.RLock()
+
+
+def _issue_handler():
+    from src.manage_issue.Issue_manager import IssueState
+    return IssueState()
+
+
+def _image_store():
+    from src.image_store import ImageStore
+    return ImageStore()
+
+
+def _derivatives():
+    from src.image_derivatives import get_derivative_generator
+    return get_derivative_generator()
+
+
+def _geocoder():
+    from src.geocoder import get_reverse_geocoder
+    return get_reverse_geocoder()
+
+
+def _meta_extract():
+    from src.photo_extractor import MetadataExtractor
+    return MetadataExtractor(geocoder=get_service("geocoder"))
+
+
+def _issue_id():
+    from src.unique_id import IssueIDGenerator
+    return IssueIDGenerator(counter_file="../issue_counter.json")
+
+
+def _authority_mapper():
+    from authority_finder.get_authority import Authority_Finder
+    return Authority_Finder()
+
+
+def _admin_work():
+    from Admin_task.Admin_task import AdminTasks
+    return AdminTasks()
+
+
+def _mailer():
+    from Email.notifier import Email_notifier
+    return Email_notifier()
+
+
+def _similar_issue_finder():
+    from src.manage_issue.Similar_issue_finder import SimilarIssueFinder
+    return SimilarIssueFinder(issue_handler=get_service("issue_handler"), geocoder=get_service("geocoder"))
+
+
+def _social_handler():
+    from Social_platforms.twitter import Social_Handles
+    return Social_Handles()
+
+
+def _prefetch():
+    from coordinator.prefetch import prefetch_from_env
+    return prefetch_from_env(get_service("issue_handler"), get_service("authority_mapper"))
+
+
+def _authority_batch():
+    from coordinator.authority_batch import AuthorityBatchResolver
+    return AuthorityBatchResolver(get_service("issue_handler"), get_service("authority_mapper"))
+
+
+def _tweet_polisher():
+    from Social_platforms.tweet_templates import TweetPolisher
+    return TweetPolisher(get_service("issue_handler"), get_service("social_handler"),
+                         enabled=os.getenv("TWEET_LLM_POLISH", "false").lower() == "true")
+
+
+def _jobs():
+    from coordinator.job_queue import get_job_queue
+    return get_job_queue()
+
+
+FACTORIES = {
+    "issue_handler": _issue_handler,
+    "image_store": _image_store,
+    "derivatives": _derivatives,
+    "geocoder": _geocoder,
+    "meta_extract": _meta_extract,
+    "issue_id": _issue_id,
+    "authority_mapper": _authority_mapper,
+    "Admin_work": _admin_work,
+    "mailer": _mailer,
+    "similar_issue_finder": _similar_issue_finder,
+    "social_handler": _social_handler,
+    "prefetch": _prefetch,
+    "authority_batch": _authority_batch,
+    "tweet_polisher": _tweet_polisher,
+    "jobs": _jobs,
+}
+
+
+def get_service(name):
+    """The process-wide instance of a component, built on first use."""
+    service = _services.get(name)
+    if service is not None:
+        return service
+    # RLock: factories ask for the services they depend on
+    with _lock:
+        if name not in _services:
+            start = time.perf_counter()
+            _services[name] = FACTORIES[name]()
+            _build_seconds[name] = time.perf_counter() - start
+        return _services[name]
+
+
+def built_services():
+    """{name: seconds it took to build} for the components built so far."""
+    with _lock:
+        return dict(_build_seconds)
+
+
+def reset_services():
+    """Forget every instance (tests, or after changing .env)."""
+    global _brain
+    with _lock:
+        _services.clear()
+        _build_seconds.clear()
+        _brain = None
+
+
+_brain = None
+
+
+def get_brain():
+    """The shared TheBrain; what st.cache_resource would give, without tying this module to Streamlit."""
+    global _brain
+    if _brain is None:
+        with _lock:
+            if _brain is None:
+                from coordinator.orchestrator import TheBrain
+                _brain = TheBrain()
+    return _brain
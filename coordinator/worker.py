@@ -0,0 +1,179 @@
+"""
+Workers for the admin job queue (coordinator/job_queue.py).
+
+Each worker claims a job, runs the stage work for it (TheBrain.do_stage_work_batch), and marks
+it done once the issue has moved past that stage. Queued metadata reviews for the same location
+and issue type are claimed along with it, so the group gets one authority lookup; with LLM
+tweets, queued authority reviews are claimed together so their tweets come from one request.
+A job that leaves the issue where it was (email not sent, tweet not generated, lookup failed)
+is retried with backoff; a tweet the API rejected is not, since the admin has to approve it again.
+
+    python -m coordinator.worker --processes 3      # separate worker processes
+    JOB_WORKERS_INLINE=true                         # or one thread inside the Streamlit app
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+
+from coordinator.authority_batch import group_key
+from coordinator.job_queue import get_job_queue
+
+
+def _stage_errors(state):
+    return "; ".join(f"{k}: {v}" for k, v in (state.get("errors") or {}).items()) or "stage did not advance"
+
+
+class Worker:
+    def __init__(self, queue, brain, worker_id=None, poll_seconds=1.0, services=None, max_group=15):
+        self.queue = queue
+        self.brain = brain
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.poll_seconds = poll_seconds
+        self.services = services
+        self.max_group = max_group
+        self._stop = threading.Event()
+
+    def related_jobs(self, job):
+        """
+        Queued jobs to run together with `job`:
+        - metadata reviews for the same location and issue type share one authority lookup
+        - with LLM tweets (TWEET_GENERATOR=llm), authority reviews get their tweets from one
+          batched request (Social_Handles.build_tweet_texts); template tweets need no batching
+        """
+        if job["stage"] == "authority_review" and self.brain.social_handler.use_llm:
+            ids = [other["id"] for other in self.queue.runnable(job["stage"], limit=self.max_group)
+                   if other["id"] != job["id"]][:self.max_group - 1]
+            return self.queue.claim_ids(self.worker_id, ids) if ids else []
+        if job["stage"] != "metadata_review":
+            return []
+        folder, state = self.brain.issue_handler.find_issue(job["issue_id"])
+        if folder != "active":
+            return []
+        key = group_key(state)
+        ids = []
+        for other in self.queue.runnable(job["stage"], limit=self.max_group * 4):
+            if other["id"] == job["id"] or len(ids) >= self.max_group - 1:
+                continue
+            other_folder, other_state = self.brain.issue_handler.find_issue(other["issue_id"])
+            if other_folder == "active" and group_key(other_state) == key:
+                ids.append(other["id"])
+        return self.queue.claim_ids(self.worker_id, ids) if ids else []
+
+    def run_jobs(self, jobs):
+        """Run claimed jobs of one stage together and record each outcome. Returns {job id: status}."""
+        stop_beat = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=([job["id"] for job in jobs], stop_beat), daemon=True)
+        beat.start()
+        outcomes = {}
+        try:
+            states = []
+            for job in jobs:
+                # find_issue, not get_data: a posted tweet moves the issue to completed
+                folder, state = self.brain.issue_handler.find_issue(job["issue_id"])
+                if folder is None:
+                    self.queue.fail(job["id"], self.worker_id, "issue not found", retry=False)
+                    outcomes[job["id"]] = "failed"
+                elif folder == "active" and state.get("admin_stage") == job["stage"]:
+                    states.append(state)
+            error = None
+            if states:
+                # do_stage_work only acts while the stage is approved, so a job that is run twice
+                # (lease expired mid-run) finds the issue already moved on and does nothing
+                try:
+                    self.brain.do_stage_work_batch(states)
+                except Exception as e:
+                    print(f"Jobs {jobs[0]['stage']} for {[s['issue_id'] for s in states]} failed: {e}")
+                    error = e
+            for job in jobs:
+                if job["id"] not in outcomes:
+                    outcomes[job["id"]] = self._record(job, error)
+            return outcomes
+        finally:
+            stop_beat.set()
+
+    def _record(self, job, error=None):
+        folder, state = self.brain.issue_handler.find_issue(job["issue_id"])
+        if folder is not None and (folder != "active" or state.get("admin_stage") != job["stage"]):
+            self.queue.complete(job["id"], self.worker_id)
+            return "done"
+        if error is not None:
+            self.queue.fail(job["id"], self.worker_id, error)
+        else:
+            retry = (state or {}).get("approvals", {}).get(job["stage"]) is True
+            self.queue.fail(job["id"], self.worker_id, _stage_errors(state or {}), retry=retry)
+        return "failed"
+
+    def run_job(self, job):
+        """Run one claimed job and record the outcome. Returns the job's final status."""
+        return self.run_jobs([job])[job["id"]]
+
+    def _heartbeat(self, job_ids, stop):
+        while not stop.wait(self.queue.lease_seconds / 3):
+            for job_id in job_ids:
+                self.queue.heartbeat(job_id, self.worker_id)
+
+    def run_once(self):
+        """Claim a job (and the queued jobs it can share work with) and run them. Returns its status."""
+        job = self.queue.claim(self.worker_id, self.services)
+        if job is None:
+            return None
+        jobs = [job] + self.related_jobs(job)
+        print(f"[{self.worker_id}] {job['stage']} for {', '.join(j['issue_id'] for j in jobs)} "
+              f"(attempt {job['attempts']})")
+        return self.run_jobs(jobs)[job["id"]]
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            if self.run_once() is None:
+                self._stop.wait(self.poll_seconds)
+
+    def stop(self):
+        self._stop.set()
+
+
+def _process_main(index, poll_seconds):
+    from coordinator.services import get_brain
+    worker = Worker(get_job_queue(), get_brain(), worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+                    poll_seconds=poll_seconds)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+_inline = None
+
+
+def start_inline_worker():
+    """One worker thread in this process, started once (the Streamlit app calls this)."""
+    global _inline
+    if _inline is None and os.getenv("JOB_WORKERS_INLINE", "true").lower() == "true":
+        from coordinator.services import get_brain
+        _inline = Worker(get_job_queue(), get_brain(), poll_seconds=float(os.getenv("JOB_POLL_SECONDS", "1")))
+        threading.Thread(target=_inline.run_forever, name="job-worker", daemon=True).start()
+    return _inline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run workers for queued admin stage work")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", "2")))
+    parser.add_argument("--poll", type=float, default=float(os.getenv("JOB_POLL_SECONDS", "1")))
+    args = parser.parse_args()
+    print(f"Starting {args.processes} workers on {get_job_queue().db.db_path}, limits {get_job_queue().limits}")
+    processes = [multiprocessing.Process(target=_process_main, args=(i, args.poll), daemon=True)
+                 for i in range(args.processes)]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("Stopping workers")
+        for p in processes:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
-import json
-
 import streamlit as st
 import hashlib
 import os
 from dotenv import load_dotenv
 
+from coordinator.services import get_service
+
 # Load credentials
 load_dotenv()
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
@@ -31,14 +31,10 @@ st.markdown("""
 
 # Quick Stats
 col1, col2, col3, col4 = st.columns(4)
-os.makedirs("issues/active", exist_ok=True)
-os.makedirs("issues/completed", exist_ok=True)
-os.makedirs("issues/rejected", exist_ok=True)
+issue_handler = get_service("issue_handler")
 # Count issues for stats
-active_count = len([f for f in os.listdir("issues/active") if f.endswith(".json")]) if os.path.exists(
-    "issues/active") else 0
-completed_count = len([f for f in os.listdir("issues/completed") if f.endswith(".json")]) if os.path.exists(
-    "issues/completed") else 0
+active_count = issue_handler.count_issues("active")
+completed_count = issue_handler.count_issues("completed")
 
 with col1:
     st.metric("🔴 Active Issues", active_count)
@@ -146,48 +142,34 @@ search_id = st.text_input("Enter your Issue ID (e.g., Mumbai_20250628_001)", pla
 
 if st.button("🔍 Search Issue"):
     found = False
-    for folder in ["issues/active", "issues/completed", "issues/rejected"]:
-        try:
-            if os.path.exists(folder):
-                for file in os.listdir(folder):
-                    if file.endswith(".json"):
-                        path = os.path.join(folder, file)
-                        with open(path, "r") as f:
-                            state = json.load(f)
-                        if state.get("issue_id") == search_id:
-                            found = True
-
-                            # Status indicator
-                            # status_color = "🟢" if folder.endswith("completed") else "🟡"
-                            # status_text = "Completed" if folder.endswith("completed") else "In Progress"
-                            status_color = "🟢" if folder.endswith("completed") else "🔴" if folder.endswith(
-                                "rejected") else "🟡"
-                            status_text = "Completed" if folder.endswith(
-                                "completed") else "Rejected by Admin" if folder.endswith("rejected") else "In Progress"
-
-                            st.success(f"{status_color} Issue Found - Status: {status_text}")
-
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown(f"**🆔 ID**: `{state['issue_id']}`")
-                                st.markdown(f"**📌 Type**: {state.get('issue_type')}")
-                                st.markdown(
-                                    f"**📍 Location**: {state.get('metadata', {}).get('Address', {}).get('city', 'N/A')}")
-
-                            with col2:
-                                st.markdown(f"**📷 Images**: {len(state.get('image_paths', []))} uploaded")
-                                st.markdown(f"**🔄 Similar Reports**: {state.get('similar_count', 0)}")
-
-                                if state.get("tweet", {}).get("url"):
-                                    st.markdown(f"**🐦 Tweet**: [View Tweet]({state['tweet']['url']})")
-                                else:
-                                    st.markdown("**🐦 Tweet**: Not posted yet")
-
-                            break
-            if found:
-                break
-        except Exception as e:
-            st.error(f"Error reading files in {folder}: {e}")
+    try:
+        folder, state = issue_handler.find_issue(search_id)
+        if state is not None:
+            found = True
+
+            # Status indicator
+            status_color = "🟢" if folder == "completed" else "🔴" if folder == "rejected" else "🟡"
+            status_text = "Completed" if folder == "completed" else "Rejected by Admin" if folder == "rejected" else "In Progress"
+
+            st.success(f"{status_color} Issue Found - Status: {status_text}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f"**🆔 ID**: `{state['issue_id']}`")
+                st.markdown(f"**📌 Type**: {state.get('issue_type')}")
+                st.markdown(
+                    f"**📍 Location**: {state.get('metadata', {}).get('Address', {}).get('city', 'N/A')}")
+
+            with col2:
+                st.markdown(f"**📷 Images**: {len(state.get('image_paths', []))} uploaded")
+                st.markdown(f"**🔄 Similar Reports**: {state.get('similar_count', 0)}")
+
+                if state.get("tweet", {}).get("url"):
+                    st.markdown(f"**🐦 Tweet**: [View Tweet]({state['tweet']['url']})")
+                else:
+                    st.markdown("**🐦 Tweet**: Not posted yet")
+    except Exception as e:
+        st.error(f"Error reading issue store: {e}")
 
     if not found:
         st.warning("❌ No issue found with that ID. Please check the ID and try again.")
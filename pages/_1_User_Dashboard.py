@@ -7,9 +7,9 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from coordinator.orchestrator import TheBrain
+from coordinator.services import get_brain
 
-brain = TheBrain()
+brain = get_brain()
 ISSUE_TYPES = ["Pothole", "Garbage", "Water Leakage", "Streetlight", "Road Damage", "Other"]
 
 st.set_page_config(page_title="CivicSpotter", layout="centered")
@@ -70,13 +70,13 @@ if st.button("Submit"):
     if not uploaded_files:
         st.error("Please upload at least one image.")
     else:
-        os.makedirs("temp_uploads", exist_ok=True)
+        # Stream each upload into the content-addressed store (deduplicated by SHA-256)
         image_paths = []
         for file in uploaded_files:
-            save_path = f"temp_uploads/{file.name}"
-            with open(save_path, "wb") as f:
-                f.write(file.read())
-            image_paths.append(save_path)
+            file.seek(0)
+            _, save_path = brain.image_store.put_stream(file)
+            if save_path not in image_paths:
+                image_paths.append(save_path)
 
         # If browser GPS is available, pass it manually to override metadata fallback
         gps_metadata = None
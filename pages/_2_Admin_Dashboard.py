@@ -5,7 +5,12 @@ import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 import os
-from coordinator.orchestrator import TheBrain
+from authority_finder.directory import get_authority_directory
+from coordinator.services import get_brain
+from coordinator.worker import start_inline_worker
+from src.llm_cache import get_llm_cache
+from src.llm_gateway import get_llm_gateway
+from Social_platforms.tweet_length import MAX_TWEET_LENGTH, weighted_length
 
 
 # Protect this page
@@ -16,33 +21,67 @@ if "admin_logged_in" not in st.session_state or not st.session_state.admin_logge
 st.set_page_config(page_title="🛠️ Admin Dashboard", layout="wide")
 st.title("🛠️ Civic Issue Admin Dashboard")
 
-brain = TheBrain()
-
-# Load all pending issues
-all_issues = brain.get_pending_issue()
-issue_states = [brain.issue_handler.get_data(issue_id) for issue_id in all_issues]
+# Shared by every session and rerun; components are built on first use
+brain = get_brain()
+# Approved stages run on the job queue; unless workers run separately (python -m coordinator.worker)
+start_inline_worker()
 
 # ---- SIDEBAR FILTERS ---- #
 st.sidebar.header("🔍 Filter Issues")
 
-# Unique stages and cities
-stages = sorted(set(state["admin_stage"] for state in issue_states))
-cities = sorted(
-    set(state.get("metadata", {}).get("Address", {}).get("city", "Unknown") for state in issue_states)
-)
+# Unique stages and cities (indexed lookups, no issue is loaded here)
+stages = brain.issue_handler.distinct_values("admin_stage", "active", exclude_stage="complete")
+cities = brain.issue_handler.distinct_values("city", "active", exclude_stage="complete")
 
 # Sidebar dropdowns
 selected_stage = st.sidebar.selectbox("Filter by Stage", ["All"] + stages)
 selected_city = st.sidebar.selectbox("Filter by City", ["All"] + cities)
 
-# Filter logic
-filtered_issues = []
-for state in issue_states:
-    stage_ok = selected_stage == "All" or state["admin_stage"] == selected_stage
-    city = state.get("metadata", {}).get("Address", {}).get("city", "Unknown")
-    city_ok = selected_city == "All" or city == selected_city
-    if stage_ok and city_ok:
-        filtered_issues.append(state)
+# Reverse geocoding cache counters
+with st.sidebar.expander("🗺️ Geocoder cache"):
+    geo_stats = brain.geocoder.stats()
+    st.write(f"Hit rate: {geo_stats['hit_rate']:.0%}")
+    st.write(f"Memory hits: {geo_stats['memory_hits']} · Disk hits: {geo_stats['disk_hits']}")
+    st.write(f"Misses: {geo_stats['misses']} · Errors: {geo_stats['errors']}")
+    st.write(f"Nominatim calls: {geo_stats['dispatcher']['fetched']} · Coalesced: {geo_stats['dispatcher']['coalesced']}")
+
+with st.sidebar.expander("📒 Authority directory"):
+    dir_stats = get_authority_directory().stats()
+    st.write(f"Entries: {dir_stats['entries']} · Hit rate: {dir_stats['hit_rate']:.0%}")
+    st.write(f"Hits: {dir_stats['hits']} · Misses: {dir_stats['misses']} · Saved: {dir_stats['saved']}")
+
+with st.sidebar.expander("🤖 LLM cache"):
+    llm_stats = get_llm_cache().stats()
+    st.write(f"Hit rate: {llm_stats['all']['hit_rate']:.0%} · Time saved: {llm_stats['all'].get('saved_seconds', 0):.1f}s")
+    for site, site_stats in llm_stats.items():
+        if site != "all":
+            st.write(f"{site}: {site_stats['hits']} hits / {site_stats['misses']} misses")
+
+with st.sidebar.expander("⏱️ LLM calls"):
+    for site, site_stats in get_llm_gateway().stats().items():
+        st.write(f"{site}: {site_stats['calls']} calls, avg {site_stats['avg_seconds']:.1f}s "
+                 f"(first token {site_stats['avg_ttft']:.1f}s), max {site_stats['max_seconds']:.1f}s, "
+                 f"{site_stats['retries']} retries, {site_stats['failures']} failed, "
+                 f"{site_stats['prompt_tokens'] + site_stats['output_tokens']} tokens")
+
+with st.sidebar.expander("🧵 Job queue"):
+    job_counts = brain.jobs.counts()
+    st.write(f"Queued: {job_counts.get('queued', 0)} · Running: {job_counts.get('running', 0)} "
+             f"· Stale leases: {job_counts['stale']}")
+    st.write(f"Done: {job_counts.get('done', 0)} · Failed: {job_counts.get('failed', 0)}")
+
+
+def show_llm_timing(site):
+    call = get_llm_gateway().last_call(site)
+    if call:
+        st.caption(f"{call['model']}: first token after {call['ttft']:.1f}s, done in {call['seconds']:.1f}s")
+
+
+# Filter logic runs in the issue store
+filtered_issues = brain.get_pending_states(
+    admin_stage=None if selected_stage == "All" else selected_stage,
+    city=None if selected_city == "All" else selected_city,
+)
 
 if filtered_issues:
     issue_ids = [s["issue_id"] for s in filtered_issues]
@@ -63,7 +102,10 @@ if filtered_issues:
     for idx, img_path in enumerate(image_paths):
         if os.path.exists(img_path):
             with cols[idx]:
-                st.image(img_path, caption=f"Image {idx + 1}", width=300)
+                # Small WebP thumbnail first; the original is only loaded when asked for
+                st.image(brain.derivatives.path_for(img_path, "thumb"), caption=f"Image {idx + 1}", width=300)
+                if st.toggle("🔍 Full resolution", key=f"full_{selected_issue_id}_{idx}"):
+                    st.image(img_path, caption=f"Image {idx + 1} (original)")
 
     stage = selected_state["admin_stage"]
 
@@ -82,17 +124,24 @@ if filtered_issues:
             if submitted:
                 selected_state.update({"issue_type": issue_type})
                 selected_state["metadata"]["Address"].update({"road": road, "city": city, "state": state_name})
+                # Prefetched contacts were for the old address: drop them and look up again in the background
+                brain.prefetch.invalidate(selected_state)
                 brain.issue_handler.update_issue(selected_state)
+                brain.prefetch.schedule(selected_state)
                 st.success("Metadata updated!")
                 st.rerun()
 
+        if brain.prefetch.enabled:
+            if selected_state.get("Authority_draft") and not brain.prefetch.is_stale(selected_state):
+                st.info("📬 Authority contacts already prefetched, approval will be instant.")
+            elif st.button("📬 Prefetch authority contacts"):
+                brain.prefetch.schedule(selected_state)
+                st.info("Looking up authority contacts in the background.")
+
         if st.button("❌ Reject this issue"):
             selected_state.update({"status": "rejected"})
             issue_id=selected_state["issue_id"]
-            source_path = f"issues/active/{issue_id}.json"
-            destination_path = f"issues/rejected/{issue_id}.json"
-            # Move the file
-            os.rename(source_path, destination_path)
+            brain.issue_handler.move_issue(issue_id, "rejected", selected_state)
             st.rerun()
 
 
@@ -108,10 +157,16 @@ if filtered_issues:
                 st.success("Email updated!")
                 st.rerun()
         if st.button("🔁 Retry Email Lookup"):
-            new_email = brain.authority_mapper.get_email_data(selected_state)
+            # Gemini's answer is shown while it streams in
+            live_answer = st.empty()
+            # Skip the local directory and the LLM cache, their answer is what the admin is unhappy with
+            new_email = brain.authority_mapper.get_email_data(selected_state, use_directory=False,
+                                                              force_refresh=True, on_chunk=live_answer.code)
             selected_state["Authority_info"]["Email"] = new_email
             brain.issue_handler.update_issue(selected_state)
             st.success("✅ Re-fetched authority email.")
+            show_llm_timing("authority_emails")
+            time.sleep(2)
             st.rerun()
 
 
@@ -123,6 +178,8 @@ if filtered_issues:
         tweet_status = tweet_data.get("status", "Unknown")
         with st.form("edit_tweet"):
             tweet_input = st.text_area("Tweet Content", value=tweet_text, height=100)
+            # Counted like Twitter does: emojis are 2, links are 23
+            st.caption(f"{weighted_length(tweet_input)}/{MAX_TWEET_LENGTH} characters")
             submitted = st.form_submit_button("💾 Save Tweet")
             if submitted:
                 selected_state["tweet"]["text"] = tweet_input
@@ -130,6 +187,23 @@ if filtered_issues:
                 st.success("Tweet content updated!")
                 time.sleep(2)
                 st.rerun()
+        polished = tweet_data.get("polished")
+        if polished and polished != tweet_text:
+            st.markdown("**✨ Polished version**")
+            st.info(polished)
+            if st.button("Use polished tweet"):
+                selected_state["tweet"]["text"] = polished
+                selected_state["tweet"]["polished"] = None
+                brain.issue_handler.update_issue(selected_state)
+                st.rerun()
+        if st.button("🔁 Regenerate Tweet"):
+            # Fresh Gemini call instead of the cached text for this prompt, rendered as it streams
+            selected_state["tweet"]["text"] = st.write_stream(
+                brain.social_handler.build_tweet_text(selected_state, force_refresh=True, stream=True))
+            brain.issue_handler.update_issue(selected_state)
+            show_llm_timing("tweet_text")
+            time.sleep(2)
+            st.rerun()
         # Show tweet status
         st.write(f"**Tweet Status:** `{tweet_status}`")
         # Add Retry Button if tweet failed
@@ -160,13 +234,34 @@ if filtered_issues:
             st.error(f"{k}: {v}")
 
 
-    # Approval button
+    @st.fragment(run_every=2)
+    def show_job_status(issue_id, stage):
+        job = brain.jobs.get(issue_id, stage)
+        if job is None:
+            return
+        if job["status"] == "done":
+            st.success(f"✅ {stage} finished")
+            # find_issue: a posted tweet has moved the issue out of active
+            folder, current = brain.issue_handler.find_issue(issue_id)
+            if folder != "active" or current.get("admin_stage") != stage:
+                st.button("🔄 Show next stage", key=f"next_{job['id']}")
+        elif job["status"] == "failed":
+            st.error(f"❌ {stage} failed after {job['attempts']} attempts: {job['error']}")
+        elif job["status"] == "running":
+            st.info(f"⏳ {stage} running (attempt {job['attempts']}/{job['max_attempts']}) on {job['lease_owner']}")
+        else:
+            waiting = f", retrying in {job['available_at'] - time.time():.0f}s" if job["error"] else ""
+            st.info(f"🕒 {stage} queued{waiting}" + (f" — last error: {job['error']}" if job["error"] else ""))
+
+    show_job_status(selected_state["issue_id"], selected_state["admin_stage"])
+
+    # Approval button: the stage work runs on a background worker, this only queues it
     if st.button("✅ Approve this stage"):
         stage = selected_state["admin_stage"]
         selected_state["approvals"][stage] = True
         brain.issue_handler.update_issue(selected_state)
-        brain.process_pending_approvals()
-        st.success(f"Approved stage: {stage} and processed next step.")
+        job = brain.jobs.enqueue(selected_state["issue_id"], stage)
+        st.success(f"Approved stage: {stage}, next step is {job['status']}.")
         st.rerun()
 
 
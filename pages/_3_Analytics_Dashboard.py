@@ -1,10 +1,11 @@
 import streamlit as st
-import json
 import os
-import plotly.express as px
+import sys
 
 from datetime import datetime
-import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from coordinator.services import get_service
 
 st.set_page_config(page_title="📊 Analytics Dashboard", layout="wide")
 st.title("📊 CivicSpotter Analytics Dashboard")
@@ -13,14 +14,9 @@ st.title("📊 CivicSpotter Analytics Dashboard")
 # Load all issues for analytics
 def load_all_issues():
     issues = []
-    for folder in ["issues/active", "issues/completed"]:
-        if os.path.exists(folder):
-            for file in os.listdir(folder):
-                if file.endswith(".json"):
-                    with open(os.path.join(folder, file), "r") as f:
-                        issue = json.load(f)
-                        issue["status"] = "active" if folder.endswith("active") else "completed"
-                        issues.append(issue)
+    for folder, issue in get_service("issue_handler").iter_issues(["active", "completed"]):
+        issue["status"] = folder
+        issues.append(issue)
     return issues
 
 
@@ -30,6 +26,10 @@ if not issues:
     st.warning("No issues found for analytics.")
     st.stop()
 
+# pandas and plotly take most of this page's start-up time: only load them when there is data
+import pandas as pd
+import plotly.express as px
+
 # Convert to DataFrame for easier analysis
 df_data = []
 for issue in issues:
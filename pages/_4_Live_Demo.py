@@ -1,8 +1,14 @@
+import os
+import sys
 import streamlit as st
 import time
 import random
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Social_platforms.tweet_length import MAX_TWEET_LENGTH, weighted_length
+from Social_platforms.tweet_templates import get_tweet_engine
+
 st.set_page_config(page_title="🎬 Live Demo", layout="wide")
 st.title("🎬 CivicSpotter Live Demo")
 
@@ -55,40 +61,15 @@ if st.session_state.get("demo_running", False):
     # Generate demo data
     demo_id = f"Demo_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-    # Funny tweet templates for different issue types
-    funny_tweets = {
-        "🕳️ Pothole Report": [
-            f"🕳️ BREAKING: MG Road pothole has achieved crater status! 🌙 NASA is reportedly interested for Mars training simulations 🚀\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\nLet's fill this before it becomes a tourist attraction! 😅\n\n#CivicIssue #PotholeProblems #BangaloreTraffic #SmartCity",
-
-            f"🚨 POTHOLE ALERT: MG Road crater now accepting applications for permanent residents! 🏠 Amenities include: Free car alignment checks & suspension massage therapy! 💆‍♂️\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #BangaloreTraffic #SmartCity #UrbanIndia",
-
-            f"🕳️ MG Road pothole update: It's now deep enough to hide a small car! 🚗 Local residents have started a betting pool on when it'll reach Earth's core 🌍\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #PotholeProblems #SmartCity"
-        ],
-
-        "🗑️ Garbage Dump": [
-            f"🗑️ BREAKING: MG Road garbage dump has achieved landmark status! 📍 Local GPS now lists it as a 'point of interest' 🎯 Tourism board is confused! 🤔\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #CleanIndia #BangaloreTraffic #SmartCity",
-
-            f"🚨 GARBAGE ALERT: MG Road waste collection has evolved into modern art installation! 🎨 Museum curators are reportedly interested 🖼️\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\nLet's clean this masterpiece! 😄\n\n#CivicIssue #UrbanIndia #SmartCity",
-
-            f"🗑️ MG Road garbage situation: We've officially created our own ecosystem! 🌱 Scientists are studying the new species discovered 🔬\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #CleanIndia #SmartCity"
-        ],
-
-        "💡 Broken Streetlight": [
-            f"💡 BREAKING: MG Road streetlight has been playing hide-and-seek for weeks! 🙈 Current score: Darkness 1, Citizens 0 🌙\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\nTime to light up the game! ⚡\n\n#CivicIssue #LightUp #BangaloreTraffic #SmartCity",
-
-            f"🚨 LIGHT ALERT: MG Road streetlight is on permanent vacation! 🏖️ Residents now using phone flashlights as street lighting 📱\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #UrbanIndia #SmartCity",
-
-            f"💡 MG Road streetlight update: It's become a professional mime artist - completely silent and invisible! 🎭\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\nBreak a leg... or turn on! 🎪\n\n#CivicIssue #LightUp #SmartCity"
-        ],
-
-        "🚧 Road Damage": [
-            f"🚧 BREAKING: MG Road has achieved off-road status while still being a road! 🏞️ Adventure sports enthusiasts are thrilled! 🚵‍♂️\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\nLet's bring it back to civilization! 🛣️\n\n#CivicIssue #RoadSafety #BangaloreTraffic #SmartCity",
-
-            f"🚨 ROAD ALERT: MG Road surface now offers free massage therapy for car suspensions! 💆‍♂️ Chiropractors hate this one trick! 😂\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #UrbanIndia #SmartCity",
-
-            f"🚧 MG Road condition update: It's now officially a 4D driving experience! 🎢 Theme park designers are taking notes 📝\n\nIssue ID: {demo_id}\n📧 Details sent to @BangaloreMayor\n⏰ Reported: {datetime.now().strftime('%H:%M')}\n\n#CivicIssue #RoadSafety #SmartCity"
-        ]
+    # Same template engine the admin flow uses for tweet_review
+    demo_state = {
+        "issue_id": demo_id,
+        "issue_type": demo_type.split(' ', 1)[1],
+        "metadata": {"datetime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                     "Address": {"road": "MG Road", "city": "Bangalore", "state": "Karnataka"}},
+        "similar_count": 3,
     }
+    tweet_engine = get_tweet_engine()
 
     col1, col2 = st.columns(2)
 
@@ -130,13 +111,17 @@ CivicSpotter System
         st.subheader("🐦 Generated Tweet")
 
         # Select a random funny tweet for the chosen demo type
-        selected_tweet = random.choice(funny_tweets[demo_type])
+        variants = tweet_engine.variants(demo_state["issue_type"])
+        render_start = time.perf_counter()
+        selected_tweet = tweet_engine.render(demo_state, variant=random.randrange(len(variants)))
+        render_us = (time.perf_counter() - render_start) * 1e6
 
         st.text_area(
             "Tweet Content",
             selected_tweet,
             height=200
         )
+        st.caption(f"{weighted_length(selected_tweet)}/{MAX_TWEET_LENGTH} characters · rendered in {render_us:.0f} µs, no LLM call")
 
         st.subheader("🎯 Authority Contact")
         st.info("""
@@ -0,0 +1,283 @@
+"""
+Minimal EXIF reader that only pulls GPS position and DateTimeOriginal.
+
+It reads just the container headers (JPEG APP1, PNG eXIf chunk, HEIC Exif item), then walks
+the three TIFF directories it needs (IFD0 -> Exif IFD / GPS IFD) and stops. No MakerNote,
+thumbnail or image data is ever read, so cost doesn't grow with photo resolution.
+"""
+import os
+import statistics
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from src.manage_issue.geo_distance import haversine_one_to_many
+
+TAG_EXIF_IFD = 0x8769
+TAG_GPS_IFD = 0x8825
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+GPS_LAT_REF, GPS_LAT, GPS_LON_REF, GPS_LON = 1, 2, 3, 4
+
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+# ---------------------------------------------------------------- containers
+
+def _jpeg_exif(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # Fill bytes
+        while marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+        code = marker[1]
+        if code in (0xD9, 0xDA):  # EOI / start of scan: no EXIF before the image data
+            return None
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if code == 0xE1:
+            header = f.read(6)
+            if header == b"Exif\x00\x00":
+                return f.read(length - 8)
+            f.seek(length - 8, os.SEEK_CUR)
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def _png_exif(f):
+    f.seek(8)
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", head)
+        if chunk_type == b"eXIf":
+            return f.read(length)
+        if chunk_type == b"IEND":
+            return None
+        f.seek(length + 4, os.SEEK_CUR)  # data + CRC
+
+
+def _boxes(data, start=0, end=None):
+    """Yield (type, payload_start, box_end) for ISO BMFF boxes in data[start:end]."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[pos:pos + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _read_uint(data, pos, size):
+    if size == 0:
+        return 0, pos
+    fmt = {2: ">H", 4: ">I", 8: ">Q"}[size]
+    return struct.unpack(fmt, data[pos:pos + size])[0], pos + size
+
+
+def _heic_exif(f):
+    # Top level boxes: read headers only until "meta"
+    f.seek(0)
+    meta = None
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", head)
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        if box_type == b"meta":
+            meta = f.read(size - header)
+            break
+        if size == 0:
+            return None
+        f.seek(size - header, os.SEEK_CUR)
+
+    exif_item = None
+    locations = {}
+    for box_type, start, end in _boxes(meta, 4):  # meta is a full box: skip version/flags
+        if box_type == b"iinf":
+            version = meta[start]
+            pos = start + 4
+            _, pos = _read_uint(meta, pos, 2 if version == 0 else 4)
+            for entry_type, entry_start, _ in _boxes(meta, pos, end):
+                if entry_type != b"infe":
+                    continue
+                entry_version = meta[entry_start]
+                pos = entry_start + 4
+                if entry_version < 2:
+                    continue
+                item_id, pos = _read_uint(meta, pos, 2 if entry_version == 2 else 4)
+                pos += 2  # protection index
+                if meta[pos:pos + 4] == b"Exif":
+                    exif_item = item_id
+        elif box_type == b"iloc":
+            version = meta[start]
+            pos = start + 4
+            offset_size, length_size = meta[pos] >> 4, meta[pos] & 0x0F
+            base_offset_size, index_size = meta[pos + 1] >> 4, meta[pos + 1] & 0x0F
+            pos += 2
+            item_count, pos = _read_uint(meta, pos, 2 if version < 2 else 4)
+            for _ in range(item_count):
+                item_id, pos = _read_uint(meta, pos, 2 if version < 2 else 4)
+                if version in (1, 2):
+                    pos += 2  # construction method
+                pos += 2  # data reference index
+                base_offset, pos = _read_uint(meta, pos, base_offset_size)
+                extent_count, pos = _read_uint(meta, pos, 2)
+                extents = []
+                for _ in range(extent_count):
+                    if version in (1, 2) and index_size:
+                        _, pos = _read_uint(meta, pos, index_size)
+                    offset, pos = _read_uint(meta, pos, offset_size)
+                    length, pos = _read_uint(meta, pos, length_size)
+                    extents.append((base_offset + offset, length))
+                locations[item_id] = extents
+
+    if exif_item is None or exif_item not in locations:
+        return None
+    payload = b""
+    for offset, length in locations[exif_item]:
+        f.seek(offset)
+        payload += f.read(length)
+    # Exif item: 4 byte offset to the TIFF header (usually skipping "Exif\0\0")
+    tiff_offset = struct.unpack(">I", payload[:4])[0]
+    return payload[4 + tiff_offset:]
+
+
+def read_exif_block(path):
+    """Raw TIFF-structured EXIF bytes from a JPEG, PNG or HEIC/HEIF file, or None."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_exif(f)
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            return _png_exif(f)
+        if head[4:8] == b"ftyp":
+            return _heic_exif(f)
+    raise ValueError(f"Unsupported image format: {path}")
+
+
+# ---------------------------------------------------------------- TIFF
+
+class _Tiff:
+    def __init__(self, data):
+        if data[:2] == b"II":
+            self.endian = "<"
+        elif data[:2] == b"MM":
+            self.endian = ">"
+        else:
+            raise ValueError("Not a TIFF header")
+        self.data = data
+
+    def unpack(self, fmt, offset):
+        return struct.unpack_from(self.endian + fmt, self.data, offset)
+
+    def ifd(self, offset, wanted):
+        """{tag: value} for the wanted tags of the IFD at offset."""
+        found = {}
+        count = self.unpack("H", offset)[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag, typ, n = self.unpack("HHI", entry)
+            if tag not in wanted or typ not in TYPE_SIZES:
+                continue
+            size = TYPE_SIZES[typ] * n
+            value_offset = entry + 8 if size <= 4 else self.unpack("I", entry + 8)[0]
+            found[tag] = self.value(typ, n, value_offset)
+            if len(found) == len(wanted):
+                break
+        return found
+
+    def value(self, typ, n, offset):
+        if typ == 2:
+            return self.data[offset:offset + n].split(b"\x00", 1)[0].decode("ascii", "ignore").strip()
+        if typ in (5, 10):
+            parts = self.unpack(("I" if typ == 5 else "i") * 2 * n, offset)
+            return [parts[i] / parts[i + 1] if parts[i + 1] else 0.0 for i in range(0, len(parts), 2)]
+        if typ in (3, 4, 9):
+            code = {3: "H", 4: "I", 9: "i"}[typ]
+            values = self.unpack(code * n, offset)
+            return values[0] if n == 1 else list(values)
+        return self.data[offset:offset + n]
+
+
+def _dms_to_decimal(dms, ref):
+    decimal = dms[0] + dms[1] / 60.0 + dms[2] / 3600.0
+    return -decimal if ref in ("S", "W") else decimal
+
+
+def parse_exif(data):
+    """{'latitude', 'longitude', 'datetime'} from TIFF bytes, None where missing."""
+    result = {"latitude": None, "longitude": None, "datetime": None}
+    if not data:
+        return result
+    tiff = _Tiff(data)
+    ifd0 = tiff.ifd(tiff.unpack("I", 4)[0], {TAG_EXIF_IFD, TAG_GPS_IFD, TAG_DATETIME})
+
+    if TAG_EXIF_IFD in ifd0:
+        exif = tiff.ifd(ifd0[TAG_EXIF_IFD], {TAG_DATETIME_ORIGINAL})
+        result["datetime"] = exif.get(TAG_DATETIME_ORIGINAL) or None
+    if not result["datetime"]:
+        result["datetime"] = ifd0.get(TAG_DATETIME) or None
+
+    if TAG_GPS_IFD in ifd0:
+        gps = tiff.ifd(ifd0[TAG_GPS_IFD], {GPS_LAT_REF, GPS_LAT, GPS_LON_REF, GPS_LON})
+        if GPS_LAT in gps and GPS_LON in gps and len(gps[GPS_LAT]) == 3 and len(gps[GPS_LON]) == 3:
+            result["latitude"] = _dms_to_decimal(gps[GPS_LAT], gps.get(GPS_LAT_REF, "N"))
+            result["longitude"] = _dms_to_decimal(gps[GPS_LON], gps.get(GPS_LON_REF, "E"))
+    return result
+
+
+def read_metadata(path):
+    """GPS + capture time of one image, reading only its EXIF header."""
+    try:
+        return parse_exif(read_exif_block(path))
+    except (OSError, ValueError, struct.error, KeyError) as e:
+        print(f"Could not read EXIF from {path}: {e}")
+        return {"latitude": None, "longitude": None, "datetime": None}
+
+
+def read_many(paths, max_workers=8):
+    """read_metadata for every image of a submission, concurrently, in input order."""
+    if len(paths) <= 1:
+        return [read_metadata(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return list(pool.map(read_metadata, paths))
+
+
+def reconcile(results, max_spread_m=250):
+    """
+    One position for a multi-photo submission: the median of all geotagged images,
+    recomputed after dropping images more than max_spread_m away from it.
+    """
+    located = [r for r in results if r["latitude"] is not None and r["longitude"] is not None]
+    datetimes = sorted(r["datetime"] for r in results if r["datetime"])
+    merged = {"latitude": None, "longitude": None, "datetime": datetimes[0] if datetimes else None,
+              "images_used": 0, "outliers": 0}
+    if not located:
+        return merged
+
+    lat = statistics.median(r["latitude"] for r in located)
+    lon = statistics.median(r["longitude"] for r in located)
+    distances = haversine_one_to_many(lat, lon, [r["latitude"] for r in located],
+                                      [r["longitude"] for r in located])
+    inliers = [r for r, d in zip(located, distances) if d <= max_spread_m] or located
+    merged["latitude"] = statistics.median(r["latitude"] for r in inliers)
+    merged["longitude"] = statistics.median(r["longitude"] for r in inliers)
+    merged["images_used"] = len(inliers)
+    merged["outliers"] = len(located) - len(inliers)
+    return merged
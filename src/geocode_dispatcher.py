@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+
+class GeocoderBusy(RuntimeError):
+    """Raised when the dispatch queue stays full past the request deadline."""
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio code: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GeocodeDispatcher:
+    """
+    Runs reverse geocoding requests on a private asyncio loop in a background thread.
+
+    - a token bucket keeps us within the Nominatim usage policy (1 req/s by default)
+    - concurrent requests for the same key share one in-flight lookup
+    - the queue is bounded; callers wait for a slot (backpressure) until their deadline
+    - requests whose deadline passed while queued are dropped instead of fetched
+
+    `fetch(lat, lon)` is a blocking function; it runs in the loop's default executor.
+    """
+
+    def __init__(self, fetch, rate_per_sec=1.0, burst=1, max_queue=100, workers=1, default_deadline=20.0):
+        self.fetch = fetch
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.max_queue = max_queue
+        self.workers = workers
+        self.default_deadline = default_deadline
+        self.counters = {"requests": 0, "coalesced": 0, "fetched": 0, "expired": 0, "rejected": 0}
+        self._loop = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            thread = threading.Thread(target=self._run_loop, args=(loop, ready), name="geocode-dispatcher",
+                                      daemon=True)
+            thread.start()
+            ready.wait()
+            # Published only once the queue exists, so stats() never sees a loop without one
+            self._loop = loop
+
+    def _run_loop(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._bucket = AsyncTokenBucket(self.rate_per_sec, self.burst)
+        self._in_flight = {}
+        for _ in range(self.workers):
+            loop.create_task(self._worker())
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    async def _worker(self):
+        while True:
+            key, lat, lon, deadline, future = await self._queue.get()
+            try:
+                if time.monotonic() >= deadline:
+                    self.counters["expired"] += 1
+                    future.set_exception(TimeoutError(f"Geocode request for {key} expired in queue"))
+                    continue
+                await self._bucket.acquire()
+                self.counters["fetched"] += 1
+                result = await asyncio.get_running_loop().run_in_executor(None, self.fetch, lat, lon)
+                future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._in_flight.pop(key, None)
+                self._queue.task_done()
+
+    async def submit(self, key, lat, lon, deadline=None):
+        """Await the result for key, joining an in-flight request when there is one."""
+        deadline = time.monotonic() + (deadline or self.default_deadline)
+        self.counters["requests"] += 1
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+        else:
+            future = self._loop.create_future()
+            # Retrieve the exception even if every waiter already gave up
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._in_flight[key] = future
+            try:
+                await asyncio.wait_for(self._queue.put((key, lat, lon, deadline, future)),
+                                       max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                self._in_flight.pop(key, None)
+                self.counters["rejected"] += 1
+                future.set_exception(GeocoderBusy("Geocoding queue is full"))
+                raise GeocoderBusy("Geocoding queue is full")
+
+        return await asyncio.wait_for(asyncio.shield(future), max(deadline - time.monotonic(), 0))
+
+    def reverse_blocking(self, lat, lon, key=None, deadline=None):
+        """Blocking wrapper for synchronous callers such as MetadataExtractor.extract_metadata."""
+        self._ensure_started()
+        key = key or f"{lat},{lon}"
+        future = asyncio.run_coroutine_threadsafe(self.submit(key, lat, lon, deadline), self._loop)
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Geocode request for {key} missed its deadline")
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["queued"] = self._queue.qsize() if self._loop is not None else 0
+        return stats
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+from src.geocode_dispatcher import GeocodeDispatcher
+from src.sqlite_helper import SQLiteDB
+
+
+class ReverseGeocoder:
+    """
+    Nominatim reverse geocoding behind an in-memory LRU and an on-disk SQLite cache.
+
+    Coordinates are rounded to `precision` decimal places before lookup, so two photos
+    taken a few meters apart share one cache entry (4 places is roughly 11m).
+    Entries older than `ttl_seconds` are treated as misses and purged periodically.
+
+    With an `offline` geocoder (see offline_geocoder.py) local boundaries are tried
+    first and Nominatim is only used for points they don't cover.
+
+    Cache misses go through a GeocodeDispatcher, which rate limits Nominatim calls and
+    merges concurrent misses for the same rounded coordinate into one request.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS reverse_geocode (
+        coord_key  TEXT PRIMARY KEY,
+        address    TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_reverse_geocode_age ON reverse_geocode(fetched_at);
+    """
+
+    def __init__(self, cache_path="cache/geocode_cache.db", precision=4, ttl_seconds=30 * 24 * 3600,
+                 memory_size=2048, user_agent="my-civic-app", offline=None, rate_per_sec=1.0,
+                 max_queue=100, deadline_seconds=20.0):
+        self.offline = offline
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self.user_agent = user_agent
+        self._geolocator = None
+        self.dispatcher = GeocodeDispatcher(self._fetch_now, rate_per_sec=rate_per_sec, max_queue=max_queue,
+                                            default_deadline=deadline_seconds)
+        self.db = SQLiteDB(cache_path, self.SCHEMA)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "errors": 0,
+                         "offline_hits": 0}
+
+    def quantize(self, lat, lon):
+        return f"{round(float(lat), self.precision):.{self.precision}f},{round(float(lon), self.precision):.{self.precision}f}"
+
+    def _remember(self, key, address, fetched_at):
+        with self._lock:
+            self._memory[key] = (address, fetched_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry[0]
+
+    def _from_disk(self, key):
+        row = self.db.query_one("SELECT address, fetched_at FROM reverse_geocode WHERE coord_key = ?", (key,))
+        if row is None or time.time() - row["fetched_at"] > self.ttl_seconds:
+            return None
+        address = json.loads(row["address"])
+        self._remember(key, address, row["fetched_at"])
+        return address
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _fetch(self, lat, lon):
+        return self.dispatcher.reverse_blocking(lat, lon, key=self.quantize(lat, lon))
+
+    @property
+    def geolocator(self):
+        # geopy is only imported once a point actually misses every cache
+        if self._geolocator is None:
+            from geopy.geocoders import Nominatim
+            self._geolocator = Nominatim(user_agent=self.user_agent)
+        return self._geolocator
+
+    def _fetch_now(self, lat, lon):
+        location = self.geolocator.reverse((lat, lon), language='en', addressdetails=True, timeout=10)
+        if location is None:
+            return {}
+        return location.raw.get("address", {})
+
+    def _store(self, key, address):
+        now = time.time()
+        self._remember(key, address, now)
+        self.db.execute(
+            "INSERT OR REPLACE INTO reverse_geocode (coord_key, address, fetched_at) VALUES (?, ?, ?)",
+            (key, json.dumps(address), now),
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self.purge_expired()
+
+    def reverse(self, lat, lon):
+        """Raw Nominatim address dict for (lat, lon). Network errors are raised and not cached."""
+        if self.offline is not None:
+            address = self.offline.lookup(lat, lon)
+            if address is not None:
+                self._count("offline_hits")
+                return address
+
+        key = self.quantize(lat, lon)
+        address = self._from_memory(key)
+        if address is not None:
+            self._count("memory_hits")
+            return address
+        address = self._from_disk(key)
+        if address is not None:
+            self._count("disk_hits")
+            return address
+
+        self._count("misses")
+        try:
+            address = self._fetch(lat, lon)
+        except Exception:
+            self._count("errors")
+            raise
+        self._store(key, address)
+        return address
+
+    def get_postcode(self, lat, lon):
+        try:
+            return self.reverse(lat, lon).get("postcode")
+        except Exception as e:
+            print(f"Reverse geocoding failed: {e}")
+            return None
+
+    def purge_expired(self):
+        self.db.execute("DELETE FROM reverse_geocode WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["offline_boundaries"] = len(self.offline) if self.offline is not None else 0
+        stats["dispatcher"] = self.dispatcher.stats()
+        return stats
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_reverse_geocoder():
+    """
+    Process-wide geocoder shared by MetadataExtractor and SimilarIssueFinder.
+    GEOCODER_MODE=offline_first loads OFFLINE_GEOCODER_DIR and falls back to Nominatim on misses.
+    """
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            offline = None
+            if os.getenv("GEOCODER_MODE", "nominatim").lower() == "offline_first":
+                from src.offline_geocoder import OfflineReverseGeocoder
+                offline = OfflineReverseGeocoder(os.getenv("OFFLINE_GEOCODER_DIR", "data/boundaries"))
+            _geocoder = ReverseGeocoder(
+                offline=offline,
+                cache_path=os.getenv("GEOCODE_CACHE_PATH", "cache/geocode_cache.db"),
+                precision=int(os.getenv("GEOCODE_CACHE_PRECISION", "4")),
+                ttl_seconds=float(os.getenv("GEOCODE_CACHE_TTL_DAYS", "30")) * 24 * 3600,
+                rate_per_sec=float(os.getenv("GEOCODE_RATE_PER_SEC", "1")),
+            )
+        return _geocoder
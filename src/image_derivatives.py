@@ -0,0 +1,114 @@
+"""
+Resized, re-encoded variants of uploaded photos, generated once and cached on disk.
+
+    thumb   - small WebP for dashboard listings
+    email   - JPEG kept under a byte budget so several fit in one SMTP message
+    twitter - JPEG within Twitter's media limits (5 MB, 4096px)
+
+Variants are produced on a background process pool as soon as a photo is submitted.
+Consumers call path_for(), which returns the cached variant, waits for a pending one,
+or renders it inline; if anything fails the original path is returned.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.image_store import ImageStore
+
+VARIANTS = {
+    "thumb": {"format": "WEBP", "ext": ".webp", "max_side": 320, "quality": 70, "max_bytes": None},
+    "email": {"format": "JPEG", "ext": ".jpg", "max_side": 1600, "quality": 82, "max_bytes": 400_000},
+    "twitter": {"format": "JPEG", "ext": ".jpg", "max_side": 4096, "quality": 88, "max_bytes": 5_000_000},
+}
+
+
+def render_variant(src_path, dest_path, variant):
+    """Write one variant of src_path to dest_path. Top level so it can run in a worker process."""
+    from PIL import Image, ImageOps
+
+    spec = VARIANTS[variant]
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img.thumbnail((spec["max_side"], spec["max_side"]))
+        tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        quality = spec["quality"]
+        while True:
+            img.save(tmp_path, spec["format"], quality=quality, optimize=True)
+            if spec["max_bytes"] is None or os.path.getsize(tmp_path) <= spec["max_bytes"]:
+                break
+            # Lower the quality first, then shrink
+            if quality > 50:
+                quality -= 10
+            else:
+                img = img.resize((max(1, int(img.width * 0.8)), max(1, int(img.height * 0.8))))
+        os.replace(tmp_path, dest_path)
+    return dest_path
+
+
+class DerivativeGenerator:
+    def __init__(self, root="uploads/derivatives", max_workers=2):
+        self.root = root
+        self.max_workers = max_workers
+        self._pool = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _key(self, image_path):
+        digest = ImageStore.digest_from_path(image_path)
+        if digest:
+            return digest
+        # Images outside the content-addressed store (older issues)
+        stat = os.stat(image_path)
+        return hashlib.sha256(f"{os.path.abspath(image_path)}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+    def _dest(self, image_path, variant):
+        return os.path.join(self.root, self._key(image_path), variant + VARIANTS[variant]["ext"])
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def schedule(self, image_paths, variants=tuple(VARIANTS)):
+        """Queue every missing variant of these images on the process pool."""
+        for image_path in image_paths:
+            if not os.path.exists(image_path):
+                continue
+            for variant in variants:
+                dest = self._dest(image_path, variant)
+                with self._lock:
+                    if os.path.exists(dest) or dest in self._pending:
+                        continue
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    future = self._executor().submit(render_variant, image_path, dest, variant)
+                    self._pending[dest] = future
+                future.add_done_callback(lambda _, d=dest: self._pending.pop(d, None))
+
+    def path_for(self, image_path, variant, timeout=30):
+        """Path of the requested variant, or image_path itself if it can't be produced."""
+        try:
+            dest = self._dest(image_path, variant)
+            if os.path.exists(dest):
+                return dest
+            future = self._pending.get(dest)
+            if future is not None:
+                return future.result(timeout=timeout)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            return render_variant(image_path, dest, variant)
+        except Exception as e:
+            print(f"Could not build {variant} variant of {image_path}: {e}")
+            return image_path
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_derivative_generator():
+    global _generator
+    with _generator_lock:
+        if _generator is None:
+            _generator = DerivativeGenerator()
+        return _generator
@@ -0,0 +1,171 @@
+"""
+Content-addressed storage for uploaded photos.
+
+Uploads are streamed to disk in chunks while being hashed, then stored once under
+objects/<2 hex>/<2 hex>/<sha256><ext>, so identical photos are kept a single time no
+matter what the phone named them. Issue states reference images by digest and a
+garbage collector removes objects no issue refers to any more.
+
+Usage:
+    python -m src.image_store gc [--dry-run] [--grace-hours 24]
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+CHUNK_SIZE = 1024 * 1024
+DIGEST_RE = re.compile(r"([0-9a-f]{64})")
+
+# Extension picked from the file's magic bytes, so equal bytes always land on the same path
+_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"RIFF", ".webp"),
+]
+
+
+def _extension(head):
+    for magic, ext in _SIGNATURES:
+        if head.startswith(magic):
+            return ext
+    if head[4:8] == b"ftyp":
+        return ".heic"
+    return ".bin"
+
+
+class ImageStore:
+    def __init__(self, root="uploads"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _object_path(self, digest, ext):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:4], digest + ext)
+
+    def put_stream(self, stream, chunk_size=CHUNK_SIZE):
+        """
+        Store a readable binary stream (e.g. a Streamlit UploadedFile).
+        Returns (digest, path); if the same bytes were stored before, the existing path is returned.
+        """
+        hasher = hashlib.sha256()
+        head = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    if len(head) < 16:
+                        head += chunk[:16]
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            digest = hasher.hexdigest()
+            path = self._object_path(digest, _extension(head))
+            if os.path.exists(path):
+                # Duplicate upload, refresh mtime so the collector's grace period restarts
+                os.utime(path)
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return digest, path
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_file(self, file_path):
+        with open(file_path, "rb") as f:
+            return self.put_stream(f)
+
+    def path_for(self, digest):
+        folder = os.path.join(self.objects_dir, digest[:2], digest[2:4])
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.startswith(digest):
+                    return os.path.join(folder, name)
+        return None
+
+    @staticmethod
+    def digest_from_path(path):
+        """The digest of a stored object path, or None for paths outside the store."""
+        match = DIGEST_RE.search(os.path.basename(path or ""))
+        return match.group(1) if match else None
+
+    def iter_objects(self):
+        for dirpath, _, files in os.walk(self.objects_dir):
+            for name in files:
+                digest = self.digest_from_path(name)
+                if digest:
+                    path = os.path.join(dirpath, name)
+                    yield digest, path
+
+    def delete(self, digest):
+        path = self.path_for(digest)
+        if path:
+            os.remove(path)
+
+
+def issue_image_digests(state):
+    """Every image digest an issue state references (own and merged-in photos)."""
+    digests = list(state.get("image_digests") or []) + list(state.get("similar_image_digests") or [])
+    for path in (state.get("image_paths") or []) + (state.get("similar_image_paths") or []):
+        digest = ImageStore.digest_from_path(path)
+        if digest:
+            digests.append(digest)
+    return digests
+
+
+def reference_counts(issue_handler):
+    counts = Counter()
+    for _, state in issue_handler.iter_issues(("active", "completed", "rejected")):
+        # Count each issue once per image even if listed under several fields
+        counts.update(set(issue_image_digests(state)))
+    return counts
+
+
+def collect_garbage(store, issue_handler, grace_seconds=24 * 3600, dry_run=False):
+    """
+    Delete stored images with a zero reference count. Objects younger than grace_seconds
+    are kept, since their submission may still be in progress.
+    """
+    counts = reference_counts(issue_handler)
+    now = time.time()
+    report = {"objects": 0, "referenced": 0, "deleted": 0, "freed_bytes": 0, "kept_recent": 0}
+    for digest, path in list(store.iter_objects()):
+        report["objects"] += 1
+        if counts[digest] > 0:
+            report["referenced"] += 1
+            continue
+        if now - os.path.getmtime(path) < grace_seconds:
+            report["kept_recent"] += 1
+            continue
+        report["deleted"] += 1
+        report["freed_bytes"] += os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+            # Cached thumbnails / email / Twitter variants of it (see image_derivatives.py)
+            shutil.rmtree(os.path.join(store.root, "derivatives", digest), ignore_errors=True)
+    return report
+
+
+if __name__ == "__main__":
+    from src.manage_issue.Issue_manager import IssueState
+
+    parser = argparse.ArgumentParser(description="Content-addressed image store maintenance")
+    parser.add_argument("command", choices=["gc"])
+    parser.add_argument("--root", default="uploads")
+    parser.add_argument("--grace-hours", type=float, default=24)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    result = collect_garbage(ImageStore(args.root), IssueState(), args.grace_hours * 3600, args.dry_run)
+    print(result)
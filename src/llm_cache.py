@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+import time
+
+from src.sqlite_helper import SQLiteDB
+
+
+def canonical_prompt(prompt):
+    """Prompt text with indentation, blank lines and repeated spaces folded, so formatting edits share a key."""
+    lines = (" ".join(line.split()) for line in prompt.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def prompt_key(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\n{canonical_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+def model_name_of(model):
+    return getattr(model, "model_name", None) or str(model)
+
+
+class LLMCache:
+    """
+    SQLite cache of LLM responses keyed by model name + hash of the canonicalized prompt.
+
+    generate() is a drop-in for `gateway.generate(prompt, site)` (src/llm_gateway.py). Each call site passes
+    a `site` name: sites listed in `disabled_sites` always call the model, and
+    force_refresh=True (the dashboard's retry buttons) skips the lookup and overwrites
+    the entry. Hits record the latency of the original call as time saved.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        prompt_key TEXT PRIMARY KEY,
+        model      TEXT NOT NULL,
+        site       TEXT,
+        response   TEXT NOT NULL,
+        latency    REAL NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_age ON llm_cache(created_at);
+    """
+
+    def __init__(self, db_path="cache/llm_cache.db", ttl_seconds=7 * 24 * 3600, disabled_sites=()):
+        self.ttl_seconds = ttl_seconds
+        self.disabled_sites = set(disabled_sites)
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.counters = {}
+
+    def _site_counters(self, site):
+        return self.counters.setdefault(site, {"hits": 0, "misses": 0, "bypassed": 0, "refreshed": 0,
+                                               "saved_seconds": 0.0, "model_seconds": 0.0})
+
+    def _count(self, site, name, amount=1):
+        with self._lock:
+            self._site_counters(site)[name] += amount
+
+    def get(self, model_name, prompt):
+        """(response, original latency) or None."""
+        row = self.db.query_one("SELECT response, latency, created_at FROM llm_cache WHERE prompt_key = ?",
+                                (prompt_key(model_name, prompt),))
+        if row is None or time.time() - row["created_at"] > self.ttl_seconds:
+            return None
+        return row["response"], row["latency"]
+
+    def put(self, model_name, prompt, response, latency, site=None):
+        self.db.execute(
+            """
+            INSERT OR REPLACE INTO llm_cache (prompt_key, model, site, response, latency, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (prompt_key(model_name, prompt), model_name, site, response, latency, time.time()),
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % 200 == 0
+        if purge:
+            self.purge_expired()
+
+    def generate(self, model, prompt, site="default", force_refresh=False, call=None):
+        """
+        Response text for prompt, from the cache when possible.
+        `call(prompt)` produces the text on a miss; it defaults to model.generate(prompt, site=site)
+        for the LLM gateway and model.generate_content(prompt).text for a bare genai model.
+        """
+        if call is None:
+            if hasattr(model, "generate_content"):
+                call = lambda p: model.generate_content(p).text
+            else:
+                call = lambda p: model.generate(p, site=site)
+        name = model_name_of(model)
+        use_cache = site not in self.disabled_sites
+        if use_cache and not force_refresh:
+            cached = self.get(name, prompt)
+            if cached is not None:
+                self._count(site, "hits")
+                self._count(site, "saved_seconds", cached[1])
+                return cached[0]
+
+        start = time.perf_counter()
+        text = call(prompt)
+        latency = time.perf_counter() - start
+        self._count(site, "model_seconds", latency)
+        if not use_cache:
+            self._count(site, "bypassed")
+            return text
+        self._count(site, "refreshed" if force_refresh else "misses")
+        if text:
+            self.put(name, prompt, text, latency, site)
+        return text
+
+    def stream(self, model, prompt, site="default", force_refresh=False):
+        """
+        Like generate() but yields text chunks: a cache hit comes out as one chunk, a miss is
+        streamed from the gateway and stored once complete.
+        """
+        name = model_name_of(model)
+        use_cache = site not in self.disabled_sites
+        if use_cache and not force_refresh:
+            cached = self.get(name, prompt)
+            if cached is not None:
+                self._count(site, "hits")
+                self._count(site, "saved_seconds", cached[1])
+                yield cached[0]
+                return
+
+        start = time.perf_counter()
+        parts = []
+        for chunk in model.stream(prompt, site=site):
+            parts.append(chunk)
+            yield chunk
+        latency = time.perf_counter() - start
+        self._count(site, "model_seconds", latency)
+        if not use_cache:
+            self._count(site, "bypassed")
+            return
+        self._count(site, "refreshed" if force_refresh else "misses")
+        text = "".join(parts)
+        if text:
+            self.put(name, prompt, text, latency, site)
+
+    def purge_expired(self):
+        self.db.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+    def stats(self):
+        """Per call site counters plus an "all" total with hit rate and saved seconds."""
+        with self._lock:
+            stats = {site: dict(c) for site, c in self.counters.items()}
+        total = {}
+        for site_stats in stats.values():
+            for name, value in site_stats.items():
+                total[name] = total.get(name, 0) + value
+        stats["all"] = total
+        for site_stats in stats.values():
+            lookups = site_stats.get("hits", 0) + site_stats.get("misses", 0)
+            site_stats["hit_rate"] = site_stats.get("hits", 0) / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide cache shared by Authority_Finder and Social_Handles."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disabled = [s.strip() for s in os.getenv("LLM_CACHE_DISABLED_SITES", "").split(",") if s.strip()]
+            _cache = LLMCache(
+                db_path=os.getenv("LLM_CACHE_PATH", "cache/llm_cache.db"),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600,
+                disabled_sites=disabled,
+            )
+        return _cache
@@ -0,0 +1,277 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+
+class LLMError(RuntimeError):
+    """Raised when no model produced a response before the call's deadline."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """Take a token, waiting until `deadline` (time.monotonic()) at most. Returns False on timeout."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def is_retryable(error):
+    """Quota, overload and transient network errors are worth another try; bad requests are not."""
+    try:
+        from google.api_core import exceptions as api_exceptions
+        retryable = (api_exceptions.ResourceExhausted, api_exceptions.ServiceUnavailable,
+                     api_exceptions.DeadlineExceeded, api_exceptions.InternalServerError,
+                     api_exceptions.TooManyRequests, api_exceptions.GatewayTimeout)
+    except ImportError:
+        retryable = ()
+    return isinstance(error, retryable + (TimeoutError, ConnectionError))
+
+
+def chunk_text(chunk, strict=True):
+    """Text of a response or stream chunk. Streams end with chunks that carry no text part."""
+    if chunk is None:
+        return ""
+    try:
+        return chunk.text
+    except ValueError:
+        if strict:
+            raise
+        return ""
+
+
+def consume(chunks, on_chunk=None):
+    """Join a chunk generator into the full text, passing the text so far to on_chunk after each piece."""
+    text = ""
+    for piece in chunks:
+        text += piece
+        if on_chunk is not None:
+            on_chunk(text)
+    return text
+
+
+def parse_rates(spec):
+    """"model=rpm,model=rpm" -> {model: requests per minute}."""
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, rpm = item.split("=", 1)
+            rates[name.strip()] = float(rpm)
+    return rates
+
+
+class LLMGateway:
+    """
+    The one place the app talks to Gemini.
+
+    - a process-wide semaphore caps concurrent requests (`max_concurrent`)
+    - each model has a token bucket with its requests-per-minute quota
+    - retryable errors are retried with exponential backoff + jitter
+    - every call has a hard deadline (`timeout` seconds) covering queueing, retries and fallback
+    - when the primary model keeps failing, the call moves to `fallback_model`
+    - latency, token usage, retries and failures are counted per call site
+    - stream(prompt, site) yields the text as it is produced; time to first token is recorded
+
+    generate(prompt, site) returns the response text, or raises LLMError.
+    """
+
+    def __init__(self, api_key, model_name="gemini-2.5-flash-preview-04-17", fallback_model=None,
+                 max_concurrent=4, rpm=None, default_rpm=10, timeout=60.0, max_retries=3, base_delay=1.0):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.fallback_model = fallback_model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.default_rpm = default_rpm
+        self.rpm = dict(rpm or {})
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._buckets = {}
+        self._models = {}
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.recent = deque(maxlen=100)  # timing of the latest calls, newest last
+
+    def _model(self, name):
+        with self._lock:
+            if name not in self._models:
+                import google.generativeai as genai
+                if not self._models:
+                    genai.configure(api_key=self.api_key)
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    def _bucket(self, name):
+        with self._lock:
+            if name not in self._buckets:
+                rpm = self.rpm.get(name, self.default_rpm)
+                # Allow a small burst so a page's first few calls don't queue behind each other
+                self._buckets[name] = TokenBucket(rpm / 60.0, capacity=max(1, int(rpm // 10)))
+            return self._buckets[name]
+
+    def _count(self, site, **amounts):
+        with self._lock:
+            counters = self.counters.setdefault(site, {
+                "calls": 0, "failures": 0, "retries": 0, "fallbacks": 0, "timeouts": 0, "streams": 0,
+                "seconds": 0.0, "max_seconds": 0.0, "ttft_seconds": 0.0, "prompt_tokens": 0, "output_tokens": 0})
+            for name, amount in amounts.items():
+                if name == "max_seconds":
+                    counters[name] = max(counters[name], amount)
+                else:
+                    counters[name] += amount
+
+    def _acquire(self, name, deadline):
+        if not self._bucket(name).acquire(deadline):
+            raise TimeoutError(f"{name}: rate limit wait exceeds the deadline")
+        if not self._semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise TimeoutError("no free LLM slot before the deadline")
+
+    def _fail(self, site, error, deadline):
+        timed_out = time.monotonic() >= deadline or isinstance(error, TimeoutError)
+        self._count(site, failures=1, timeouts=1 if timed_out else 0)
+        return LLMError(f"LLM call for {site} failed: {error}")
+
+    def _run(self, prompt, site, model, timeout, generation_config, stream):
+        """
+        Yields the response text: in pieces as Gemini produces them when `stream` is set, else once.
+        Retries and fallback only happen before the first piece; after that an error is final.
+        """
+        start = time.monotonic()
+        deadline = start + (timeout or self.timeout)
+        models = [model or self.model_name]
+        if self.fallback_model and self.fallback_model not in models:
+            models.append(self.fallback_model)
+
+        last_error = None
+        for index, name in enumerate(models):
+            if index:
+                if last_error is not None and not is_retryable(last_error):
+                    break  # A bad prompt fails the same way on the fallback model
+                self._count(site, fallbacks=1)
+                print(f"LLM {site}: falling back to {name} after {last_error}")
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._acquire(name, deadline)
+                except TimeoutError as e:
+                    last_error = e
+                    break
+                delay = None
+                try:
+                    try:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("deadline passed while queued")
+                        response = self._model(name).generate_content(
+                            prompt, generation_config=generation_config, stream=stream,
+                            request_options={"timeout": remaining})
+                        chunks = iter(response) if stream else iter((response,))
+                        first = next(chunks, None)
+                        first_text = chunk_text(first, strict=not stream)
+                    except Exception as e:
+                        last_error = e
+                        if (is_retryable(e) and attempt < self.max_retries
+                                and time.monotonic() < deadline):
+                            delay = self.base_delay * (2 ** attempt) * (0.5 + random.random())
+                        if delay is None or time.monotonic() + delay >= deadline:
+                            delay = None
+                            break
+                        continue
+
+                    ttft = time.monotonic() - start
+                    yield first_text
+                    for chunk in chunks:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"{name}: response still streaming at the deadline")
+                        yield chunk_text(chunk)
+                except GeneratorExit:
+                    raise
+                except Exception as e:
+                    if delay is None:
+                        raise self._fail(site, e, deadline) from e
+                finally:
+                    self._semaphore.release()
+                    if delay is not None:
+                        self._count(site, retries=1)
+                        time.sleep(delay)
+
+                elapsed = time.monotonic() - start
+                usage = getattr(response, "usage_metadata", None)
+                self._count(site, calls=1, streams=1 if stream else 0, seconds=elapsed, max_seconds=elapsed,
+                            ttft_seconds=ttft,
+                            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                            output_tokens=getattr(usage, "candidates_token_count", 0) or 0)
+                self.recent.append({"site": site, "model": name, "streamed": stream, "ttft": round(ttft, 3),
+                                    "seconds": round(elapsed, 3), "at": time.time()})
+                return
+            if time.monotonic() >= deadline:
+                break
+
+        raise self._fail(site, last_error, deadline) from last_error
+
+    def generate(self, prompt, site="default", model=None, timeout=None, generation_config=None):
+        return "".join(self._run(prompt, site, model, timeout, generation_config, stream=False))
+
+    def stream(self, prompt, site="default", model=None, timeout=None, generation_config=None):
+        """Generator of text chunks as the model writes them. Time to first token is recorded per call."""
+        return self._run(prompt, site, model, timeout, generation_config, stream=True)
+
+    def last_call(self, site):
+        """Timing of the most recent successful call for site: {model, streamed, ttft, seconds, at}, or None."""
+        for call in reversed(self.recent):
+            if call["site"] == site:
+                return call
+        return None
+
+    def stats(self):
+        """Per call site counters, with average latency."""
+        with self._lock:
+            stats = {site: dict(c) for site, c in self.counters.items()}
+        for site_stats in stats.values():
+            calls = site_stats["calls"]
+            site_stats["avg_seconds"] = site_stats["seconds"] / calls if calls else 0.0
+            site_stats["avg_ttft"] = site_stats["ttft_seconds"] / calls if calls else 0.0
+        return stats
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway():
+    """Process-wide gateway shared by Authority_Finder and Social_Handles."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY not found in environment variables")
+            _gateway = LLMGateway(
+                api_key,
+                model_name=os.getenv("LLM_MODEL", "gemini-2.5-flash-preview-04-17"),
+                fallback_model=os.getenv("LLM_FALLBACK_MODEL") or None,
+                max_concurrent=int(os.getenv("LLM_MAX_CONCURRENT", "4")),
+                rpm=parse_rates(os.getenv("LLM_RPM")),
+                default_rpm=float(os.getenv("LLM_DEFAULT_RPM", "10")),
+                timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            )
+        return _gateway
@@ -1,48 +1,91 @@
+import copy
 import json
-import os
+from datetime import datetime
 
+from src.manage_issue.issue_store import get_issue_store
+from src.manage_issue.photo_index import get_photo_index
+from src.manage_issue.spatial_index import get_spatial_index
 from src.manage_issue.state_template import Blank_state
 
 
 class IssueState():
-    def __init__(self):
+    def __init__(self, store=None, spatial_index=None, photo_index=None):
         self.state_temp=Blank_state
+        # Storage backend (SQLite by default, see issue_store.get_issue_store)
+        self.store = store if store is not None else get_issue_store()
+        # Geohash grid used by SimilarIssueFinder, kept in sync on every write
+        self.spatial_index = spatial_index if spatial_index is not None else get_spatial_index(self.store)
+        # Perceptual hashes of every stored photo, for near-duplicate image lookups
+        self.photo_index = photo_index if photo_index is not None else get_photo_index(self.store)
 
     def from_blank(self, img_paths):
-        new_state=self.state_temp
+        new_state=copy.deepcopy(self.state_temp)
         new_state['image_paths']=img_paths
+        new_state['created_at']=datetime.now().isoformat()
         return new_state
 
     def update_issue(self, state):
-        issue_id = state['issue_id']
-        metadata = state['metadata']
-        os.makedirs("issues", exist_ok=True)
-        file_path = os.path.join("issues/active", f"{issue_id}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=4)
+        self.store.save(state)
+        self.spatial_index.add(state)
+        self.photo_index.add(state)
         # 4. Optionally add status = "stored" to state
         state['stored'] = True
         # 5. Return updated state
         print("Issue stored or Updated")
 
+    def move_issue(self, issue_id, folder, state=None):
+        # folder is one of "active", "completed", "rejected"
+        self.store.move(issue_id, folder, state)
+        if folder == "rejected":
+            # Rejected reports never count as an earlier report of the same problem
+            self.spatial_index.remove(issue_id)
+            self.photo_index.remove(issue_id)
+        elif state is not None:
+            self.spatial_index.add(state, folder)
+            self.photo_index.add(state, folder)
+        else:
+            self.spatial_index.move(issue_id, folder)
+            self.photo_index.move(issue_id, folder)
+
     def load_json_as_dict(self, filepath):
         with open(filepath, 'r') as f:
             data = json.load(f)
         return data
     def get_all_active_ids(self):
-        return [f.split('.')[0] for f in os.listdir("issues/active") if f.endswith(".json")]
+        return self.store.ids("active")
 
     def get_all_completed_ids(self):
-        return [f.split('.')[0] for f in os.listdir("issues/completed") if f.endswith(".json")]
+        return self.store.ids("completed")
+
+    def get_all_rejected_ids(self):
+        return self.store.ids("rejected")
 
     def get_data(self, issue_id):
-        # file_path = os.path.join("issues/active/", f"{issue_id}.json")
-        base_dir = os.path.join("issues", "active")
-        # print("Current working directory:", os.getcwd())
-        filename=f"{issue_id}.json"
-        file_path = os.path.join(base_dir, filename)
-        # print(file_path)
-        return self.load_json_as_dict(file_path)
+        state = self.store.get(issue_id, "active")
+        if state is None:
+            raise FileNotFoundError(f"Active issue {issue_id} not found")
+        return state
+
+    def find_issue(self, issue_id):
+        # Looks in every folder, returns (folder, state) or (None, None)
+        folder = self.store.locate_folder(issue_id)
+        if folder is None:
+            return None, None
+        return folder, self.store.get(issue_id, folder)
+
+    def query_issues(self, folder="active", admin_stage=None, city=None, issue_type=None, status=None,
+                     exclude_stage=None):
+        return self.store.query(folder, exclude_stage=exclude_stage, admin_stage=admin_stage, city=city,
+                                issue_type=issue_type, status=status)
+
+    def get_issue_summaries(self, folder="active"):
+        return self.store.summaries(folder)
 
+    def distinct_values(self, column, folder="active", exclude_stage=None):
+        return self.store.distinct(column, folder, exclude_stage)
 
+    def count_issues(self, folder="active"):
+        return self.store.count(folder)
 
+    def iter_issues(self, folders=("active", "completed")):
+        return self.store.iter_states(folders)
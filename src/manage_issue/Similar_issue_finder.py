@@ -1,11 +1,14 @@
-import os
 import math
-import json
-from geopy.geocoders import Nominatim
+from datetime import datetime
+from src.exif_reader import read_many, reconcile
+from src.geocoder import get_reverse_geocoder
+from src.manage_issue.Issue_manager import IssueState
+from src.manage_issue.geo_distance import CandidateSet
+from src.manage_issue.photo_index import phash, hash_to_hex, hex_to_hash
 class SimilarIssueFinder:
-    def __init__(self, active_path="issues/active", completed_path="issues/completed", threshold_meters=2500):
-        self.active_path = active_path
-        self.completed_path = completed_path
+    def __init__(self, issue_handler=None, threshold_meters=2500, geocoder=None):
+        self.issue_handler = issue_handler or IssueState()
+        self.geocoder = geocoder or get_reverse_geocoder()
         self.threshold = threshold_meters
 
     def _haversine(self, lat1, lon1, lat2, lon2):
@@ -17,19 +20,8 @@ class SimilarIssueFinder:
         a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
         return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
-    def _load_state(self, file_path):
-        with open(file_path, "r") as f:
-            return json.load(f)
-
-
-
     def get_pincode_from_coords(self, lat, lon):
-        geolocator = Nominatim(user_agent="my-civic-app")
-        location = geolocator.reverse((lat, lon), exactly_one=True)
-
-        if location and location.raw.get("address"):
-            return location.raw["address"].get("postcode")
-        return None
+        return self.geocoder.get_postcode(lat, lon)
 
     def _get_location(self, state):
         try:
@@ -38,6 +30,113 @@ class SimilarIssueFinder:
         except:
             return None, None
 
+    def _nearest_in_index(self, new_lat, new_lon, new_type, folder):
+        rows = self.issue_handler.spatial_index.nearby(new_lat, new_lon, new_type, self.threshold, (folder,))
+        # One vectorized haversine pass over the candidate cells
+        candidates = CandidateSet.from_rows(rows)
+        return candidates.nearest(float(new_lat), float(new_lon), new_type, self.threshold)
+
+    def _merge_into_active(self, issue_id, new_state, photo_match=None):
+        state = self.issue_handler.get_data(issue_id)
+        state["similar_count"] = (int(state.get("similar_count")) if state.get(
+            "similar_count") is not None else 0) + 1
+
+        state.setdefault("similar_image_paths", [])
+        for img in new_state.get("image_paths", []):
+            if img not in state["similar_image_paths"]:
+                state["similar_image_paths"].append(img)
+        state.setdefault("similar_image_digests", [])
+        for digest in new_state.get("image_digests", []):
+            if digest not in state["similar_image_digests"]:
+                state["similar_image_digests"].append(digest)
+        state["similar_image_phashes"] = state.get("similar_image_phashes") or {}
+        for img, text in zip(new_state.get("image_paths", []), new_state.get("image_phashes") or []):
+            if text:
+                state["similar_image_phashes"][img] = text
+        if photo_match is not None:
+            state.setdefault("photo_matches", []).append(photo_match)
+        self.issue_handler.update_issue(state)
+        return state
+
+    def hash_images(self, image_paths):
+        """Perceptual hash (hex) of each image, None where the image can't be decoded."""
+        hashes = []
+        for path in image_paths:
+            try:
+                hashes.append(hash_to_hex(phash(path)))
+            except Exception as e:
+                print(f"Could not hash {path}: {e}")
+                hashes.append(None)
+        return hashes
+
+    def _submission_location(self, new_state, external_metadata):
+        """(lat, lon) of a submission from the form or the photos' EXIF header, without geocoding."""
+        if external_metadata:
+            return external_metadata.get("latitude"), external_metadata.get("longitude")
+        merged = reconcile(read_many(new_state.get("image_paths", [])))
+        return merged["latitude"], merged["longitude"]
+
+    def _same_problem(self, new_state, matched_state, location):
+        """A similar-looking photo only counts for the same issue type, and nearby when both positions are known."""
+        new_type = (new_state.get("issue_type") or "").strip().lower()
+        if (matched_state.get("issue_type") or "").strip().lower() != new_type:
+            return False
+        new_lat, new_lon = location
+        old_lat, old_lon = self._get_location(matched_state)
+        if new_lat is None or new_lon is None or old_lat is None or old_lon is None:
+            return True
+        return self._haversine(float(new_lat), float(new_lon), old_lat, old_lon) <= self.threshold
+
+    def check_duplicate_photos(self, new_state, external_metadata=None):
+        """
+        Look the submission's photos up in the perceptual hash index. Runs before any
+        metadata extraction or geocoding, so a resubmitted (re-encoded, resized, cropped)
+        photo of a known issue costs no lookups at all. Plain scenes (asphalt, a wall) look
+        alike, so a match must also have the same issue type and, when both have GPS, be
+        within threshold_meters.
+        Returns (found, issue_id, matched_state).
+        """
+        best = None
+        location = None
+        matched_states = {}
+        for img, text in zip(new_state.get("image_paths", []), new_state.get("image_phashes") or []):
+            if not text:
+                continue
+            for match in self.issue_handler.photo_index.search(hex_to_hash(text)):
+                if best is not None and match["distance"] >= best[1]["distance"]:
+                    break
+                if match["issue_id"] not in matched_states:
+                    matched_states[match["issue_id"]] = self.issue_handler.find_issue(match["issue_id"])[1]
+                matched_state = matched_states[match["issue_id"]]
+                if matched_state is None:
+                    continue
+                if location is None:
+                    # Only read once there is a candidate: most submissions match nothing
+                    location = self._submission_location(new_state, external_metadata)
+                if self._same_problem(new_state, matched_state, location):
+                    best = (img, match)
+                    break
+        if best is None:
+            return False, None, None
+
+        img, match = best
+        record = {"image": img, "matched_image": match["image"], "distance": match["distance"],
+                  "matched_at": datetime.now().isoformat()}
+        if match["folder"] == "active":
+            print(f"Duplicate photo of active issue: {match['issue_id']}, distance={match['distance']} bits")
+            state = self._merge_into_active(match["issue_id"], new_state, record)
+        else:
+            print(f"Duplicate photo of completed issue: {match['issue_id']}, distance={match['distance']} bits")
+            state = matched_states[match["issue_id"]]
+            state.setdefault("photo_matches", []).append(record)
+            # The record points at the new photo: keep it referenced for the image store's GC
+            state.setdefault("similar_image_digests", [])
+            for digest in new_state.get("image_digests", []):
+                if digest not in state["similar_image_digests"]:
+                    state["similar_image_digests"].append(digest)
+            self.issue_handler.update_issue(state)
+        return True, match["issue_id"], state
+
     def check_and_group(self, new_state, external_metadata):
         if external_metadata:
             new_lat = external_metadata["latitude"]
@@ -45,71 +144,37 @@ class SimilarIssueFinder:
         else:
             new_lat, new_lon = self._get_location(new_state)
         new_type = new_state.get("issue_type", "").strip().lower()
-        new_pin = self.get_pincode_from_coords(new_lat, new_lon)
 
         if not new_lat or not new_lon:
             print("Location missing in new issue. Skipping similarity check.")
             return False, None
 
-
+        # Only the geohash cells around the new point are read, partitioned by issue type
 
         # 1. Check Active Issues
-        for file in os.listdir(self.active_path):
-            path = os.path.join(self.active_path, file)
-            state = self._load_state(path)
-            pin1 = state.get("metadata", {}).get("Address", {}).get("postcode")
-
-
-            lat, lon = self._get_location(state)
-            if not lat or not lon:
-                continue
-
-            dist = self._haversine(new_lat, new_lon, lat, lon)
-            issue_type_existing = state.get("issue_type", "").strip().lower()
-
-            if dist <= self.threshold and issue_type_existing == new_type:
-                print(f"Match found in active: {file}, dist={dist:.2f} meters")
-
-                # Update existing state
-                # state.setdefault("similar_count", 1)
-                # simi_count=state["similar_count"]
-                # state["similar_count"] = int(simi_count) + 1
-                state["similar_count"] = (int(state.get("similar_count")) if state.get(
-                    "similar_count") is not None else 0) + 1
-
-                state.setdefault("similar_image_paths", [])
-                for img in new_state.get("image_paths", []):
-                    if img not in state["similar_image_paths"]:
-                        state["similar_image_paths"].append(img)
-                self._save_state(state, path)
-
-                return True, state.get("issue_id")
-            elif pin1 and new_pin and pin1 == new_pin:
-                return True, state.get("issue_id")
+        match = self._nearest_in_index(new_lat, new_lon, new_type, "active")
+        if match:
+            print(f"Match found in active: {match[0]}, dist={match[1]:.2f} meters")
+            self._merge_into_active(match[0], new_state)
+            return True, match[0]
 
         # 2. Check Completed Issues
-        for file in os.listdir(self.completed_path):
-            path = os.path.join(self.completed_path, file)
-            state = self._load_state(path)
-            pin1 = state.get("metadata", {}).get("Address", {}).get("postcode")
-
-            lat, lon = self._get_location(state)
-            if not lat or not lon:
-                continue
-
-            dist = self._haversine(new_lat, new_lon, lat, lon)
-            issue_type_existing = state.get("issue_type", "").strip().lower()
-
-            if dist <= self.threshold and issue_type_existing == new_type:
-                print(f"Already reported in completed: {file}, dist={dist:.2f} meters")
-                return True, state.get("issue_id")
-            elif pin1 and new_pin and pin1 == new_pin:
-                return True, state.get("issue_id")
+        match = self._nearest_in_index(new_lat, new_lon, new_type, "completed")
+        if match:
+            print(f"Already reported in completed: {match[0]}, dist={match[1]:.2f} meters")
+            return True, match[0]
+
+        # 3. Same postcode as an existing issue (indexed lookup, any type)
+        # The extractor already geocoded this point, so reuse its address before asking the geocoder
+        new_pin = ((new_state.get("metadata") or {}).get("Address") or {}).get("postcode")
+        if not new_pin:
+            new_pin = self.get_pincode_from_coords(new_lat, new_lon)
+        if new_pin:
+            for folder in ("active", "completed"):
+                rows = self.issue_handler.spatial_index.by_postcode(new_pin, (folder,))
+                if rows:
+                    return True, rows[0]["issue_id"]
 
         # No match found
         print("No similar issue found.")
         return False, None
-
-    def _save_state(self, state, path):
-        with open(path, "w") as f:
-            json.dump(state, f, indent=2)
@@ -0,0 +1,93 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_one_to_many(lat, lon, lats, lons):
+    """Distances in meters from one point to every point in lats/lons, in one vectorized pass."""
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lons = np.radians(np.asarray(lons, dtype=np.float64))
+    phi1 = np.radians(lat)
+    dphi = lats - phi1
+    dlambda = lons - np.radians(lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(lats) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_many_to_many(lats1, lons1, lats2, lons2):
+    """Full len(lats1) x len(lats2) distance matrix in meters."""
+    phi1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lam1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+    phi2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lam2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def pairs_within(lats1, lons1, lats2, lons2, max_meters, chunk_size=2048):
+    """
+    All (i, j, distance) with distance <= max_meters between two point sets.
+    Rows are processed in chunks so bulk re-clustering never builds the whole matrix.
+    """
+    lats1 = np.asarray(lats1, dtype=np.float64)
+    lons1 = np.asarray(lons1, dtype=np.float64)
+    out_i, out_j, out_d = [], [], []
+    for start in range(0, len(lats1), chunk_size):
+        block = haversine_many_to_many(lats1[start:start + chunk_size], lons1[start:start + chunk_size],
+                                       lats2, lons2)
+        i, j = np.nonzero(block <= max_meters)
+        out_i.append(i + start)
+        out_j.append(j)
+        out_d.append(block[i, j])
+    if not out_i:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    return np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_d)
+
+
+class CandidateSet:
+    """
+    Candidate issues held as contiguous float64 coordinate arrays plus an integer type code,
+    so the nearest same-type match is found with one vectorized distance pass.
+    """
+
+    def __init__(self, issue_ids, lats, lons, issue_types):
+        self.issue_ids = list(issue_ids)
+        self.lats = np.ascontiguousarray(lats, dtype=np.float64)
+        self.lons = np.ascontiguousarray(lons, dtype=np.float64)
+        self.type_names = sorted(set(issue_types))
+        codes = {name: code for code, name in enumerate(self.type_names)}
+        self.type_codes = np.fromiter((codes[t] for t in issue_types), dtype=np.int32, count=len(self.issue_ids))
+
+    @classmethod
+    def from_rows(cls, rows, default_type=""):
+        """Build from dicts with issue_id, latitude, longitude and (optionally) issue_type."""
+        return cls(
+            [row["issue_id"] for row in rows],
+            [row["latitude"] for row in rows],
+            [row["longitude"] for row in rows],
+            [(row.get("issue_type") or default_type) for row in rows],
+        )
+
+    def __len__(self):
+        return len(self.issue_ids)
+
+    def distances(self, lat, lon):
+        return haversine_one_to_many(lat, lon, self.lats, self.lons)
+
+    def nearest(self, lat, lon, issue_type=None, max_meters=None):
+        """(issue_id, distance) of the closest candidate of issue_type, or None."""
+        if not self.issue_ids:
+            return None
+        if issue_type is None:
+            positions = None
+            dist = self.distances(lat, lon)
+        else:
+            if issue_type not in self.type_names:
+                return None
+            positions = np.flatnonzero(self.type_codes == self.type_names.index(issue_type))
+            dist = haversine_one_to_many(lat, lon, self.lats[positions], self.lons[positions])
+        best = int(np.argmin(dist))
+        if max_meters is not None and dist[best] > max_meters:
+            return None
+        index = best if positions is None else int(positions[best])
+        return self.issue_ids[index], float(dist[best])
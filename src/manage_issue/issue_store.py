@@ -0,0 +1,306 @@
+import json
+import os
+from datetime import datetime
+
+from src.sqlite_helper import SQLiteDB
+
+FOLDERS = ("active", "completed", "rejected")
+
+# Columns that can be filtered on without parsing the stored state
+FILTER_COLUMNS = ("admin_stage", "city", "issue_type", "status")
+
+
+def index_fields(state):
+    """Pull the indexed columns out of an issue state."""
+    metadata = state.get("metadata") or {}
+    address = metadata.get("Address") or {}
+
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        "issue_id": state.get("issue_id"),
+        "admin_stage": state.get("admin_stage"),
+        "city": address.get("city"),
+        "issue_type": state.get("issue_type"),
+        "status": state.get("status"),
+        "latitude": _to_float(metadata.get("latitude")),
+        "longitude": _to_float(metadata.get("longitude")),
+        "created_at": state.get("created_at") or metadata.get("datetime"),
+        "tweet_url": (state.get("tweet") or {}).get("url"),
+    }
+
+
+def _matches(fields, filters):
+    for key, value in filters.items():
+        if value is not None and fields.get(key) != value:
+            return False
+    return True
+
+
+class JsonIssueStore:
+    """
+    The original layout: one JSON file per issue under issues/{active,completed,rejected}.
+    Every query is a full directory scan, so this is only meant for small setups.
+    """
+
+    def __init__(self, base_dir="issues"):
+        self.base_dir = base_dir
+        for folder in FOLDERS:
+            os.makedirs(os.path.join(base_dir, folder), exist_ok=True)
+
+    def _path(self, folder, issue_id):
+        return os.path.join(self.base_dir, folder, f"{issue_id}.json")
+
+    def _load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, state, folder=None):
+        issue_id = state["issue_id"]
+        if folder is None:
+            folder = self.locate_folder(issue_id) or "active"
+        with open(self._path(folder, issue_id), "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=4)
+
+    def locate_folder(self, issue_id):
+        for folder in FOLDERS:
+            if os.path.exists(self._path(folder, issue_id)):
+                return folder
+        return None
+
+    def get(self, issue_id, folder="active"):
+        folder = folder or self.locate_folder(issue_id)
+        if folder is None:
+            return None
+        path = self._path(folder, issue_id)
+        if not os.path.exists(path):
+            return None
+        return self._load(path)
+
+    def ids(self, folder="active"):
+        return [f.split('.')[0] for f in os.listdir(os.path.join(self.base_dir, folder)) if f.endswith(".json")]
+
+    def iter_states(self, folders=FOLDERS):
+        for folder in folders:
+            for issue_id in self.ids(folder):
+                yield folder, self._load(self._path(folder, issue_id))
+
+    def query(self, folder="active", exclude_stage=None, **filters):
+        results = []
+        for _, state in self.iter_states([folder]):
+            fields = index_fields(state)
+            if exclude_stage is not None and fields["admin_stage"] == exclude_stage:
+                continue
+            if _matches(fields, filters):
+                results.append(state)
+        return results
+
+    def summaries(self, folder="active"):
+        return [index_fields(state) for _, state in self.iter_states([folder])]
+
+    def distinct(self, column, folder="active", exclude_stage=None):
+        values = set()
+        for _, state in self.iter_states([folder]):
+            fields = index_fields(state)
+            if exclude_stage is not None and fields["admin_stage"] == exclude_stage:
+                continue
+            values.add(fields[column])
+        return sorted(v for v in values if v is not None)
+
+    def count(self, folder="active"):
+        return len(self.ids(folder))
+
+    def move(self, issue_id, dest_folder, state=None):
+        source_folder = self.locate_folder(issue_id)
+        if source_folder is None:
+            raise FileNotFoundError(f"Issue {issue_id} not found")
+        if state is not None:
+            self.save(state, source_folder)
+        os.rename(self._path(source_folder, issue_id), self._path(dest_folder, issue_id))
+
+
+class SQLiteIssueStore:
+    """
+    All issues in one SQLite file (WAL mode). The full state is kept as a JSON blob,
+    and the fields the dashboards filter on are copied into indexed columns.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS issues (
+        issue_id    TEXT PRIMARY KEY,
+        folder      TEXT NOT NULL,
+        admin_stage TEXT,
+        city        TEXT,
+        issue_type  TEXT,
+        status      TEXT,
+        latitude    REAL,
+        longitude   REAL,
+        created_at  TEXT,
+        tweet_url   TEXT,
+        updated_at  TEXT,
+        state       TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_issues_stage ON issues(folder, admin_stage);
+    CREATE INDEX IF NOT EXISTS idx_issues_city ON issues(folder, city);
+    CREATE INDEX IF NOT EXISTS idx_issues_type ON issues(folder, issue_type);
+    CREATE INDEX IF NOT EXISTS idx_issues_status ON issues(folder, status);
+    CREATE INDEX IF NOT EXISTS idx_issues_latlon ON issues(latitude, longitude);
+    CREATE INDEX IF NOT EXISTS idx_issues_created ON issues(created_at);
+    """
+
+    def __init__(self, db_path="issues/issues.db"):
+        self.db_path = db_path
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+
+    def save(self, state, folder=None):
+        fields = index_fields(state)
+        fields["folder"] = folder
+        fields["updated_at"] = datetime.now().isoformat()
+        fields["state"] = json.dumps(state)
+        self.db.execute(
+            """
+            INSERT INTO issues (issue_id, folder, admin_stage, city, issue_type, status,
+                                latitude, longitude, created_at, tweet_url, updated_at, state)
+            VALUES (:issue_id, COALESCE(:folder, 'active'), :admin_stage, :city, :issue_type, :status,
+                    :latitude, :longitude, :created_at, :tweet_url, :updated_at, :state)
+            ON CONFLICT(issue_id) DO UPDATE SET
+                folder = COALESCE(:folder, issues.folder),
+                admin_stage = excluded.admin_stage,
+                city = excluded.city,
+                issue_type = excluded.issue_type,
+                status = excluded.status,
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                created_at = excluded.created_at,
+                tweet_url = excluded.tweet_url,
+                updated_at = excluded.updated_at,
+                state = excluded.state
+            """,
+            fields,
+        )
+
+    def save_many(self, rows):
+        """Bulk insert of (folder, state) pairs, used by the migration tool."""
+        conn = self.db.connection()
+        with conn:
+            for folder, state in rows:
+                fields = index_fields(state)
+                fields["folder"] = folder
+                fields["updated_at"] = datetime.now().isoformat()
+                fields["state"] = json.dumps(state)
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO issues (issue_id, folder, admin_stage, city, issue_type, status,
+                                                   latitude, longitude, created_at, tweet_url, updated_at, state)
+                    VALUES (:issue_id, :folder, :admin_stage, :city, :issue_type, :status,
+                            :latitude, :longitude, :created_at, :tweet_url, :updated_at, :state)
+                    """,
+                    fields,
+                )
+
+    def locate_folder(self, issue_id):
+        row = self.db.query_one("SELECT folder FROM issues WHERE issue_id = ?", (issue_id,))
+        return row["folder"] if row else None
+
+    def get(self, issue_id, folder="active"):
+        if folder:
+            row = self.db.query_one("SELECT state FROM issues WHERE issue_id = ? AND folder = ?", (issue_id, folder))
+        else:
+            row = self.db.query_one("SELECT state FROM issues WHERE issue_id = ?", (issue_id,))
+        return json.loads(row["state"]) if row else None
+
+    def ids(self, folder="active"):
+        return [row["issue_id"] for row in self.db.query("SELECT issue_id FROM issues WHERE folder = ?", (folder,))]
+
+    def iter_states(self, folders=FOLDERS):
+        for folder in folders:
+            for row in self.db.query("SELECT state FROM issues WHERE folder = ?", (folder,)):
+                yield folder, json.loads(row["state"])
+
+    def _where(self, folder, exclude_stage, filters):
+        clauses = ["folder = ?"]
+        params = [folder]
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter on {column}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if exclude_stage is not None:
+            clauses.append("admin_stage IS NOT ?")
+            params.append(exclude_stage)
+        return " AND ".join(clauses), params
+
+    def query(self, folder="active", exclude_stage=None, **filters):
+        where, params = self._where(folder, exclude_stage, filters)
+        rows = self.db.query(f"SELECT state FROM issues WHERE {where} ORDER BY created_at", params)
+        return [json.loads(row["state"]) for row in rows]
+
+    def summaries(self, folder="active"):
+        rows = self.db.query(
+            """
+            SELECT issue_id, admin_stage, city, issue_type, status, latitude, longitude, created_at, tweet_url
+            FROM issues WHERE folder = ? ORDER BY created_at
+            """,
+            (folder,),
+        )
+        return [dict(row) for row in rows]
+
+    def distinct(self, column, folder="active", exclude_stage=None):
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot list values of {column}")
+        where, params = self._where(folder, exclude_stage, {})
+        rows = self.db.query(
+            f"SELECT DISTINCT {column} FROM issues WHERE {where} AND {column} IS NOT NULL ORDER BY {column}",
+            params,
+        )
+        return [row[0] for row in rows]
+
+    def count(self, folder="active"):
+        return self.db.query_one("SELECT COUNT(*) FROM issues WHERE folder = ?", (folder,))[0]
+
+    def move(self, issue_id, dest_folder, state=None):
+        if self.locate_folder(issue_id) is None:
+            raise FileNotFoundError(f"Issue {issue_id} not found")
+        if state is not None:
+            self.save(state, dest_folder)
+        else:
+            self.db.execute("UPDATE issues SET folder = ? WHERE issue_id = ?", (dest_folder, issue_id))
+
+
+_stores = {}
+
+
+def get_issue_store(backend=None, location=None):
+    """
+    Returns the process-wide store for the configured backend.
+
+    ISSUE_STORE_BACKEND picks "sqlite" (default) or "json". A brand new SQLite
+    database is seeded from the existing issues/ JSON tree so nothing goes missing.
+    """
+    backend = (backend or os.getenv("ISSUE_STORE_BACKEND", "sqlite")).lower()
+    key = (backend, location)
+    if key in _stores:
+        return _stores[key]
+
+    if backend == "json":
+        store = JsonIssueStore(location or "issues")
+    elif backend == "sqlite":
+        db_path = location or os.getenv("ISSUE_DB_PATH", "issues/issues.db")
+        is_new = not os.path.exists(db_path)
+        store = SQLiteIssueStore(db_path)
+        if is_new:
+            from src.manage_issue.migrate_store import migrate_json_tree
+            json_dir = os.path.dirname(db_path) or "."
+            imported = migrate_json_tree(json_dir, store)
+            if imported:
+                print(f"Imported {imported} existing JSON issues into {db_path}")
+    else:
+        raise ValueError(f"Unknown issue store backend: {backend}")
+
+    _stores[key] = store
+    return store
@@ -0,0 +1,58 @@
+"""
+Imports the old issues/{active,completed,rejected} JSON tree into the SQLite issue store.
+
+Usage:
+    python -m src.manage_issue.migrate_store --source issues --db issues/issues.db
+"""
+import argparse
+import json
+import os
+
+from src.manage_issue.issue_store import FOLDERS
+
+
+def _read_tree(source_dir):
+    for folder in FOLDERS:
+        folder_path = os.path.join(source_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for file in os.listdir(folder_path):
+            if not file.endswith(".json"):
+                continue
+            path = os.path.join(folder_path, file)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable issue file {path}: {e}")
+                continue
+            state.setdefault("issue_id", file[:-len(".json")])
+            yield folder, state
+
+
+def migrate_json_tree(source_dir, store, batch_size=500):
+    """Copies every JSON issue under source_dir into store. Returns the number imported."""
+    imported = 0
+    batch = []
+    for row in _read_tree(source_dir):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            store.save_many(batch)
+            imported += len(batch)
+            batch = []
+    if batch:
+        store.save_many(batch)
+        imported += len(batch)
+    return imported
+
+
+if __name__ == "__main__":
+    from src.manage_issue.issue_store import SQLiteIssueStore
+
+    parser = argparse.ArgumentParser(description="Import JSON issue files into the SQLite issue store")
+    parser.add_argument("--source", default="issues", help="Folder holding active/completed/rejected")
+    parser.add_argument("--db", default="issues/issues.db", help="SQLite database to write to")
+    args = parser.parse_args()
+
+    count = migrate_json_tree(args.source, SQLiteIssueStore(args.db))
+    print(f"Imported {count} issues into {args.db}")
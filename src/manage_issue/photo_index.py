@@ -0,0 +1,315 @@
+import os
+import threading
+from itertools import combinations
+
+import numpy as np
+
+from src.sqlite_helper import SQLiteDB
+
+HASH_BITS = 64
+BLOCKS = 4
+BLOCK_BITS = HASH_BITS // BLOCKS
+BLOCK_MASK = (1 << BLOCK_BITS) - 1
+
+# Largest Hamming distance between two pHashes that still counts as the same photo
+# (re-encoded, resized or slightly cropped copies usually land well below this)
+DEFAULT_MAX_DISTANCE = 10
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def phash(image_path):
+    """64 bit perceptual hash: sign of the low 8x8 DCT frequencies of a 32x32 grayscale copy."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        # Let the JPEG decoder downscale while decoding instead of inflating the full photo
+        img.draft("L", (128, 128))
+        small = img.convert("L").resize((32, 32), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hash_to_hex(value):
+    return f"{value:016x}"
+
+
+def hex_to_hash(text):
+    return int(text, 16)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def _to_signed(value):
+    # SQLite integers are signed 64 bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def _blocks(value):
+    return [(value >> (BLOCK_BITS * i)) & BLOCK_MASK for i in range(BLOCKS)]
+
+
+def _flip_masks(radius):
+    """Every BLOCK_BITS-bit mask with at most `radius` bits set."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(BLOCK_BITS), r):
+            mask = 0
+            for p in positions:
+                mask |= 1 << p
+            masks.append(mask)
+    return masks
+
+
+def state_hashes(state):
+    """(image, hash) pairs of an issue state: its own photos plus ones merged into it."""
+    paths = state.get("image_paths") or []
+    pairs = [(image, hex_to_hash(text)) for image, text in zip(paths, state.get("image_phashes") or []) if text]
+    for image, text in (state.get("similar_image_phashes") or {}).items():
+        if text:
+            pairs.append((image, hex_to_hash(text)))
+    return pairs
+
+
+class PhotoIndex:
+    """
+    Multi-index hash table over the perceptual hashes of every stored photo.
+
+    The 64 bit hash is split into 4 blocks of 16 bits with one lookup table per block.
+    Two hashes within distance r agree to within r // 4 bits on at least one block, so a
+    radius query only probes the few hundred block values near each query block and
+    verifies that small candidate set, instead of comparing against every stored hash.
+
+    Rows are persisted in SQLite; the tables are rebuilt in memory from it and reloaded
+    when another process has written to the index.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS photo_hashes (
+        issue_id TEXT NOT NULL,
+        image    TEXT NOT NULL,
+        phash    INTEGER NOT NULL,
+        folder   TEXT NOT NULL,
+        PRIMARY KEY (issue_id, image)
+    );
+    CREATE TABLE IF NOT EXISTS photo_index_version (
+        id      INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO photo_index_version (id, version) VALUES (1, 0);
+    """
+
+    def __init__(self, db_path="issues/photo_index.db", max_distance=DEFAULT_MAX_DISTANCE):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+        self._masks = _flip_masks(max_distance // BLOCKS)
+        self._lock = threading.RLock()
+        self._version = None
+        self._reset()
+
+    # ---------------------------------------------------------------- memory side
+
+    def _reset(self):
+        self._entries = {}  # (issue_id, image) -> (hash, folder)
+        self._by_issue = {}  # issue_id -> {(issue_id, image)}
+        self._by_value = {}  # hash -> {(issue_id, image)}
+        # One table per block: block value -> distinct stored hashes having it
+        self._tables = [{} for _ in range(BLOCKS)]
+
+    def _insert_entry(self, issue_id, image, value, folder):
+        key = (issue_id, image)
+        self._delete_entry(key)
+        self._entries[key] = (value, folder)
+        self._by_issue.setdefault(issue_id, set()).add(key)
+        keys = self._by_value.setdefault(value, set())
+        if not keys:
+            for table, block in zip(self._tables, _blocks(value)):
+                table.setdefault(block, []).append(value)
+        keys.add(key)
+
+    def _delete_entry(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        value = entry[0]
+        keys = self._by_issue[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_issue[key[0]]
+        keys = self._by_value[value]
+        keys.discard(key)
+        if keys:
+            return
+        del self._by_value[value]
+        for table, block in zip(self._tables, _blocks(value)):
+            bucket = table[block]
+            bucket.remove(value)
+            if not bucket:
+                del table[block]
+
+    def _db_version(self):
+        return self.db.query_one("SELECT version FROM photo_index_version WHERE id = 1")[0]
+
+    def _sync(self):
+        """Reload the in-memory tables if the SQLite rows changed since they were built."""
+        version = self._db_version()
+        if version == self._version:
+            return
+        self._reset()
+        for row in self.db.query("SELECT issue_id, image, phash, folder FROM photo_hashes"):
+            self._insert_entry(row["issue_id"], row["image"], _to_unsigned(row["phash"]), row["folder"])
+        self._version = version
+
+    def _bump(self, conn):
+        conn.execute("UPDATE photo_index_version SET version = version + 1 WHERE id = 1")
+        return conn.execute("SELECT version FROM photo_index_version WHERE id = 1").fetchone()[0]
+
+    def _written(self, version, before):
+        # If another process wrote in between, our tables miss its rows: reload on next read
+        self._version = version if version == before + 1 else None
+
+    # ---------------------------------------------------------------- writes
+
+    def add(self, state, folder=None):
+        """Index the photo hashes of an issue. folder=None keeps the folder it is already in."""
+        issue_id = state["issue_id"]
+        pairs = state_hashes(state)
+        with self._lock:
+            self._sync()
+            before = self._version
+            current = {key: self._entries[key] for key in self._by_issue.get(issue_id, ())}
+            folder = folder or next((entry[1] for entry in current.values()), "active")
+            wanted = {(issue_id, image): value for image, value in pairs}
+            if wanted == {key: entry[0] for key, entry in current.items()} and \
+                    all(entry[1] == folder for entry in current.values()):
+                return
+            conn = self.db.connection()
+            with conn:
+                conn.execute("DELETE FROM photo_hashes WHERE issue_id = ?", (issue_id,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO photo_hashes (issue_id, image, phash, folder) VALUES (?, ?, ?, ?)",
+                    [(issue_id, image, _to_signed(value), folder) for (_, image), value in wanted.items()],
+                )
+                version = self._bump(conn)
+            for key in current:
+                self._delete_entry(key)
+            for (_, image), value in wanted.items():
+                self._insert_entry(issue_id, image, value, folder)
+            self._written(version, before)
+
+    def remove(self, issue_id):
+        with self._lock:
+            self._sync()
+            before = self._version
+            conn = self.db.connection()
+            with conn:
+                conn.execute("DELETE FROM photo_hashes WHERE issue_id = ?", (issue_id,))
+                version = self._bump(conn)
+            for key in list(self._by_issue.get(issue_id, ())):
+                self._delete_entry(key)
+            self._written(version, before)
+
+    def move(self, issue_id, folder):
+        with self._lock:
+            self._sync()
+            before = self._version
+            conn = self.db.connection()
+            with conn:
+                conn.execute("UPDATE photo_hashes SET folder = ? WHERE issue_id = ?", (folder, issue_id))
+                version = self._bump(conn)
+            for key in self._by_issue.get(issue_id, ()):
+                self._entries[key] = (self._entries[key][0], folder)
+            self._written(version, before)
+
+    def rebuild(self, folder_states):
+        """Re-create the index from (folder, state) pairs, e.g. IssueState.iter_issues()."""
+        with self._lock:
+            conn = self.db.connection()
+            with conn:
+                conn.execute("DELETE FROM photo_hashes")
+                for folder, state in folder_states:
+                    if folder == "rejected":
+                        continue
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO photo_hashes (issue_id, image, phash, folder) VALUES (?, ?, ?, ?)",
+                        [(state["issue_id"], image, _to_signed(value), folder)
+                         for image, value in state_hashes(state)],
+                    )
+                self._bump(conn)
+            self._version = None
+            self._sync()
+
+    # ---------------------------------------------------------------- reads
+
+    def search(self, value, max_distance=None, folders=("active", "completed")):
+        """
+        Stored photos within max_distance bits of value, closest first:
+        [{"issue_id", "image", "distance", "folder"}, ...]
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        masks = self._masks if max_distance // BLOCKS == self.max_distance // BLOCKS \
+            else _flip_masks(max_distance // BLOCKS)
+        with self._lock:
+            self._sync()
+            # Probe every block value within the per-block radius, verify the stored hashes found there
+            hits = {}
+            for table, block in zip(self._tables, _blocks(value)):
+                get = table.get
+                for mask in masks:
+                    bucket = get(block ^ mask)
+                    if bucket:
+                        for stored in bucket:
+                            distance = (stored ^ value).bit_count()
+                            if distance <= max_distance:
+                                hits[stored] = distance
+            matches = []
+            for stored, distance in hits.items():
+                for key in self._by_value[stored]:
+                    folder = self._entries[key][1]
+                    if folder in folders:
+                        matches.append({"issue_id": key[0], "image": key[1], "distance": distance, "folder": folder})
+        matches.sort(key=lambda m: (m["distance"], m["issue_id"]))
+        return matches
+
+    def count(self):
+        with self._lock:
+            self._sync()
+            return len(self._entries)
+
+
+_indexes = {}
+
+
+def get_photo_index(store):
+    """Process-wide index stored next to the issue store. A new index is built from the store."""
+    base_dir = os.path.dirname(getattr(store, "db_path", "")) or getattr(store, "base_dir", "issues")
+    db_path = os.path.join(base_dir, "photo_index.db")
+    if db_path in _indexes:
+        return _indexes[db_path]
+
+    is_new = not os.path.exists(db_path)
+    index = PhotoIndex(db_path)
+    if is_new:
+        index.rebuild(store.iter_states(("active", "completed")))
+    _indexes[db_path] = index
+    return index
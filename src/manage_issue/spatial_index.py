@@ -0,0 +1,208 @@
+import math
+import os
+
+from src.sqlite_helper import SQLiteDB
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Geohash length stored for every issue (~38m x 19m cells). Searches use a prefix of it.
+STORE_PRECISION = 8
+METERS_PER_DEGREE = 111320.0
+
+
+def encode_geohash(lat, lon, precision=STORE_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision):
+    """(height, width) of a geohash cell in degrees."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def search_precision(radius_m, lat):
+    """
+    Longest geohash whose cells are at least radius_m on each side at this latitude,
+    so the 3x3 block around a point covers every point within radius_m.
+    """
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+    for precision in range(STORE_PRECISION, 0, -1):
+        height, width = cell_size_degrees(precision)
+        if height * METERS_PER_DEGREE >= radius_m and width * METERS_PER_DEGREE * cos_lat >= radius_m:
+            return precision
+    return 1
+
+
+def neighbour_cells(lat, lon, precision):
+    """The cell containing (lat, lon) and its 8 neighbours."""
+    height, width = cell_size_degrees(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            n_lat = min(max(lat + dlat, -90.0), 90.0)
+            n_lon = ((lon + dlon + 180.0) % 360.0) - 180.0
+            cells.add(encode_geohash(n_lat, n_lon, precision))
+    return cells
+
+
+def normalize_type(issue_type):
+    return (issue_type or "").strip().lower()
+
+
+class SpatialIndex:
+    """
+    Persistent geohash grid over issue locations, partitioned by normalized issue type.
+    Lets the similarity check read only the cells around a new submission instead of
+    every stored issue.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS spatial_index (
+        issue_id   TEXT PRIMARY KEY,
+        issue_type TEXT NOT NULL,
+        geohash    TEXT NOT NULL,
+        folder     TEXT NOT NULL,
+        latitude   REAL NOT NULL,
+        longitude  REAL NOT NULL,
+        postcode   TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_spatial_cell ON spatial_index(issue_type, geohash);
+    CREATE INDEX IF NOT EXISTS idx_spatial_postcode ON spatial_index(postcode);
+    """
+
+    def __init__(self, db_path="issues/spatial_index.db"):
+        self.db_path = db_path
+        self.db = SQLiteDB(db_path, self.SCHEMA)
+
+    def _row(self, state, folder):
+        metadata = state.get("metadata") or {}
+        try:
+            lat = float(metadata["latitude"])
+            lon = float(metadata["longitude"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        postcode = (metadata.get("Address") or {}).get("postcode")
+        return {
+            "issue_id": state["issue_id"],
+            "issue_type": normalize_type(state.get("issue_type")),
+            "geohash": encode_geohash(lat, lon),
+            "folder": folder,
+            "latitude": lat,
+            "longitude": lon,
+            "postcode": postcode,
+        }
+
+    def add(self, state, folder=None):
+        """Insert or refresh one issue. folder=None keeps the folder it is already in."""
+        row = self._row(state, folder)
+        if row is None:
+            self.remove(state["issue_id"])
+            return
+        self.db.execute(
+            """
+            INSERT INTO spatial_index (issue_id, issue_type, geohash, folder, latitude, longitude, postcode)
+            VALUES (:issue_id, :issue_type, :geohash, COALESCE(:folder, 'active'), :latitude, :longitude, :postcode)
+            ON CONFLICT(issue_id) DO UPDATE SET
+                issue_type = excluded.issue_type,
+                geohash = excluded.geohash,
+                folder = COALESCE(:folder, spatial_index.folder),
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                postcode = excluded.postcode
+            """,
+            row,
+        )
+
+    def remove(self, issue_id):
+        self.db.execute("DELETE FROM spatial_index WHERE issue_id = ?", (issue_id,))
+
+    def move(self, issue_id, folder):
+        self.db.execute("UPDATE spatial_index SET folder = ? WHERE issue_id = ?", (folder, issue_id))
+
+    def nearby(self, lat, lon, issue_type, radius_m, folders=("active", "completed")):
+        """Rows of the same type in the cells around (lat, lon). Distances are not checked here."""
+        precision = search_precision(radius_m, lat)
+        issue_type = normalize_type(issue_type)
+        folder_marks = ",".join("?" for _ in folders)
+        rows = []
+        for cell in neighbour_cells(lat, lon, precision):
+            # Prefix range scan on the (issue_type, geohash) index
+            rows.extend(self.db.query(
+                f"""
+                SELECT issue_id, issue_type, folder, latitude, longitude FROM spatial_index
+                WHERE issue_type = ? AND geohash >= ? AND geohash < ? AND folder IN ({folder_marks})
+                """,
+                (issue_type, cell, cell + "~", *folders),
+            ))
+        return [dict(row) for row in rows]
+
+    def by_postcode(self, postcode, folders=("active", "completed")):
+        folder_marks = ",".join("?" for _ in folders)
+        rows = self.db.query(
+            f"SELECT issue_id, folder FROM spatial_index WHERE postcode = ? AND folder IN ({folder_marks})",
+            (postcode, *folders),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self.db.query_one("SELECT COUNT(*) FROM spatial_index")[0]
+
+    def rebuild(self, folder_states):
+        """Re-create the index from (folder, state) pairs, e.g. IssueState.iter_issues()."""
+        conn = self.db.connection()
+        with conn:
+            conn.execute("DELETE FROM spatial_index")
+            for folder, state in folder_states:
+                if folder == "rejected":
+                    continue
+                row = self._row(state, folder)
+                if row is not None:
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO spatial_index
+                            (issue_id, issue_type, geohash, folder, latitude, longitude, postcode)
+                        VALUES (:issue_id, :issue_type, :geohash, :folder, :latitude, :longitude, :postcode)
+                        """,
+                        row,
+                    )
+
+
+_indexes = {}
+
+
+def get_spatial_index(store):
+    """Process-wide index stored next to the issue store. A new index is built from the store."""
+    base_dir = os.path.dirname(getattr(store, "db_path", "")) or getattr(store, "base_dir", "issues")
+    db_path = os.path.join(base_dir, "spatial_index.db")
+    if db_path in _indexes:
+        return _indexes[db_path]
+
+    is_new = not os.path.exists(db_path)
+    index = SpatialIndex(db_path)
+    if is_new:
+        index.rebuild(store.iter_states(("active", "completed")))
+    _indexes[db_path] = index
+    return index
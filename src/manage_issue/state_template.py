@@ -1,7 +1,10 @@
 Blank_state={
     "issue_id": None,  # generated by IssueIDGenerator
     "issue_type" : None,
+    "created_at": None,  # set by IssueState.from_blank
     "image_paths": [],  # original image path
+    "image_digests": [],  # sha256 of each image in the ImageStore
+    "image_phashes": [],  # perceptual hash (hex) of each image, see photo_index.py
     "metadata": None,  # output of MetadataExtractor
 
     "status": "created",  # current stage in pipeline
@@ -19,9 +22,11 @@ Blank_state={
         "Email": None,
         "Department": None
     },
+    "Authority_draft": None,  # prefetched contacts + address hash, see coordinator/prefetch.py
 
     "tweet": {
         "text": None,
+        "polished": None,  # optional LLM rewrite of a template tweet, see tweet_templates.py
         "status": "pending",
         "url": None
     },
@@ -37,5 +42,8 @@ Blank_state={
     "similar_to": None,
     "already_reported": None,
     "similar_count": 0,
-    "similar_image_paths": []
+    "similar_image_paths": [],
+    "similar_image_digests": [],
+    "similar_image_phashes": {},  # image path -> perceptual hash of merged-in photos
+    "photo_matches": []  # near-duplicate photos resubmitted for this issue
 }
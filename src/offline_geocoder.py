@@ -0,0 +1,195 @@
+import json
+import math
+import os
+
+# Address keys a boundary feature may carry (same keys format_address_dict keeps)
+ADDRESS_KEYS = [
+    "house_number", "road", "neighbourhood", "suburb", "county",
+    "state", "postcode", "country", "country_code", "ward", "city"
+]
+
+
+class BoundaryPolygon:
+    """One (multi)polygon with its bounding box and the address fields it provides."""
+
+    def __init__(self, layer, polygons, address):
+        self.layer = layer
+        # polygons: list of [outer_ring, hole, hole, ...], rings are lists of (lon, lat)
+        self.polygons = polygons
+        self.address = address
+        xs = [x for poly in polygons for x, _ in poly[0]]
+        ys = [y for poly in polygons for _, y in poly[0]]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.area = sum(abs(_ring_area(poly[0])) for poly in polygons)
+
+    def contains(self, lon, lat):
+        for poly in self.polygons:
+            if _in_ring(lon, lat, poly[0]) and not any(_in_ring(lon, lat, hole) for hole in poly[1:]):
+                return True
+        return False
+
+
+def _ring_area(ring):
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def _in_ring(x, y, ring):
+    # Ray casting
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class STRTree:
+    """
+    Static R-tree bulk loaded with Sort-Tile-Recursive packing.
+    Only answers "which items have a bounding box containing this point".
+    """
+
+    def __init__(self, items, node_capacity=10):
+        self.node_capacity = node_capacity
+        # Leaf entries are (bbox, item); inner entries are (bbox, [children])
+        entries = [(item.bbox, item) for item in items]
+        self.depth = 0
+        self.root = self._build(entries) if entries else None
+
+    def _pack(self, entries):
+        capacity = self.node_capacity
+        slices = max(1, math.ceil(math.sqrt(math.ceil(len(entries) / capacity))))
+        entries = sorted(entries, key=lambda e: (e[0][0] + e[0][2]) / 2)
+        slice_size = slices * capacity
+        nodes = []
+        for start in range(0, len(entries), slice_size):
+            vertical = sorted(entries[start:start + slice_size], key=lambda e: (e[0][1] + e[0][3]) / 2)
+            for node_start in range(0, len(vertical), capacity):
+                children = vertical[node_start:node_start + capacity]
+                bbox = (
+                    min(c[0][0] for c in children), min(c[0][1] for c in children),
+                    max(c[0][2] for c in children), max(c[0][3] for c in children),
+                )
+                nodes.append((bbox, children))
+        return nodes
+
+    def _build(self, entries):
+        nodes = self._pack(entries)
+        self.depth = 1
+        while len(nodes) > 1:
+            nodes = self._pack(nodes)
+            self.depth += 1
+        return nodes[0]
+
+    def query_point(self, x, y):
+        if self.root is None:
+            return []
+        found = []
+        stack = [(self.root, self.depth)]
+        while stack:
+            (bbox, children), depth = stack.pop()
+            if not (bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]):
+                continue
+            for child in children:
+                cb = child[0]
+                if not (cb[0] <= x <= cb[2] and cb[1] <= y <= cb[3]):
+                    continue
+                if depth == 1:
+                    found.append(child[1])
+                else:
+                    stack.append((child, depth - 1))
+        return found
+
+
+def _geometry_polygons(geometry):
+    if not geometry:
+        return []
+    coords = geometry.get("coordinates") or []
+    if geometry.get("type") == "Polygon":
+        coords = [coords]
+    elif geometry.get("type") != "MultiPolygon":
+        return []
+    return [[[tuple(pt[:2]) for pt in ring] for ring in poly] for poly in coords if poly]
+
+
+def _feature_address(layer, properties):
+    address = {key: str(properties[key]) for key in ADDRESS_KEYS if properties.get(key) not in (None, "")}
+    # A layer file like city.geojson usually names its feature with "name"
+    if layer in ADDRESS_KEYS and layer not in address and properties.get("name"):
+        address[layer] = str(properties["name"])
+    return address
+
+
+class OfflineReverseGeocoder:
+    """
+    Point-in-polygon reverse geocoding over local boundary files.
+
+    Every *.geojson (or *.shp, when pyshp is installed) file in boundary_dir is one layer.
+    The file name is the layer name ("city", "ward", "postcode", ...). Properties named
+    like address keys are copied into the result, and a feature's "name" fills its layer key.
+    When several polygons of one layer contain the point, the smallest one wins.
+    """
+
+    def __init__(self, boundary_dir="data/boundaries", required_keys=("city",)):
+        self.boundary_dir = boundary_dir
+        self.required_keys = required_keys
+        self.polygons = []
+        if os.path.isdir(boundary_dir):
+            for file in sorted(os.listdir(boundary_dir)):
+                path = os.path.join(boundary_dir, file)
+                layer, ext = os.path.splitext(file)
+                if ext.lower() in (".geojson", ".json"):
+                    self._load_geojson(layer.lower(), path)
+                elif ext.lower() == ".shp":
+                    self._load_shapefile(layer.lower(), path)
+        self.tree = STRTree(self.polygons)
+        print(f"Offline geocoder loaded {len(self.polygons)} boundaries from {boundary_dir}")
+
+    def _load_geojson(self, layer, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        features = data.get("features", [data] if data.get("type") == "Feature" else [])
+        for feature in features:
+            polygons = _geometry_polygons(feature.get("geometry"))
+            address = _feature_address(layer, feature.get("properties") or {})
+            if polygons and address:
+                self.polygons.append(BoundaryPolygon(layer, polygons, address))
+
+    def _load_shapefile(self, layer, path):
+        try:
+            import shapefile  # pyshp, optional
+        except ImportError:
+            print(f"pyshp is not installed, skipping {path}")
+            return
+        reader = shapefile.Reader(path)
+        for shape_record in reader.iterShapeRecords():
+            polygons = _geometry_polygons(shape_record.shape.__geo_interface__)
+            address = _feature_address(layer, shape_record.record.as_dict())
+            if polygons and address:
+                self.polygons.append(BoundaryPolygon(layer, polygons, address))
+
+    def __len__(self):
+        return len(self.polygons)
+
+    def lookup(self, lat, lon):
+        """Address dict shaped like format_address_dict's output, or None on a miss."""
+        lat, lon = float(lat), float(lon)
+        best_per_layer = {}
+        for polygon in self.tree.query_point(lon, lat):
+            current = best_per_layer.get(polygon.layer)
+            if (current is None or polygon.area < current.area) and polygon.contains(lon, lat):
+                best_per_layer[polygon.layer] = polygon
+
+        # Larger areas first so finer layers overwrite shared keys
+        address = {}
+        for polygon in sorted(best_per_layer.values(), key=lambda p: -p.area):
+            address.update(polygon.address)
+        if not address or any(key not in address for key in self.required_keys):
+            return None
+        return address
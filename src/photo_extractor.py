@@ -1,14 +1,5 @@
-import exifread
-from geopy.geocoders import Nominatim
-
-def get_decimal_from_dms(dms, ref):
-    degrees = float(dms[0].num) / dms[0].den
-    minutes = float(dms[1].num) / dms[1].den
-    seconds = float(dms[2].num) / dms[2].den
-    decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
-    if ref in ['S', 'W']:
-        decimal = -decimal
-    return decimal
+from src.exif_reader import read_many, reconcile
+from src.geocoder import get_reverse_geocoder
 
 def format_address_dict(address):
     formatted = {}
@@ -26,32 +17,30 @@ def format_address_dict(address):
     return formatted
 
 class MetadataExtractor:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="my-camera-app")
+    def __init__(self, geocoder=None):
+        # Shared, cached reverse geocoder (also used by SimilarIssueFinder)
+        self.geocoder = geocoder or get_reverse_geocoder()
 
     def extract_metadata(self, image_source, external_metadata=None):
-        # image_path=state["image_path"]
-        with open(image_source, 'rb') as f:
-            tags = exifread.process_file(f)
+        # image_source is one path or every image of a submission
+        image_paths = [image_source] if isinstance(image_source, str) else list(image_source)
         try:
             if external_metadata:
                 latitude = external_metadata["latitude"]
                 longitude = external_metadata["longitude"]
                 datetime = external_metadata["datetime"]
             else:
-                lat = tags['GPS GPSLatitude']
-                lat_ref = tags['GPS GPSLatitudeRef'].printable
-                lon = tags['GPS GPSLongitude']
-                lon_ref = tags['GPS GPSLongitudeRef'].printable
-
-                latitude = get_decimal_from_dms(lat.values, lat_ref)
-                longitude = get_decimal_from_dms(lon.values, lon_ref)
-
-                datetime = str(tags['EXIF DateTimeOriginal'])
+                # Header-only EXIF reads on a thread pool, then one position for all photos
+                merged = reconcile(read_many(image_paths))
+                if merged["latitude"] is None or not merged["datetime"]:
+                    raise KeyError("GPS or DateTimeOriginal missing")
+                if merged["outliers"]:
+                    print(f"Ignored {merged['outliers']} photo(s) taken far from the others")
+                latitude = merged["latitude"]
+                longitude = merged["longitude"]
+                datetime = merged["datetime"]
 
-            raw_address = self.geolocator.reverse(
-                (latitude, longitude), language='en', addressdetails=True, timeout=10
-            ).raw.get("address", {})
+            raw_address = self.geocoder.reverse(latitude, longitude)
 
             address = format_address_dict(raw_address)
 
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import threading
+
+
+class SQLiteDB:
+    """
+    Small wrapper around a SQLite file that hands out one connection per thread.
+
+    Streamlit runs every session in its own thread, and sqlite3 connections can't
+    be shared between threads, so each thread lazily opens its own connection.
+    All connections use WAL mode so readers never block the writer.
+    """
+
+    def __init__(self, db_path: str, schema: str = ""):
+        self.db_path = db_path
+        self.schema = schema
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        if self._schema_ready or not self.schema:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(self.schema)
+                conn.commit()
+                self._schema_ready = True
+
+    def execute(self, sql, params=()):
+        conn = self.connection()
+        with conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        conn = self.connection()
+        with conn:
+            return conn.executemany(sql, rows)
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchone()
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,48 @@
+from authority_finder.email_extractor import EmailExtractor, deobfuscate
+
+PAGE = """
+Municipal Corporation Faridabad - Contact Us
+For complaints about roads and potholes contact the Executive Engineer (Roads), Engineering Department:
+ee-roads[at]mcf(dot)gov(dot)in  Helpline 1800-180-2020.
+Sanitation complaints: sanitation.mcf@gmail.com
+Commissioner, Municipal Corporation Faridabad: commissioner-mcf AT haryana DOT gov DOT in
+Website feedback: webmaster@mcf.gov.in
+<img src="logo@2x.png">
+Copyright Municipal Corporation Faridabad. For complaints about road potholes: ee-roads@mcf.gov.in
+""" + ("Lorem ipsum dolor sit amet. " * 400)
+
+
+def test_deobfuscate_common_forms():
+    assert deobfuscate("ee-roads[at]mcf(dot)gov(dot)in") == "ee-roads@mcf.gov.in"
+    assert deobfuscate("cmo AT haryana DOT gov DOT in") == "cmo@haryana.gov.in"
+    assert deobfuscate("pgcell&#64;nic.in") == "pgcell@nic.in"
+    assert deobfuscate("meet us at the office") == "meet us at the office"
+
+
+def test_plain_at_before_a_domain_is_not_an_address():
+    assert deobfuscate("Visit us at mcf.gov.in") == "Visit us at mcf.gov.in"
+    text = "Register your complaint online at mcf.gov.in for road potholes"
+    assert deobfuscate(text) == text
+    result = EmailExtractor().extract(text + " " + ("Lorem ipsum. " * 50), "Pothole", "Faridabad")
+    assert not result.candidates
+    assert not result.confident
+
+
+def test_confident_match_skips_llm():
+    result = EmailExtractor().extract(PAGE, "Pothole", "Faridabad")
+    emails = [c.email for c in result.candidates]
+
+    assert "webmaster@mcf.gov.in" not in emails
+    assert emails.count("ee-roads@mcf.gov.in") == 1
+    assert result.confident
+    assert result.emails["Main"] == "ee-roads@mcf.gov.in"
+    assert result.emails["Higher Authority"] == "commissioner-mcf@haryana.gov.in"
+
+
+def test_ambiguous_text_only_sends_context_windows():
+    text = ("Lorem ipsum. " * 500) + " write to info@roads-dept.org or help@citycare.org " + ("Lorem ipsum. " * 500)
+    result = EmailExtractor().extract(text, "Pothole", "Faridabad")
+
+    assert not result.confident
+    assert "info@roads-dept.org" in result.llm_context
+    assert len(result.llm_context) < len(text) // 10
@@ -0,0 +1,72 @@
+import copy
+import json
+import os
+
+from src.manage_issue.state_template import Blank_state
+from src.manage_issue.Issue_manager import IssueState
+from src.manage_issue.issue_store import SQLiteIssueStore
+from src.manage_issue.migrate_store import migrate_json_tree
+
+
+def make_state(issue_id, city="Delhi", stage="metadata_review"):
+    state = copy.deepcopy(Blank_state)
+    state.update({
+        "issue_id": issue_id,
+        "image_paths": ["a.jpg"],
+        "issue_type": "Pothole",
+        "admin_stage": stage,
+        "metadata": {"latitude": 28.6, "longitude": 77.2, "datetime": "2025:06:19 12:30:00",
+                     "Address": {"city": city}},
+    })
+    return state
+
+
+def test_sqlite_store_filters_and_moves(tmp_path):
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    handler.update_issue(make_state("Delhi_1"))
+    handler.update_issue(make_state("Delhi_2", stage="authority_review"))
+    handler.update_issue(make_state("Pune_1", city="Pune"))
+
+    assert sorted(handler.get_all_active_ids()) == ["Delhi_1", "Delhi_2", "Pune_1"]
+    assert [s["issue_id"] for s in handler.query_issues(city="Delhi", admin_stage="authority_review")] == ["Delhi_2"]
+    assert handler.distinct_values("city") == ["Delhi", "Pune"]
+
+    state = handler.get_data("Pune_1")
+    state["status"] = "rejected"
+    handler.move_issue("Pune_1", "rejected", state)
+    assert handler.count_issues("active") == 2
+    assert handler.find_issue("Pune_1") == ("rejected", state)
+
+
+def test_migration_imports_json_tree(tmp_path):
+    for folder, issue_id in [("active", "Delhi_1"), ("completed", "Delhi_2"), ("rejected", "Delhi_3")]:
+        os.makedirs(tmp_path / folder, exist_ok=True)
+        with open(tmp_path / folder / f"{issue_id}.json", "w") as f:
+            json.dump(make_state(issue_id), f)
+
+    store = SQLiteIssueStore(str(tmp_path / "issues.db"))
+    assert migrate_json_tree(str(tmp_path), store) == 3
+    assert store.ids("completed") == ["Delhi_2"]
+    assert store.locate_folder("Delhi_3") == "rejected"
+
+
+def test_spatial_index_tracks_updates_and_moves(tmp_path):
+    from src.manage_issue.spatial_index import SpatialIndex
+    from src.manage_issue.Similar_issue_finder import SimilarIssueFinder
+
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")),
+                         spatial_index=SpatialIndex(str(tmp_path / "spatial_index.db")))
+    handler.update_issue(make_state("Delhi_1"))
+    finder = SimilarIssueFinder(issue_handler=handler, threshold_meters=500)
+    finder.get_pincode_from_coords = lambda lat, lon: None
+
+    new_state = make_state(None)
+    new_state["image_paths"] = ["b.jpg"]
+    # ~200m north of Delhi_1
+    assert finder.check_and_group(new_state, {"latitude": 28.6018, "longitude": 77.2}) == (True, "Delhi_1")
+    assert handler.get_data("Delhi_1")["similar_image_paths"] == ["b.jpg"]
+    # ~2km away is out of range
+    assert finder.check_and_group(new_state, {"latitude": 28.618, "longitude": 77.2}) == (False, None)
+
+    handler.move_issue("Delhi_1", "rejected")
+    assert finder.check_and_group(new_state, {"latitude": 28.6018, "longitude": 77.2}) == (False, None)
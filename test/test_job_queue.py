@@ -0,0 +1,88 @@
+import copy
+from types import SimpleNamespace
+
+from coordinator.job_queue import JobQueue
+from coordinator.worker import Worker
+from src.manage_issue.Issue_manager import IssueState
+from src.manage_issue.issue_store import SQLiteIssueStore
+from src.manage_issue.state_template import Blank_state
+
+
+def make_state(issue_id, stage, city="Delhi"):
+    state = copy.deepcopy(Blank_state)
+    state.update({"issue_id": issue_id, "issue_type": "Pothole", "admin_stage": stage,
+                  "metadata": {"latitude": 28.6, "longitude": 77.2, "Address": {"city": city}}})
+    state["approvals"][stage] = True
+    return state
+
+
+class FakeBrain:
+    """Stage work without network calls: tweet_review moves the issue to completed like a posted tweet."""
+
+    def __init__(self, issue_handler, use_llm=False):
+        self.issue_handler = issue_handler
+        self.social_handler = SimpleNamespace(use_llm=use_llm)
+        self.batches = []
+
+    def do_stage_work_batch(self, states):
+        self.batches.append(sorted(state["issue_id"] for state in states))
+        for state in states:
+            if state["admin_stage"] == "tweet_review":
+                state["admin_stage"] = "complete"
+                self.issue_handler.move_issue(state["issue_id"], "completed", state)
+            else:
+                state["admin_stage"] = "tweet_review" if state["admin_stage"] == "authority_review" else "authority_review"
+                self.issue_handler.update_issue(state)
+
+
+def test_jobs_are_unique_per_issue_and_stage(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), limits={"twitter": 1})
+    first = queue.enqueue("Delhi_1", "tweet_review")
+    assert queue.enqueue("Delhi_1", "tweet_review")["id"] == first["id"]
+    queue.enqueue("Delhi_2", "tweet_review")
+
+    assert queue.claim("w1")["issue_id"] == "Delhi_1"
+    assert queue.claim("w2") is None  # twitter limit reached
+    assert queue.counts()["queued"] == 1
+
+
+def test_issue_moved_to_completed_counts_as_done(tmp_path):
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    handler.update_issue(make_state("Delhi_1", "tweet_review"))
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("Delhi_1", "tweet_review")
+    brain = FakeBrain(handler)
+
+    assert Worker(queue, brain, worker_id="w1").run_once() == "done"
+    job = queue.get("Delhi_1", "tweet_review")
+    assert job["status"] == "done" and job["attempts"] == 1
+    assert brain.batches == [["Delhi_1"]]
+    assert handler.find_issue("Delhi_1")[0] == "completed"
+
+
+def test_metadata_reviews_for_one_location_run_together(tmp_path):
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    for issue_id, city in (("Delhi_1", "Delhi"), ("Pune_1", "Pune"), ("Delhi_2", "Delhi")):
+        handler.update_issue(make_state(issue_id, "metadata_review", city=city))
+        queue.enqueue(issue_id, "metadata_review")
+    brain = FakeBrain(handler)
+    worker = Worker(queue, brain, worker_id="w1")
+
+    assert worker.run_once() == "done"
+    assert worker.run_once() == "done"
+    assert worker.run_once() is None
+    assert brain.batches == [["Delhi_1", "Delhi_2"], ["Pune_1"]]
+    assert queue.counts()["done"] == 3
+
+
+def test_llm_tweets_for_approved_contacts_are_batched(tmp_path):
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    for issue_id, city in (("Delhi_1", "Delhi"), ("Pune_1", "Pune")):
+        handler.update_issue(make_state(issue_id, "authority_review", city=city))
+        queue.enqueue(issue_id, "authority_review")
+    brain = FakeBrain(handler, use_llm=True)
+
+    assert Worker(queue, brain, worker_id="w1").run_once() == "done"
+    assert brain.batches == [["Delhi_1", "Pune_1"]]
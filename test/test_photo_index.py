@@ -0,0 +1,108 @@
+import copy
+import random
+
+from PIL import Image, ImageDraw
+
+from src.manage_issue.Issue_manager import IssueState
+from src.manage_issue.Similar_issue_finder import SimilarIssueFinder
+from src.manage_issue.issue_store import SQLiteIssueStore
+from src.manage_issue.photo_index import PhotoIndex, hamming, hash_to_hex, phash
+from src.manage_issue.state_template import Blank_state
+
+
+def draw_scene(path, seed, size=(800, 600)):
+    rng = random.Random(seed)
+    img = Image.new("RGB", size, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randint(0, size[0]), rng.randint(0, size[1])
+        draw.ellipse((x, y, x + rng.randint(60, 300), y + rng.randint(60, 300)),
+                     fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    img.save(path, quality=95)
+    return img
+
+
+def test_phash_survives_reencoding_resizing_and_cropping(tmp_path):
+    original = draw_scene(tmp_path / "a.jpg", seed=1)
+    original.resize((400, 300)).save(tmp_path / "small.jpg", quality=60)
+    original.crop((16, 12, 784, 588)).save(tmp_path / "crop.png")
+    draw_scene(tmp_path / "other.jpg", seed=2)
+
+    base = phash(tmp_path / "a.jpg")
+    assert hamming(base, phash(tmp_path / "small.jpg")) <= 4
+    assert hamming(base, phash(tmp_path / "crop.png")) <= 10
+    assert hamming(base, phash(tmp_path / "other.jpg")) > 10
+
+
+def test_index_search_matches_linear_scan(tmp_path):
+    index = PhotoIndex(str(tmp_path / "photo_index.db"), max_distance=10)
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    states = []
+    for i, value in enumerate(hashes):
+        state = {"issue_id": f"Delhi_{i}", "image_paths": [f"{i}.jpg"], "image_phashes": [hash_to_hex(value)]}
+        states.append(("active", state))
+    index.rebuild(states)
+
+    for value in hashes[:50]:
+        query = value
+        for bit in rng.sample(range(64), rng.randint(0, 10)):
+            query ^= 1 << bit
+        expected = sorted(f"Delhi_{i}" for i, h in enumerate(hashes) if hamming(h, query) <= 10)
+        assert sorted(m["issue_id"] for m in index.search(query)) == expected
+
+    index.remove("Delhi_0")
+    assert all(m["issue_id"] != "Delhi_0" for m in index.search(hashes[0]))
+    # A second instance on the same file (another process) sees the removal too
+    assert PhotoIndex(str(tmp_path / "photo_index.db")).count() == 1999
+
+
+def test_resubmitted_photo_is_merged_before_geocoding(tmp_path):
+    original = draw_scene(tmp_path / "a.jpg", seed=3)
+    original.resize((640, 480)).save(tmp_path / "resent.jpg", quality=50)
+
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    finder = SimilarIssueFinder(issue_handler=handler, geocoder=object())
+    state = copy.deepcopy(Blank_state)
+    state.update({"issue_id": "Delhi_1", "issue_type": "Pothole", "image_paths": [str(tmp_path / "a.jpg")],
+                  "image_phashes": finder.hash_images([str(tmp_path / "a.jpg")])})
+    handler.update_issue(state)
+
+    new_state = handler.from_blank([str(tmp_path / "resent.jpg")])
+    new_state["issue_type"] = "pothole "
+    new_state["image_phashes"] = finder.hash_images(new_state["image_paths"])
+    found, issue_id, merged = finder.check_duplicate_photos(new_state)
+
+    assert (found, issue_id) == (True, "Delhi_1")
+    stored = handler.get_data("Delhi_1")
+    assert stored["similar_count"] == 1
+    assert stored["photo_matches"][0]["image"] == str(tmp_path / "resent.jpg")
+
+    handler.move_issue("Delhi_1", "rejected", stored)
+    assert finder.check_duplicate_photos(new_state)[0] is False
+
+
+def test_similar_photo_of_another_problem_is_not_merged(tmp_path):
+    draw_scene(tmp_path / "a.jpg", seed=3)
+    handler = IssueState(store=SQLiteIssueStore(str(tmp_path / "issues.db")))
+    finder = SimilarIssueFinder(issue_handler=handler, geocoder=object())
+    state = copy.deepcopy(Blank_state)
+    state.update({"issue_id": "Delhi_1", "issue_type": "Pothole", "image_paths": [str(tmp_path / "a.jpg")],
+                  "image_phashes": finder.hash_images([str(tmp_path / "a.jpg")]),
+                  "metadata": {"latitude": 28.6, "longitude": 77.2}})
+    handler.update_issue(state)
+    handler.move_issue("Delhi_1", "completed", state)
+
+    new_state = handler.from_blank([str(tmp_path / "a.jpg")])
+    new_state["image_phashes"] = finder.hash_images(new_state["image_paths"])
+    new_state["image_digests"] = ["ab" * 32]
+    new_state["issue_type"] = "Garbage"
+    assert finder.check_duplicate_photos(new_state)[0] is False
+
+    new_state["issue_type"] = "Pothole"
+    # Same-looking pothole in another city
+    assert finder.check_duplicate_photos(new_state, {"latitude": 19.07, "longitude": 72.87})[0] is False
+
+    found, issue_id, matched = finder.check_duplicate_photos(new_state, {"latitude": 28.601, "longitude": 77.2})
+    assert (found, issue_id) == (True, "Delhi_1")
+    assert handler.find_issue("Delhi_1")[1]["similar_image_digests"] == ["ab" * 32]
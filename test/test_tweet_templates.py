@@ -0,0 +1,58 @@
+from Social_platforms.tweet_length import weighted_length
+from Social_platforms.tweet_templates import HEADLINES, TweetTemplateEngine, issue_type_key
+
+
+def make_state(issue_type="Pothole", road="MG Road", city="Bangalore", similar=2, issue_id="20250101_0001"):
+    return {
+        "issue_id": issue_id,
+        "issue_type": issue_type,
+        "metadata": {"datetime": "2025-01-01 10:30:00", "Address": {"road": road, "city": city}},
+        "Authority_info": {"Email": {"Main": "ee@bbmp.gov.in"}},
+        "similar_count": similar,
+    }
+
+
+def test_weighted_length_matches_twitter_counting():
+    assert weighted_length("hello world") == 11
+    # Emoji count 2 however many code points they use (ZWJ family, skin tone, flag, keycap)
+    assert weighted_length("🚧") == 2
+    assert weighted_length("👩‍👩‍👧") == 2
+    assert weighted_length("👍🏽") == 2
+    assert weighted_length("🇮🇳") == 2
+    assert weighted_length("1️⃣") == 2
+    # CJK weighs 2, Devanagari 1
+    assert weighted_length("道路") == 4
+    assert weighted_length("सड़क") == 4
+    # Any URL is 23
+    assert weighted_length("see https://example.com/" + "a" * 100) == 4 + 23
+
+
+def test_every_template_renders_within_limit():
+    engine = TweetTemplateEngine()
+    long_road = "Pandit Deendayal Upadhyay Marg Service Road Near Old Municipal Corporation Ward Office Complex"
+    for locale, types in HEADLINES.items():
+        for key, variants in types.items():
+            for variant in range(len(variants)):
+                for road in ("MG Road", long_road):
+                    state = make_state(issue_type=key.replace("_", " "), road=road, city="Thiruvananthapuram")
+                    tweet = engine.render(state, locale=locale, variant=variant)
+                    assert 0 < weighted_length(tweet) <= 280
+                    assert state["issue_id"] in tweet
+                    assert "@" not in tweet
+
+
+def test_render_is_deterministic_and_drops_optional_parts_first():
+    engine = TweetTemplateEngine()
+    state = make_state()
+    tweet = engine.render(state)
+    assert tweet == engine.render(state)
+    assert "2 similar reports nearby" in tweet
+    assert "#Bangalore" in tweet
+    assert issue_type_key("🕳️ Pothole Report") == "pothole"
+    assert issue_type_key("Water Leakage") == "water_leakage"
+    assert issue_type_key("Broken bench") == "other"
+
+    crowded = make_state(road="A Very Long Road Name " * 6)
+    tweet = engine.render(crowded)
+    assert weighted_length(tweet) <= 280
+    assert "similar reports nearby" not in tweet